@@ -1,59 +1,244 @@
+import os
+import json
+import math
+import time
 import logging
 import random
+from enum import Enum
+from typing import Callable, Iterable
+from functools import partial
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 
 from constants import NUMBER_OF_TURNS
 from wordle import Wordle, GameStatus
+from state import StateMode
 from solver import Solver
+from simulation import SimulationEngine
+from pattern_matrix import get_pattern_matrix
+from utils import load_accepted_words
+from benchmark_records import GameRecord, GameRecordWriter
+from metrics import PERCENTILES, get_percentiles
+from benchmark_stats import ScoreStats, IntervalMethod
+
+
+class BenchmarkBackend(Enum):
+    # full game with validation, logging and state rows
+    WORDLE = "wordle"
+    # `SimulationEngine`, same scores as `WORDLE` for the same state mode, but a lot faster
+    SIMULATION = "simulation"
+
+
+# plays games of (word_secret, seed): (solver, games) -> records
+GameRunner = Callable[[Solver, list[tuple[str, str]]], list[GameRecord]]
+
+# game runner of a benchmark worker process, see `init_worker`
+_worker_game_runner: GameRunner = None
+
+
+def play_game(wordle: Wordle, solver: Solver, word_secret: str, seed: str, hard_mode: bool = True) -> GameRecord:
+    wordle.start_game(hard_mode=hard_mode, seed=seed, word_secret=word_secret)
+    state = wordle.state
+    guesses = []
+    guess_times = []
+    while wordle.status == GameStatus.IN_PROGRESS:
+        start = time.perf_counter()
+        guess_str = solver.make_guess(state)
+        guess_times.append(time.perf_counter() - start)
+        guesses.append(guess_str)
+        state = wordle.guess(guess_str)
+
+    score = NUMBER_OF_TURNS - wordle.turns_left if wordle.status == GameStatus.WON else -1
+    return GameRecord(solver.name, word_secret, seed, score, guesses, guess_times)
+
+
+def play_games(wordle: Wordle, solver: Solver, games: list[tuple[str, str]],
+               hard_mode: bool = True) -> list[GameRecord]:
+    return [play_game(wordle, solver, word_secret, seed, hard_mode) for word_secret, seed in games]
+
+
+def get_game_runner(backend: BenchmarkBackend, state_mode: StateMode, hard_mode: bool = True) -> GameRunner:
+    if backend == BenchmarkBackend.SIMULATION:
+        # games are played in lockstep, see `SimulationEngine.play_many`
+        return partial(SimulationEngine(state_mode=state_mode).play_many, hard_mode=hard_mode)
+    return partial(play_games, Wordle(logger_level=logging.ERROR, state_mode=state_mode), hard_mode=hard_mode)
+
+
+def init_worker(backend: BenchmarkBackend, state_mode: StateMode, hard_mode: bool):
+    # word lists and pattern table are loaded once per worker (pattern table is memory mapped, so it's shared)
+    global _worker_game_runner
+    _worker_game_runner = get_game_runner(backend, state_mode, hard_mode)
+
+
+def play_games_worker(solvers: tuple[Solver, ...], games: list[tuple[str, str]]) -> list[list[GameRecord]]:
+    # solvers are sent to the worker together, so that objects they share (e.g. `HistogramCache`) stay shared there
+    return [_worker_game_runner(solver, games) for solver in solvers]
 
 
 class Benchmark:
-    def __init__(self, solver_arr: tuple[Solver, ...], n_tries: int = 10 ** 3, seed: int = 0):
-        self.__wordle = Wordle(logger_level=logging.ERROR)
-        self.__n_tries = n_tries
+    __SHARD_SIZE = 64
+    # simulated games are played in lockstep, bigger shards share more states
+    __SIMULATION_SHARD_SIZE = 1024
+
+    def __init__(self, solver_arr: tuple[Solver, ...], n_tries: int = 10 ** 3, seed: int = 0, n_workers: int = 1,
+                 exhaustive: bool = False, records_filepath: str = None,
+                 backend: BenchmarkBackend = BenchmarkBackend.WORDLE, state_mode: StateMode = StateMode.CONSTRAINTS,
+                 hard_mode: bool = True, results_filepath: str = None, confidence: float = 0.95,
+                 interval_method: IntervalMethod = IntervalMethod.NORMAL, early_stopping: bool = False,
+                 min_games: int = 200):
+        """
+        :param exhaustive: play every accepted word exactly once (in word list order) instead of `n_tries` random ones
+        :param records_filepath: if provided, every game is streamed to this file (JSONL, or CSV if it ends with .csv)
+        :param hard_mode: if False, guesses don't have to be consistent with the previous patterns
+        :param results_filepath: if provided, the result table is also written to this file as JSON
+        :param confidence: confidence level of the intervals in the result table
+        :param early_stopping: the first solver is the baseline, every other solver is stopped (checked after every
+            shard) once it played `min_games` and its average turns interval doesn't overlap with the baseline's.
+            Games should be random (not `exhaustive`, which goes in word list order), and intervals are checked
+            repeatedly, so a stop is a quick signal rather than an exact test
+        """
+        self.__words_accepted = load_accepted_words()
+        self.__n_tries = len(self.__words_accepted) if exhaustive else n_tries
         self.__solver_arr = solver_arr
+        self.__n_workers = n_workers
+        self.__records_filepath = records_filepath
+        self.__backend = backend
+        self.__state_mode = state_mode
+        self.__hard_mode = hard_mode
+        self.__results_filepath = results_filepath
+        self.__confidence = confidence
+        self.__interval_method = interval_method
+        self.__early_stopping = early_stopping
+        self.__min_games = min_games
+        # solvers stopped early in the last run
+        self.__stopped: set[str] = set()
+        # guess latencies (seconds) of every solver in the last run
+        self.__guess_times: dict[str, list[float]] = dict()
+        self.__games = self.__get_games(seed, exhaustive)
 
-        random.seed(seed)
+    def __get_games(self, seed: int, exhaustive: bool) -> list[tuple[str, str]]:
+        """
+        Secret word and random seed of every game. Same for every solver and fixed upfront, so that results
+        depend only on the seed and not on the number of workers or the order games are played in.
+        """
+        if exhaustive:
+            return [(word, f"{seed}-{i}") for i, word in enumerate(self.__words_accepted)]
 
-    def analyze_solver(self):
-        score_counter_arr = []
-        for solver in self.__solver_arr:
-            score_counter = Counter()
-            for _ in range(self.__n_tries):
-                self.__wordle.start_game(hard_mode=True)
-                state = self.__wordle.state
+        rng = random.Random(seed)
+        games = []
+        while len(games) < self.__n_tries:
+            copy_word_arr = list(self.__words_accepted)
+            rng.shuffle(copy_word_arr)
+            games.extend((word, f"{seed}-{len(games) + i}") for i, word in enumerate(copy_word_arr))
+        return games[:self.__n_tries]
 
-                while self.__wordle.status == GameStatus.IN_PROGRESS:
-                    guess_str = solver.make_guess(state)
-                    state = self.__wordle.guess(guess_str)
+    def __get_shards(self) -> list[list[tuple[str, str]]]:
+        # small enough that records of a shard are cheap to hold before they're written, and with workers
+        # at least a few shards per worker, so that workers finishing early pick up the remaining work
+        if self.__backend == BenchmarkBackend.SIMULATION:
+            shard_size = self.__SIMULATION_SHARD_SIZE
+        else:
+            shard_size = self.__SHARD_SIZE
+        if self.__n_workers > 1:
+            shard_size = max(1, min(shard_size, len(self.__games) // (4 * self.__n_workers)))
+        return [self.__games[i:i + shard_size] for i in range(0, len(self.__games), shard_size)]
 
-                    if self.__wordle.status == GameStatus.WON:
-                        score_counter[NUMBER_OF_TURNS - self.__wordle.turns_left] += 1
-                    elif self.__wordle.status == GameStatus.LOST:
-                        score_counter[-1] += 1
+    def analyze_solver(self) -> list[tuple[str, Counter]]:
+        writer = GameRecordWriter(self.__records_filepath) if self.__records_filepath else None
+        self.__stopped = set()
+        try:
+            if self.__n_workers > 1:
+                stats_arr = self.__analyze_solver_parallel(writer)
+            else:
+                game_runner = get_game_runner(self.__backend, self.__state_mode, self.__hard_mode)
+                stats_arr = []
+                for solver in self.__solver_arr:
+                    # shards are played lazily, so nothing is left to play when a solver is stopped
+                    shard_records = (game_runner(solver, shard) for shard in self.__get_shards())
+                    stats_arr.append((solver.name, self.__collect_records(solver.name, shard_records, writer,
+                                                                          self.__get_baseline(stats_arr))))
+        finally:
+            if writer is not None:
+                writer.close()
 
-            score_counter_arr.append([solver.name, score_counter])
+        self.print_result_table(stats_arr)
+        if self.__results_filepath is not None:
+            self.dump_results(stats_arr, self.__results_filepath)
+        return [(solver_name, stats.score_counter) for solver_name, stats in stats_arr]
 
-        self.print_result_table(score_counter_arr)
+    def __analyze_solver_parallel(self, writer: GameRecordWriter | None) -> list[tuple[str, ScoreStats]]:
+        shards = self.__get_shards()
+        if self.__backend == BenchmarkBackend.SIMULATION or self.__state_mode == StateMode.PATTERNS:
+            # pattern table is built (if it's missing) once before the workers are started, not by each of them
+            get_pattern_matrix()
+        with ProcessPoolExecutor(max_workers=self.__n_workers, initializer=init_worker,
+                                 initargs=(self.__backend, self.__state_mode, self.__hard_mode)) as executor:
+            # (future, index of the solver in its result) of every shard of every solver
+            if self.__early_stopping:
+                # solvers are played one after another, so that remaining shards of a stopped solver can be cancelled
+                tasks_arr = [[(executor.submit(play_games_worker, (solver,), shard), 0) for shard in shards]
+                             for solver in self.__solver_arr]
+            else:
+                futures = [executor.submit(play_games_worker, self.__solver_arr, shard) for shard in shards]
+                tasks_arr = [[(future, i) for future in futures] for i in range(len(self.__solver_arr))]
 
-    def expected_score(self, score_counter: Counter) -> tuple[tuple[float, float]]:
-        success_rate = 1. - (score_counter[-1] / self.__n_tries)
-        success_cnt_expected = 0
-        success_cnt_total = 0
-        for score in range(1, NUMBER_OF_TURNS + 1):
-            success_cnt_expected += score * score_counter[score]
-            success_cnt_total += score_counter[score]
-        return success_rate, success_cnt_expected / success_cnt_total
+            stats_arr = []
+            for solver, tasks in zip(self.__solver_arr, tasks_arr):
+                # shards are collected in order, so records are written in the same order as in a serial run
+                shard_records = (future.result()[i] for future, i in tasks)
+                stats_arr.append((solver.name, self.__collect_records(solver.name, shard_records, writer,
+                                                                      self.__get_baseline(stats_arr))))
+                if self.__early_stopping:
+                    for future, _ in tasks:
+                        future.cancel()
+        return stats_arr
 
-    def print_result_table(self, score_counter_arr: list[Counter]) -> None:
-        headers = ["Solver", "Success Rate", "Average Score (Success only)"]
+    def __get_baseline(self, stats_arr: list[tuple[str, ScoreStats]]) -> ScoreStats | None:
+        return stats_arr[0][1] if self.__early_stopping and stats_arr else None
+
+    def __collect_records(self, solver_name: str, shard_records: Iterable[list[GameRecord]],
+                          writer: GameRecordWriter | None, baseline: ScoreStats | None) -> ScoreStats:
+        stats = ScoreStats()
+        guess_times = self.__guess_times[solver_name] = []
+        for records in shard_records:
+            for record in records:
+                stats.add(record.score)
+                guess_times.extend(record.guess_times)
+                if writer is not None:
+                    writer.write(record)
+            if baseline is not None and self.__is_separated(stats, baseline):
+                self.__stopped.add(solver_name)
+                break
+        return stats
+
+    def __is_separated(self, stats: ScoreStats, baseline: ScoreStats) -> bool:
+        if stats.n_games < self.__min_games:
+            return False
+        low, high = stats.get_average_turns_interval(self.__confidence, self.__interval_method)
+        baseline_low, baseline_high = baseline.get_average_turns_interval(self.__confidence, self.__interval_method)
+        return high < baseline_low or baseline_high < low
+
+    def __sort_results(self, stats_arr: list[tuple[str, ScoreStats]]) -> list[tuple[str, ScoreStats]]:
+        # best first: fewest turns on average, a lost game counts as one turn more than allowed
+        return sorted(stats_arr, key=lambda item: item[1].average_turns)
+
+    def print_result_table(self, stats_arr: list[tuple[str, ScoreStats]]) -> None:
+        percent = f"{100 * self.__confidence:g}%"
+        headers = ["Solver", "Games", f"Success Rate ({percent} CI)", "Average Score (Success only)",
+                   f"Average Turns, lost = {NUMBER_OF_TURNS + 1} ({percent} CI)", "Guess Latency p50 / p95 / p99 (ms)"]
         rows = []
-        for solver_name, score_counter in score_counter_arr:
-            success_rate, avg_score = self.expected_score(score_counter)
+        for solver_name, stats in self.__sort_results(stats_arr):
+            success_low, success_high = stats.get_success_rate_interval(self.__confidence)
+            turns_low, turns_high = stats.get_average_turns_interval(self.__confidence, self.__interval_method)
+            latencies = get_percentiles(self.__guess_times.get(solver_name, []))
+            stopped = " (stopped early)" if solver_name in self.__stopped else ""
 
-            rows.append([solver_name, f"{100 * success_rate:.2f}%", f"{avg_score:.2f}"])
+            rows.append([solver_name, f"{stats.n_games}{stopped}",
+                         f"{100 * stats.success_rate:.2f}% ({100 * success_low:.2f} - {100 * success_high:.2f})",
+                         f"{stats.average_score:.2f}",
+                         f"{stats.average_turns:.3f} ({turns_low:.3f} - {turns_high:.3f})",
+                         " / ".join(f"{1000 * latency:.3f}" for latency in latencies)])
 
-        rows.sort(key=lambda x: x[2], reverse=True)  # this is so wrong but ok
         # Create header row and separator
         header_row = "| " + " | ".join(headers) + " |"
         separator = "| " + " | ".join(["---"] * len(headers)) + " |"
@@ -63,6 +248,20 @@ class Benchmark:
 
         print(markdown_table)
 
+    def dump_results(self, stats_arr: list[tuple[str, ScoreStats]], filepath: str):
+        """Result table as JSON, solvers in the same order as in the printed table"""
+        results = []
+        for solver_name, stats in self.__sort_results(stats_arr):
+            result = {"solver": solver_name, "stopped_early": solver_name in self.__stopped}
+            result.update(stats.to_dict(self.__confidence, self.__interval_method))
+            latencies = get_percentiles(self.__guess_times.get(solver_name, []))
+            result["guess_latency"] = {f"p{p}": None if math.isnan(latency) else latency
+                                       for p, latency in zip(PERCENTILES, latencies)}
+            results.append(result)
+        with open(filepath, 'w') as f:
+            json.dump({"confidence": self.__confidence, "interval_method": self.__interval_method.value,
+                       "hard_mode": self.__hard_mode, "results": results}, f, indent=2)
+
 
 if __name__ == "__main__":
     from random_solver import RandomSolver
@@ -77,6 +276,7 @@ if __name__ == "__main__":
     b = Benchmark(
         solver_arr=(solver_random_accepted, solver_random_all, solver_dist_hamming, solver_dist_freq, solver_entropy),
         n_tries=2309,
-        seed=1
+        seed=1,
+        n_workers=os.cpu_count()
     )
     b.analyze_solver()
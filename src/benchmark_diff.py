@@ -0,0 +1,76 @@
+"""
+Compare two benchmark runs recorded with `Benchmark(..., records_filepath=...)`, game by game.
+
+    python benchmark_diff.py base.jsonl new.jsonl --latency-threshold 0.1
+
+Exits with status 1 if any solver got a worse score on some secret word, or got slower per guess on average
+by more than the latency threshold (relative).
+"""
+import sys
+import argparse
+from collections import defaultdict
+
+from benchmark_records import GameRecord, read_game_records
+from benchmark_stats import get_turns
+
+
+def load_records(filepath: str) -> dict[str, dict[str, GameRecord]]:
+    records = defaultdict(dict)
+    for record in read_game_records(filepath):
+        records[record.solver][record.secret] = record
+    return records
+
+
+def mean(values) -> float:
+    values = list(values)
+    return sum(values) / len(values) if values else 0.
+
+
+def diff_records(records_base: dict[str, dict[str, GameRecord]], records_new: dict[str, dict[str, GameRecord]],
+                 latency_threshold: float) -> tuple[list[str], list[str]]:
+    """Returns lines of the report and lines describing regressions"""
+    report = []
+    regressions = []
+    for solver in sorted(set(records_base) | set(records_new)):
+        games_base = records_base.get(solver, {})
+        games_new = records_new.get(solver, {})
+        common = sorted(set(games_base) & set(games_new))
+        if len(common) != len(games_base) or len(common) != len(games_new):
+            report.append(f"{solver}: {len(games_base) - len(common)} games only in base, "
+                          f"{len(games_new) - len(common)} games only in new")
+        if not common:
+            continue
+
+        score_base = mean(get_turns(games_base[word].score) for word in common)
+        score_new = mean(get_turns(games_new[word].score) for word in common)
+        latency_base = mean(t for word in common for t in games_base[word].guess_times)
+        latency_new = mean(t for word in common for t in games_new[word].guess_times)
+        worse = [word for word in common if get_turns(games_new[word].score) > get_turns(games_base[word].score)]
+        better = [word for word in common if get_turns(games_new[word].score) < get_turns(games_base[word].score)]
+        report.append(f"{solver}: {len(common)} games, average turns {score_base:.3f} -> {score_new:.3f}, "
+                      f"{len(better)} better / {len(worse)} worse, "
+                      f"latency per guess {1000 * latency_base:.3f}ms -> {1000 * latency_new:.3f}ms")
+
+        for word in worse:
+            regressions.append(f"{solver}: score regression on '{word}', "
+                               f"{games_base[word].guesses} -> {games_new[word].guesses}")
+        if latency_base > 0 and latency_new > latency_base * (1 + latency_threshold):
+            regressions.append(f"{solver}: latency regression, {1000 * latency_base:.3f}ms -> "
+                               f"{1000 * latency_new:.3f}ms per guess (+{100 * (latency_new / latency_base - 1):.1f}%)")
+    return report, regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two benchmark record files")
+    parser.add_argument("base", help="records of the baseline run (.jsonl or .csv)")
+    parser.add_argument("new", help="records of the new run (.jsonl or .csv)")
+    parser.add_argument("--latency-threshold", type=float, default=0.1,
+                        help="allowed relative increase of the mean guess latency (default: 0.1)")
+    args = parser.parse_args()
+
+    report, regressions = diff_records(load_records(args.base), load_records(args.new), args.latency_threshold)
+    print("\n".join(report))
+    if regressions:
+        print(f"\n{len(regressions)} regressions:")
+        print("\n".join(regressions))
+        sys.exit(1)
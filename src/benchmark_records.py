@@ -0,0 +1,64 @@
+import csv
+import json
+from typing import Iterator
+
+
+class GameRecord:
+    """Result of a single benchmark game, `score` is number of turns it took to guess the word or -1 if lost"""
+    FIELDS = ("solver", "secret", "seed", "score", "guesses", "guess_times")
+
+    def __init__(self, solver: str, secret: str, seed: str, score: int, guesses: list[str],
+                 guess_times: list[float]):
+        self.solver = solver
+        self.secret = secret
+        self.seed = seed
+        self.score = score
+        self.guesses = guesses
+        self.guess_times = guess_times
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @staticmethod
+    def from_dict(data: dict) -> "GameRecord":
+        return GameRecord(**{field: data[field] for field in GameRecord.FIELDS})
+
+
+class GameRecordWriter:
+    """Streams game records to a JSONL file, or CSV if `filepath` ends with .csv (lists are space separated)"""
+
+    def __init__(self, filepath: str):
+        self.__is_csv = filepath.endswith(".csv")
+        self.__file = open(filepath, 'w', newline='')
+        self.__csv_writer = None
+        if self.__is_csv:
+            self.__csv_writer = csv.writer(self.__file)
+            self.__csv_writer.writerow(GameRecord.FIELDS)
+
+    def write(self, record: GameRecord):
+        if self.__is_csv:
+            self.__csv_writer.writerow([record.solver, record.secret, record.seed, record.score,
+                                        " ".join(record.guesses), " ".join(f"{t:.6f}" for t in record.guess_times)])
+        else:
+            self.__file.write(json.dumps(record.to_dict()) + "\n")
+
+    def close(self):
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def read_game_records(filepath: str) -> Iterator[GameRecord]:
+    with open(filepath, 'r', newline='') as f:
+        if filepath.endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield GameRecord(row["solver"], row["secret"], row["seed"], int(row["score"]),
+                                 row["guesses"].split(), [float(t) for t in row["guess_times"].split()])
+        else:
+            for line in f:
+                if line.strip():
+                    yield GameRecord.from_dict(json.loads(line))
@@ -0,0 +1,155 @@
+"""
+Streaming statistics of benchmark scores. Games are added one by one and only the score histogram and running
+moments are kept, so statistics (and confidence intervals) can be checked while a run is still in progress.
+"""
+import math
+from enum import Enum
+from statistics import NormalDist
+from collections import Counter
+
+import numpy as np
+
+from constants import NUMBER_OF_TURNS
+
+
+def get_turns(score: int) -> int:
+    # lost game is counted as one turn more than allowed
+    return score if score != -1 else NUMBER_OF_TURNS + 1
+
+
+def get_z(confidence: float) -> float:
+    """Two-sided standard normal quantile, e.g. 1.96 for 0.95"""
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def get_wilson_interval(n_successes: int, n: int, confidence: float) -> tuple[float, float]:
+    """Wilson score interval of a success rate, stays within [0, 1] and is sensible even for 0 or n successes"""
+    if n == 0:
+        return 0., 1.
+    z = get_z(confidence)
+    p = n_successes / n
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(0., center - half_width), min(1., center + half_width)
+
+
+class RunningStats:
+    """Running mean and variance of a stream of values (Welford's algorithm)"""
+
+    def __init__(self):
+        self.__n = 0
+        self.__mean = 0.
+        self.__m2 = 0.
+
+    def add(self, value: float):
+        self.__n += 1
+        delta = value - self.__mean
+        self.__mean += delta / self.__n
+        self.__m2 += delta * (value - self.__mean)
+
+    @property
+    def n(self) -> int:
+        return self.__n
+
+    @property
+    def mean(self) -> float:
+        return self.__mean if self.__n > 0 else math.nan
+
+    @property
+    def variance(self) -> float:
+        """Sample variance"""
+        return self.__m2 / (self.__n - 1) if self.__n > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def get_interval(self, confidence: float) -> tuple[float, float]:
+        """Normal approximation interval of the mean, unbounded until there are two values"""
+        if self.__n < 2:
+            return -math.inf, math.inf
+        half_width = get_z(confidence) * self.std / math.sqrt(self.__n)
+        return self.__mean - half_width, self.__mean + half_width
+
+
+class IntervalMethod(Enum):
+    # mean +- z * standard error, from the running variance
+    NORMAL = "normal"
+    # percentiles of the means of samples resampled from the score histogram
+    BOOTSTRAP = "bootstrap"
+
+
+class ScoreStats:
+    """
+    Score histogram and running statistics of the games of a solver. Average score is over won games only
+    (as in the result table), average turns is over all games with a lost game counted as `NUMBER_OF_TURNS` + 1
+    (so it accounts for losses too, and is what solvers are compared by).
+    """
+
+    def __init__(self):
+        self.__score_counter = Counter()
+        self.__turns = RunningStats()
+        self.__won_turns = RunningStats()
+
+    def add(self, score: int):
+        self.__score_counter[score] += 1
+        self.__turns.add(get_turns(score))
+        if score != -1:
+            self.__won_turns.add(score)
+
+    @property
+    def score_counter(self) -> Counter:
+        return self.__score_counter
+
+    @property
+    def n_games(self) -> int:
+        return self.__turns.n
+
+    @property
+    def n_won(self) -> int:
+        return self.__won_turns.n
+
+    @property
+    def success_rate(self) -> float:
+        return self.n_won / self.n_games if self.n_games > 0 else math.nan
+
+    @property
+    def average_score(self) -> float:
+        return self.__won_turns.mean
+
+    @property
+    def average_turns(self) -> float:
+        return self.__turns.mean
+
+    def get_success_rate_interval(self, confidence: float = 0.95) -> tuple[float, float]:
+        return get_wilson_interval(self.n_won, self.n_games, confidence)
+
+    def get_average_turns_interval(self, confidence: float = 0.95, method: IntervalMethod = IntervalMethod.NORMAL,
+                                   n_resamples: int = 2000, seed: int = 0) -> tuple[float, float]:
+        if method == IntervalMethod.NORMAL or self.n_games == 0:
+            return self.__turns.get_interval(confidence)
+        # a resample is a multinomial draw of n games from the histogram, so games don't have to be kept
+        scores = sorted(self.__score_counter)
+        turns = np.array([get_turns(score) for score in scores], dtype=float)
+        probabilities = np.array([self.__score_counter[score] for score in scores]) / self.n_games
+        counts = np.random.default_rng(seed).multinomial(self.n_games, probabilities, size=n_resamples)
+        means = counts @ turns / self.n_games
+        low, high = np.quantile(means, [(1 - confidence) / 2, (1 + confidence) / 2])
+        return float(low), float(high)
+
+    def to_dict(self, confidence: float = 0.95, method: IntervalMethod = IntervalMethod.NORMAL) -> dict:
+        """JSON friendly summary, undefined values (e.g. intervals of less than two games) are None"""
+        def finite(value: float) -> float | None:
+            return value if math.isfinite(value) else None
+
+        return {
+            "games": self.n_games,
+            "won": self.n_won,
+            "success_rate": finite(self.success_rate),
+            "success_rate_interval": [finite(x) for x in self.get_success_rate_interval(confidence)],
+            "average_score": finite(self.average_score),
+            "average_turns": finite(self.average_turns),
+            "average_turns_interval": [finite(x) for x in self.get_average_turns_interval(confidence, method)],
+            "score_counts": {str(score): cnt for score, cnt in sorted(self.__score_counter.items())},
+        }
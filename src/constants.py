@@ -1,3 +1,4 @@
 WORD_LENGTH = 5
 NUMBER_OF_TURNS = 6
 CHARS = tuple(chr(ord('a') + i) for i in range(26))
+NUMBER_OF_PATTERNS = 3 ** WORD_LENGTH
@@ -0,0 +1,91 @@
+import json
+from enum import Enum
+from collections import OrderedDict
+
+
+class EvictionPolicy(Enum):
+    # evict the entry which was used least recently
+    LRU = "lru"
+    # evict the entry which was added first, lookups don't refresh entries
+    FIFO = "fifo"
+
+
+class DecisionCache:
+    """
+    Bounded map from a key of the solver and the canonical state key (see `Solver.get_cache_key`) to the guess
+    the solver made in that state. Keys are namespaced by solver, so a cache can be shared by several solvers.
+    """
+
+    def __init__(self, capacity: int = 2 ** 11, policy: EvictionPolicy = EvictionPolicy.LRU):
+        if capacity <= 0:
+            raise ValueError(f"Cache capacity must be positive, got {capacity}")
+        self.__capacity = capacity
+        self.__policy = policy
+        self.__entries: OrderedDict[str, str] = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def get(self, key: str) -> str | None:
+        guess = self.__entries.get(key)
+        if guess is None:
+            self.__misses += 1
+            return None
+        self.__hits += 1
+        if self.__policy == EvictionPolicy.LRU:
+            self.__entries.move_to_end(key)
+        return guess
+
+    def put(self, key: str, guess: str):
+        if key in self.__entries:
+            self.__entries[key] = guess
+            if self.__policy == EvictionPolicy.LRU:
+                self.__entries.move_to_end(key)
+            return
+        if len(self.__entries) >= self.__capacity:
+            self.__entries.popitem(last=False)
+            self.__evictions += 1
+        self.__entries[key] = guess
+
+    def clear(self):
+        self.__entries.clear()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__entries
+
+    @property
+    def capacity(self) -> int:
+        return self.__capacity
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @property
+    def evictions(self) -> int:
+        return self.__evictions
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self), "capacity": self.__capacity, "hits": self.__hits, "misses": self.__misses,
+                "evictions": self.__evictions}
+
+    def dump(self, filepath: str):
+        # entries are saved from the oldest to the newest, so warming keeps the eviction order
+        with open(filepath, 'w') as f:
+            json.dump({"entries": list(self.__entries.items())}, f)
+
+    def warm(self, filepath: str):
+        """Add entries dumped by `dump` (evicted by the policy of this cache), counters are not affected"""
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+        evictions = self.__evictions
+        for key, guess in data["entries"]:
+            self.put(key, guess)
+        self.__evictions = evictions
@@ -1,22 +1,15 @@
-from collections import Counter
-from functools import lru_cache
+from enum import Enum, auto
+
+import numpy as np
 
 from solver import Solver
-from constants import WORD_LENGTH
+from constants import WORD_LENGTH, CHARS
 from constants import NUMBER_OF_TURNS
 from wordle import State
-from enum import Enum, auto
-
-
-class DistanceMatrixDict(dict):
-    def __init__(self, func):
-        super().__init__()
-        self.func = func
-
-    def __getitem__(self, key):
-        if key not in self:
-            self[key] = self.func(*key)
-        return super().__getitem__(key)
+from decision_cache import DecisionCache
+from pattern_kernel import encode_words
+from resources import LazyResource
+from utils import load_all_words, load_accepted_words
 
 
 class DistanceMetric(Enum):
@@ -24,52 +17,85 @@ class DistanceMetric(Enum):
     FREQ_DISTANCE = auto()
 
 
+def hamming_distances(codes: np.ndarray, other_codes: np.ndarray) -> np.ndarray:
+    """Number of positions with different letters, for every pair of encoded words"""
+    dist = np.zeros((len(codes), len(other_codes)), dtype=np.uint8)
+    for i in range(WORD_LENGTH):
+        dist += codes[:, i, np.newaxis] != other_codes[np.newaxis, :, i]
+    return dist
+
+
+def freq_distances(codes: np.ndarray, other_codes: np.ndarray) -> np.ndarray:
+    """Number of letters (with repeats) of a word which can't be matched with letters of the other word"""
+    letters = np.arange(len(CHARS), dtype=np.uint8)
+    histograms = (codes[:, :, np.newaxis] == letters).sum(axis=1, dtype=np.uint8)
+    other_histograms = (other_codes[:, :, np.newaxis] == letters).sum(axis=1, dtype=np.uint8)
+    common = np.minimum(histograms[:, np.newaxis, :], other_histograms[np.newaxis, :, :]).sum(axis=2, dtype=np.uint8)
+    return WORD_LENGTH - common
+
+
+class DistanceMatrix:
+    """Distance between every word of `words_all` (rows) and every word of `words_accepted` (columns)"""
+
+    def __init__(self, distance_metric: DistanceMetric, words_all: tuple[str, ...], words_accepted: tuple[str, ...],
+                 chunk_size: int = 256):
+        distance_f = hamming_distances if distance_metric == DistanceMetric.HAMMING_DISTANCE else freq_distances
+        self.__all_index = {word: i for i, word in enumerate(words_all)}
+        self.__accepted_index = {word: i for i, word in enumerate(words_accepted)}
+
+        all_codes = encode_words(words_all)
+        accepted_codes = encode_words(words_accepted)
+        self.__matrix = np.empty((len(words_all), len(words_accepted)), dtype=np.uint8)
+        for start in range(0, len(words_all), chunk_size):
+            self.__matrix[start:start + chunk_size] = distance_f(all_codes[start:start + chunk_size], accepted_codes)
+        self.__row_totals = self.__matrix.sum(axis=1, dtype=np.int64)
+
+    def get_total_distances(self, words: tuple[str, ...], other_words: tuple[str, ...]) -> np.ndarray:
+        """Sum of distances from every word of `words` to all `other_words`"""
+        ids = np.fromiter((self.__all_index[word] for word in words), dtype=np.intp, count=len(words))
+        other_mask = np.zeros(self.__matrix.shape[1], dtype=bool)
+        other_mask[[self.__accepted_index[word] for word in other_words]] = True
+
+        # sum over the smaller side: either kept columns, or all columns minus the excluded ones
+        if len(other_words) <= self.__matrix.shape[1] // 2:
+            return self.__matrix[np.ix_(ids, np.flatnonzero(other_mask))].sum(axis=1, dtype=np.int64)
+        excluded = self.__matrix[np.ix_(ids, np.flatnonzero(~other_mask))].sum(axis=1, dtype=np.int64)
+        return self.__row_totals[ids] - excluded
+
+
+# matrices are built on the first use of a metric and shared between solver instances
+DISTANCE_MATRICES: dict[DistanceMetric, LazyResource[DistanceMatrix]] = {
+    distance_metric: LazyResource(lambda distance_metric=distance_metric: DistanceMatrix(
+        distance_metric, load_all_words(), load_accepted_words()))
+    for distance_metric in DistanceMetric
+}
+
+
+def get_distance_matrix(distance_metric: DistanceMetric) -> DistanceMatrix:
+    return DISTANCE_MATRICES[distance_metric].get()
+
+
 class DistSolver(Solver):
     __SOLVER_NAME = "DistanceSolver"
 
-    def __init__(self, distance_metric: DistanceMetric):
-        super().__init__(solver_name=f"{self.__SOLVER_NAME}({distance_metric})")
-        distance_metric_f = None
-        if distance_metric == DistanceMetric.HAMMING_DISTANCE:
-            distance_metric_f = self.__hamming_distance
-        elif distance_metric == DistanceMetric.FREQ_DISTANCE:
-            distance_metric_f = self.__freq_distance
-
+    def __init__(self, distance_metric: DistanceMetric, cache: DecisionCache = None):
+        super().__init__(solver_name=f"{self.__SOLVER_NAME}({distance_metric})",
+                         cache=DecisionCache() if cache is None else cache)
         self.__distance_metric = distance_metric
-        self.__distance_matrix = DistanceMatrixDict(distance_metric_f)
+        # built upfront, so that the first guess isn't slow
+        get_distance_matrix(distance_metric)
 
-    @lru_cache(maxsize=2 ** 11)
-    def make_guess(self, state: State) -> str:
+    def _make_guess(self, state: State) -> str:
         if NUMBER_OF_TURNS - state.turns_left < 2:
-            dist_arr = [(sum([self.__distance_matrix[min(word, word_dist), max(word, word_dist)] for word_dist in
-                              state.words_accepted]), word) for word in state.words_all]
+            words = state.words_all
         else:
-            dist_arr = [(sum([self.__distance_matrix[min(word, word_dist), max(word, word_dist)] for word_dist in
-                              state.words_accepted]), word) for word in state.words_accepted]
-
-        dist, word = min(dist_arr)
-        return word
-
-    @staticmethod
-    def __hamming_distance(word: str, other_words: str) -> int:
-        dist = 0
-        for i in range(WORD_LENGTH):
-            dist += word[i] != other_words[i]
-        return dist
-
-    @staticmethod
-    def __freq_distance(word: str, other_words: str) -> int:
-        dist = 0
-        word = Counter(word)
-        other_words = Counter(other_words)
-        for char, char_cnt in other_words.items():
-            dist += min(word[char], char_cnt)
-        return WORD_LENGTH - dist
-
-    def __hash__(self):
-        # bad idea, but just to make cache work
-        return hash(self.__distance_metric)
-
-    def __eq__(self, other):
-        # just to make cache work
-        return isinstance(self, other.__class__) and self.__distance_metric == other.__distance_metric
+            words = state.words_accepted
+
+        dist_arr = get_distance_matrix(self.__distance_metric).get_total_distances(words, state.words_accepted)
+        # smallest word among the closest ones, same as min() over (distance, word) pairs
+        return min(words[i] for i in np.flatnonzero(dist_arr == dist_arr.min()).tolist())
+
+    def __reduce__(self):
+        # distance matrix is shared by all instances of the process, so don't send it along with the solver
+        # (e.g. to benchmark worker processes)
+        return self.__class__, (self.__distance_metric, self.cache)
@@ -0,0 +1,106 @@
+"""
+Load test of a running hint server: `--clients` concurrent clients play whole games through the server,
+then throughput and latency percentiles of the requests are printed.
+
+    python hint_server.py --port 8765 --workers 4 &
+    python hint_load.py --port 8765 --clients 32 --games 500 --protocol http
+"""
+import json
+import time
+import random
+import asyncio
+import argparse
+
+from constants import NUMBER_OF_TURNS, NUMBER_OF_PATTERNS
+from utils import load_accepted_words, word_to_pattern_value
+from metrics import get_percentiles
+
+
+class HintClient:
+    """Single connection to the hint server, requests are sent one at a time"""
+
+    def __init__(self, host: str, port: int, protocol: str):
+        self.__host = host
+        self.__port = port
+        self.__protocol = protocol
+        self.__reader: asyncio.StreamReader = None
+        self.__writer: asyncio.StreamWriter = None
+
+    async def connect(self):
+        self.__reader, self.__writer = await asyncio.open_connection(self.__host, self.__port)
+
+    async def close(self):
+        self.__writer.close()
+        await self.__writer.wait_closed()
+
+    async def get_hint(self, solver_name: str, history: list[list]) -> dict:
+        body = json.dumps({"solver": solver_name, "history": history}).encode()
+        if self.__protocol == "line":
+            self.__writer.write(body + b"\n")
+            await self.__writer.drain()
+            return json.loads(await self.__reader.readline())
+
+        self.__writer.write(f"POST /hint HTTP/1.1\r\nHost: {self.__host}\r\nContent-Type: application/json\r\n"
+                            f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        await self.__writer.drain()
+        await self.__reader.readline()  # status line, errors are in the body too
+        content_length = 0
+        while (line := await self.__reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                content_length = int(value)
+        return json.loads(await self.__reader.readexactly(content_length))
+
+
+async def play_games(client: HintClient, solver_name: str, words_secret: list[str],
+                     latencies: list[float]) -> int:
+    """Plays every secret word through the server, returns number of games won"""
+    n_won = 0
+    for word_secret in words_secret:
+        history = []
+        for _ in range(NUMBER_OF_TURNS):
+            start = time.perf_counter()
+            response = await client.get_hint(solver_name, history)
+            latencies.append(time.perf_counter() - start)
+            if "error" in response:
+                raise RuntimeError(f"Server error for {history}: {response['error']}")
+            pattern_val = word_to_pattern_value(response["guess"], word_secret)
+            if pattern_val == NUMBER_OF_PATTERNS - 1:
+                n_won += 1
+                break
+            history.append([response["guess"], pattern_val])
+    return n_won
+
+
+async def run_load_test(host: str, port: int, protocol: str, solver_name: str, n_clients: int, n_games: int,
+                        seed: int):
+    words_secret = random.Random(seed).choices(load_accepted_words(), k=n_games)
+    clients = [HintClient(host, port, protocol) for _ in range(n_clients)]
+    await asyncio.gather(*(client.connect() for client in clients))
+    latencies = []
+    start = time.perf_counter()
+    try:
+        # games are dealt round robin, so that every client plays about the same number of games
+        n_won = await asyncio.gather(*(play_games(client, solver_name, words_secret[i::n_clients], latencies)
+                                       for i, client in enumerate(clients)))
+    finally:
+        await asyncio.gather(*(client.close() for client in clients))
+    elapsed = time.perf_counter() - start
+
+    p50, p95, p99 = get_percentiles(latencies)
+    print(f"{len(latencies)} requests ({n_games} games, {sum(n_won)} won) from {n_clients} clients "
+          f"in {elapsed:.2f}s: {len(latencies) / elapsed:.1f} requests/s")
+    print(f"latency p50 / p95 / p99: {1000 * p50:.2f} / {1000 * p95:.2f} / {1000 * p99:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test a running hint server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--protocol", choices=("http", "line"), default="http")
+    parser.add_argument("--solver", default="entropy")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run_load_test(args.host, args.port, args.protocol, args.solver, args.clients, args.games, args.seed))
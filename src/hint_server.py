@@ -0,0 +1,256 @@
+"""
+Hint server: returns the next guess of a solver for a game history of (guess, pattern) pairs.
+
+    python hint_server.py --port 8765 --workers 4
+
+Every connection speaks either HTTP or a line protocol, which is picked by its first line:
+  * HTTP: `POST /hint` with a JSON request body, `GET /health`, `GET /stats`
+  * line protocol: one JSON request per line, one JSON response per line
+
+Request: {"solver": "entropy", "history": [["slate", "01020"], ["crane", 12]]}, a pattern is either its value
+or a string of per-letter states (0 - grey, 1 - yellow, 2 - green). Response: {"guess": "...", "remaining": n}
+or {"error": "..."}, HTTP answers 400 to invalid requests and 500 if computing the hint failed.
+
+Word lists and pattern table are loaded once, worker processes are forked with them already loaded (pattern table
+is memory mapped, so it's shared). Scoring runs in the worker pool, identical requests in flight are coalesced
+into a single computation.
+"""
+import json
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from constants import NUMBER_OF_TURNS, NUMBER_OF_PATTERNS, WORD_LENGTH
+from solver import Solver
+from state import PatternState
+from pattern_matrix import get_pattern_matrix
+from entropy_solver import EntropySolver
+from lookahead_solver import LookaheadSolver
+from tree_solver import DecisionTreeSolver
+
+# (word, pattern value) of every guess made so far
+History = tuple[tuple[str, int], ...]
+
+SOLVER_FACTORIES = {
+    "entropy": EntropySolver,
+    "entropy_easy": lambda: EntropySolver(hard_mode=False),
+    "lookahead": lambda: LookaheadSolver(top_k=10, time_budget=0.05),
+    "tree": DecisionTreeSolver,
+}
+DEFAULT_SOLVER = "entropy"
+MAX_REQUEST_SIZE = 2 ** 16
+
+
+class HintService:
+    """Solvers sharing a single initial `PatternState`, solvers are created on first use"""
+
+    def __init__(self):
+        self.__initial_state = PatternState(get_pattern_matrix())
+        self.__solvers: dict[str, Solver] = dict()
+
+    def get_hint(self, solver_name: str, history: History) -> tuple[str, int]:
+        """Next guess and number of remaining secrets, raises ValueError for invalid requests"""
+        if solver_name not in SOLVER_FACTORIES:
+            raise ValueError(f"Unknown solver '{solver_name}', expected one of {sorted(SOLVER_FACTORIES)}")
+        if len(history) >= NUMBER_OF_TURNS:
+            raise ValueError(f"Game is over after {NUMBER_OF_TURNS} guesses")
+
+        state = self.__initial_state
+        for word, pattern_val in history:
+            try:
+                state = state.advance(word, pattern_val)
+            except KeyError:
+                raise ValueError(f"Word '{word}' is not in the word list")
+        if len(state.accepted_ids) == 0:
+            raise ValueError("No word matches the history")
+
+        solver = self.__solvers.get(solver_name)
+        if solver is None:
+            solver = self.__solvers[solver_name] = SOLVER_FACTORIES[solver_name]()
+        return solver.make_guess(state), len(state.accepted_ids)
+
+
+# hint service of a worker process, see `init_worker`
+_worker_service: HintService = None
+
+
+def init_worker():
+    global _worker_service
+    _worker_service = HintService()
+
+
+def get_hint_worker(solver_name: str, history: History) -> tuple[str, int]:
+    return _worker_service.get_hint(solver_name, history)
+
+
+def parse_pattern(pattern) -> int:
+    if isinstance(pattern, str):
+        if len(pattern) != WORD_LENGTH or any(c not in "012" for c in pattern):
+            raise ValueError(f"Pattern '{pattern}' should be {WORD_LENGTH} digits of 0, 1 or 2")
+        # i-th letter is the i-th trit, same as `pattern_value_to_pattern_arr`
+        return sum(int(c) * 3 ** i for i, c in enumerate(pattern))
+    if not isinstance(pattern, int) or isinstance(pattern, bool) or not 0 <= pattern < NUMBER_OF_PATTERNS:
+        raise ValueError(f"Pattern value should be in [0, {NUMBER_OF_PATTERNS}), got {pattern!r}")
+    return pattern
+
+
+def parse_request(data: bytes) -> tuple[str, History]:
+    try:
+        request = json.loads(data)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Request is not valid JSON: {e}")
+    if not isinstance(request, dict):
+        raise ValueError("Request should be a JSON object")
+    solver_name = request.get("solver", DEFAULT_SOLVER)
+    history = request.get("history", [])
+    if not isinstance(solver_name, str) or not isinstance(history, list):
+        raise ValueError("'solver' should be a string and 'history' a list")
+    parsed = []
+    for item in history:
+        if not isinstance(item, list) or len(item) != 2 or not isinstance(item[0], str):
+            raise ValueError(f"History item should be [word, pattern], got {item!r}")
+        parsed.append((item[0].lower(), parse_pattern(item[1])))
+    return solver_name, tuple(parsed)
+
+
+class HintServer:
+    """Serves hints from a process pool, concurrent requests with the same solver and history share one result"""
+
+    def __init__(self, n_workers: int = 1):
+        # loaded before the workers are forked, so that they don't have to load it again
+        get_pattern_matrix()
+        self.__executor = ProcessPoolExecutor(max_workers=n_workers, initializer=init_worker)
+        self.__in_flight: dict[tuple[str, History], asyncio.Future] = dict()
+        self.__n_requests = 0
+        self.__n_coalesced = 0
+        self.__n_errors = 0
+
+    def stats(self) -> dict[str, int]:
+        return {"requests": self.__n_requests, "coalesced": self.__n_coalesced, "errors": self.__n_errors,
+                "in_flight": len(self.__in_flight)}
+
+    async def get_hint(self, solver_name: str, history: History) -> tuple[str, int]:
+        key = (solver_name, history)
+        future = self.__in_flight.get(key)
+        if future is not None:
+            self.__n_coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().run_in_executor(self.__executor, get_hint_worker, solver_name, history)
+        self.__in_flight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self.__in_flight.pop(key, None)
+
+    async def respond(self, data: bytes) -> dict:
+        return (await self.__respond(data))[1]
+
+    async def __respond(self, data: bytes) -> tuple[int, dict]:
+        """HTTP status and response"""
+        # counted before parsing, so that every error is also a request
+        self.__n_requests += 1
+        try:
+            guess, remaining = await self.get_hint(*parse_request(data))
+            return 200, {"guess": guess, "remaining": remaining}
+        except ValueError as e:
+            self.__n_errors += 1
+            return 400, {"error": str(e)}
+        except Exception as e:
+            # e.g. a worker crashed, the client still gets an answer
+            self.__n_errors += 1
+            return 500, {"error": f"Internal error: {e!r}"}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            line = await reader.readline()
+            if line.startswith((b"GET ", b"POST ")):
+                await self.__handle_http(line, reader, writer)
+            else:
+                while line:
+                    if line.strip():
+                        writer.write(json.dumps(await self.respond(line)).encode() + b"\n")
+                        await writer.drain()
+                    line = await reader.readline()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def __handle_http(self, request_line: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # HTTP/1.1 keep-alive, requests on a connection are answered one after another
+        while request_line:
+            parts = request_line.decode("latin-1").split()
+            if len(parts) != 3:
+                await self.__write_http(writer, 400, {"error": "Malformed request line"}, close=True)
+                return
+            headers = dict()
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            try:
+                body_size = int(headers.get("content-length", 0))
+            except ValueError:
+                body_size = -1
+            if body_size < 0:
+                await self.__write_http(writer, 400, {"error": "Content-Length should be a non-negative integer"},
+                                        close=True)
+                return
+            if body_size > MAX_REQUEST_SIZE:
+                await self.__write_http(writer, 413, {"error": "Request is too large"}, close=True)
+                return
+            body = await reader.readexactly(body_size)
+
+            method, path, version = parts
+            if method == "POST" and path == "/hint":
+                status, response = await self.__respond(body)
+            elif method == "GET" and path == "/health":
+                status, response = 200, {"status": "ok"}
+            elif method == "GET" and path == "/stats":
+                status, response = 200, self.stats()
+            else:
+                status, response = 404, {"error": f"Unknown endpoint {method} {path}"}
+
+            close = headers.get("connection", "").lower() == "close" or version == "HTTP/1.0"
+            await self.__write_http(writer, status, response, close)
+            if close:
+                return
+            request_line = await reader.readline()
+            # empty lines before a request line are allowed (RFC 7230, section 3.5)
+            while request_line in (b"\r\n", b"\n"):
+                request_line = await reader.readline()
+
+    @staticmethod
+    async def __write_http(writer: asyncio.StreamWriter, status: int, response: dict, close: bool):
+        reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+                   500: "Internal Server Error"}
+        body = json.dumps(response).encode()
+        head = (f"HTTP/1.1 {status} {reasons[status]}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: {'close' if close else 'keep-alive'}\r\n\r\n")
+        writer.write(head.encode() + body)
+        await writer.drain()
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_REQUEST_SIZE)
+        print(f"Serving hints on {host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        """Stop the worker processes, requests still in flight are cancelled"""
+        self.__executor.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve next guess hints over HTTP or a JSON line protocol")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes scoring guesses")
+    args = parser.parse_args()
+    try:
+        asyncio.run(HintServer(args.workers).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
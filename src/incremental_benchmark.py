@@ -0,0 +1,52 @@
+"""
+Per-turn latency of `EntropySolver` with and without incremental histograms, on every accepted word.
+Opening books are off and decision cache is cleared before every game, so that every state of the game is scored
+(a book guess on turn 2 would leave nothing to narrow on turn 3).
+
+    python incremental_benchmark.py [--easy]
+"""
+import argparse
+from collections import defaultdict
+
+from constants import NUMBER_OF_TURNS
+from entropy_solver import EntropySolver
+from simulation import SimulationEngine
+
+
+def get_turn_times(engine: SimulationEngine, solver: EntropySolver, words: tuple[str, ...],
+                   hard_mode: bool) -> tuple[dict[int, list[float]], list[list[str]]]:
+    turn_times = defaultdict(list)
+    guesses = []
+    solver.set_opening_books(dict())
+    for i, word_secret in enumerate(words):
+        solver.cache.clear()
+        record = engine.play(solver, word_secret, seed=i, hard_mode=hard_mode)
+        for turn, guess_time in enumerate(record.guess_times, 1):
+            turn_times[turn].append(guess_time)
+        guesses.append(record.guesses)
+    return turn_times, guesses
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare EntropySolver with and without incremental histograms")
+    parser.add_argument("--easy", action="store_true", help="play in easy mode (every allowed word is scored)")
+    args = parser.parse_args()
+
+    engine = SimulationEngine()
+    words = engine.get_initial_state().words_accepted
+    hard_mode = not args.easy
+    times_full, guesses_full = get_turn_times(engine, EntropySolver(hard_mode=hard_mode, incremental=False),
+                                              words, hard_mode)
+    times_incr, guesses_incr = get_turn_times(engine, EntropySolver(hard_mode=hard_mode, incremental=True),
+                                              words, hard_mode)
+    if guesses_full != guesses_incr:
+        raise AssertionError("incremental histograms changed the guesses")
+
+    print("| Turn | Guesses | Full (ms) | Incremental (ms) | Saving |")
+    print("| --- | --- | --- | --- | --- |")
+    for turn in range(1, NUMBER_OF_TURNS + 1):
+        if not times_full[turn]:
+            continue
+        full = 1000 * sum(times_full[turn]) / len(times_full[turn])
+        incr = 1000 * sum(times_incr[turn]) / len(times_incr[turn])
+        print(f"| {turn} | {len(times_full[turn])} | {full:.3f} | {incr:.3f} | {100 * (1 - incr / full):.1f}% |")
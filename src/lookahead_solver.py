@@ -0,0 +1,101 @@
+import time
+
+import numpy as np
+
+from solver import Solver
+from constants import NUMBER_OF_TURNS, NUMBER_OF_PATTERNS
+from wordle import State
+from decision_cache import DecisionCache
+from pattern_matrix import get_pattern_matrix
+from scoring import get_pattern_histograms, calculate_entropies
+
+
+class LookaheadSolver(Solver):
+    """
+    Two-ply solver: the `top_k` guesses by entropy are scored by the expected number of remaining words after
+    this guess and the best possible follow-up guess for every pattern. Candidates are evaluated in entropy order,
+    and a candidate is dropped as soon as a lower bound of its score can't beat the best one found so far.
+    If `time_budget` (seconds per guess) runs out, the best fully evaluated candidate is returned,
+    which is the greedy (max entropy) guess if none was. Greedy scoring itself always runs to completion.
+    Guesses then depend on timing, so they are neither cached nor looked up in an opening book.
+    """
+    __SOLVER_NAME = "LookaheadSolver"
+
+    def __init__(self, top_k: int = 10, time_budget: float = None, cache: DecisionCache = None):
+        if cache is None and time_budget is None:
+            cache = DecisionCache()
+        super().__init__(f"{self.__SOLVER_NAME}(top_k={top_k})", cache)
+        self.__top_k = top_k
+        self.__time_budget = time_budget
+
+    @property
+    def is_deterministic(self) -> bool:
+        return self.__time_budget is None
+
+    @property
+    def config(self) -> str:
+        return f"{self.name}(time_budget={self.__time_budget})"
+
+    def _make_guess(self, state: State) -> str:
+        if state.turns_left == NUMBER_OF_TURNS:
+            # same first guess as EntropySolver, full lookahead over all words isn't worth it
+            return "slate"
+        words = state.words_accepted
+        if len(words) <= 2:
+            return words[0]
+
+        deadline = None if self.__time_budget is None else time.perf_counter() + self.__time_budget
+        pattern_matrix = get_pattern_matrix()
+        guess_ids = pattern_matrix.all_ids(words)
+        secret_ids = pattern_matrix.accepted_ids(words)
+
+        entropies = calculate_entropies(get_pattern_histograms(pattern_matrix.matrix, guess_ids, secret_ids))
+        # stable sort keeps word order among equal entropies, so the first candidate is the greedy guess
+        candidates = np.argsort(-entropies, kind="stable")[:self.__top_k]
+
+        best_score = float("inf")
+        best_idx = int(candidates[0])
+        for idx in candidates.tolist():
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            score = self.__get_expected_remaining(int(guess_ids[idx]), guess_ids, secret_ids, best_score, deadline)
+            if score is not None and score < best_score:
+                best_score = score
+                best_idx = idx
+        return words[best_idx]
+
+    def __get_expected_remaining(self, guess_id: int, guess_ids: np.ndarray, secret_ids: np.ndarray,
+                                 bound: float, deadline: float | None) -> float | None:
+        """
+        Expected number of remaining words after `guess_id` and the best second guess (both in hard mode).
+        Returns None if candidate is pruned (can't get below `bound`) or time ran out.
+        """
+        matrix = get_pattern_matrix().matrix
+        patterns = matrix[guess_id, secret_ids]
+        histogram = np.bincount(patterns, minlength=NUMBER_OF_PATTERNS)
+        histogram[NUMBER_OF_PATTERNS - 1] = 0  # guessed the word, nothing remains
+
+        # biggest buckets first, so that the bound is crossed as early as possible
+        bucket_patterns = np.flatnonzero(histogram)
+        bucket_patterns = bucket_patterns[np.argsort(-histogram[bucket_patterns], kind="stable")]
+        # every bucket leaves at least (size - 1) words after the best split: all but the guessed word are apart
+        lower_bound = float((histogram[bucket_patterns] - 1).sum())
+
+        bound_total = bound * len(secret_ids)
+        total = 0.
+        for pattern_val in bucket_patterns.tolist():
+            if deadline is not None and time.perf_counter() > deadline:
+                return None
+            bucket_mask = patterns == pattern_val
+            bucket_size = int(histogram[pattern_val])
+            lower_bound -= bucket_size - 1
+            if bucket_size <= 2:
+                # guessing one of the words leaves at most one word
+                total += bucket_size - 1
+            else:
+                histograms = get_pattern_histograms(matrix, guess_ids[bucket_mask], secret_ids[bucket_mask])
+                histograms[:, NUMBER_OF_PATTERNS - 1] = 0
+                total += float((histograms.astype(np.int64) ** 2).sum(axis=1).min())
+            if total + lower_bound >= bound_total:
+                return None
+        return total / len(secret_ids)
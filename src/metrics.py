@@ -0,0 +1,211 @@
+"""
+Opt-in instrumentation of the hot paths: per-turn timers around `Solver.make_guess(es)`, state updates, `check_word`
+and `Wordle.guess`, plus counters of scored candidates, pattern lookups and decision cache hits.
+
+    metrics = enable()
+    Benchmark(...).analyze_solver()
+    disable()
+    metrics.dump("metrics.json")  # or "metrics.prom" for Prometheus text format
+
+Instrumented functions are swapped in by `enable` and the originals are put back by `disable`, so nothing is
+collected (and nothing is paid for) while metrics are off. Metrics are collected in the current process only,
+so benchmarks have to run with `n_workers=1`.
+"""
+import sys
+import time
+import json
+from functools import wraps
+from collections import Counter, defaultdict
+
+import numpy as np
+
+import scoring
+from constants import NUMBER_OF_TURNS
+from solver import Solver
+from state import State, PatternState
+from wordle import Wordle
+from decision_cache import DecisionCache
+from pattern_matrix import PatternMatrix
+
+PERCENTILES = (50, 95, 99)
+
+
+def get_percentiles(values) -> tuple[float, ...]:
+    """p50, p95 and p99 of `values`, nan if there are none"""
+    if len(values) == 0:
+        return tuple(float("nan") for _ in PERCENTILES)
+    return tuple(float(p) for p in np.percentile(values, PERCENTILES))
+
+
+class Metrics:
+    """Timings (in seconds) grouped by name and turn, and counters"""
+
+    def __init__(self):
+        self.__timings: defaultdict[tuple[str, int], list[float]] = defaultdict(list)
+        self.__counters = Counter()
+
+    def add_timing(self, name: str, turn: int, seconds: float):
+        self.__timings[(name, turn)].append(seconds)
+
+    def increment(self, name: str, value: int = 1):
+        self.__counters[name] += value
+
+    def reset(self):
+        self.__timings.clear()
+        self.__counters.clear()
+
+    @property
+    def counters(self) -> Counter:
+        return self.__counters
+
+    def get_timings(self, name: str, turn: int = None) -> list[float]:
+        """Timings of `name` on `turn`, or on all turns if `turn` is None"""
+        if turn is not None:
+            return self.__timings.get((name, turn), [])
+        return [t for (timer_name, _), timings in self.__timings.items() if timer_name == name for t in timings]
+
+    def summary(self) -> dict:
+        timers = defaultdict(dict)
+        for (name, turn), timings in sorted(self.__timings.items()):
+            p50, p95, p99 = get_percentiles(timings)
+            timers[name][turn] = {"count": len(timings), "sum": sum(timings), "p50": p50, "p95": p95, "p99": p99}
+        return {"timers": dict(timers), "counters": dict(self.__counters)}
+
+    def to_json(self) -> str:
+        return json.dumps(self.summary(), indent=2)
+
+    def to_prometheus(self, prefix: str = "wordle") -> str:
+        lines = []
+        summary = self.summary()
+        for name, turns in summary["timers"].items():
+            metric = f"{prefix}_{name}_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for turn, stats in turns.items():
+                for p in PERCENTILES:
+                    lines.append(f'{metric}{{turn="{turn}",quantile="{p / 100}"}} {stats[f"p{p}"]}')
+                lines.append(f'{metric}_sum{{turn="{turn}"}} {stats["sum"]}')
+                lines.append(f'{metric}_count{{turn="{turn}"}} {stats["count"]}')
+        for name, value in sorted(summary["counters"].items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, filepath: str):
+        """JSON, or Prometheus text format if `filepath` ends with .prom"""
+        with open(filepath, 'w') as f:
+            f.write(self.to_prometheus() if filepath.endswith(".prom") else self.to_json())
+
+
+# metrics being collected, None while instrumentation is off
+_metrics: Metrics = None
+# (owner, attribute, original) of every patched function, to be restored by `disable`
+_patched: list[tuple[object, str, object]] = []
+# groups of timers with a call in progress, see `_timed`
+_active_groups: set[str] = set()
+
+
+def get_metrics() -> Metrics | None:
+    return _metrics
+
+
+def _patch(owner, attribute: str, wrapper):
+    original = getattr(owner, attribute)
+    setattr(owner, attribute, wraps(original)(wrapper(original)))
+    _patched.append((owner, attribute, original))
+
+
+def _timed(name: str, get_turn, group: str = None):
+    """
+    Wrapper timing calls of a method, `get_turn(self, *args)` gives the turn the call belongs to.
+    Calls made while another call of the same `group` is in progress aren't timed (e.g. guesses of a fallback solver
+    are part of the guess of the solver using it), so that every guess is counted once.
+    """
+    def wrapper(original):
+        def timed(self, *args, **kwargs):
+            if group is not None:
+                if group in _active_groups:
+                    return original(self, *args, **kwargs)
+                _active_groups.add(group)
+            try:
+                turn = get_turn(self, *args)
+                start = time.perf_counter()
+                result = original(self, *args, **kwargs)
+                _metrics.add_timing(name, turn, time.perf_counter() - start)
+            finally:
+                if group is not None:
+                    _active_groups.discard(group)
+            return result
+        return timed
+    return wrapper
+
+
+def _count_cache_get(original):
+    def get(self, key):
+        guess = original(self, key)
+        _metrics.increment("cache_misses" if guess is None else "cache_hits")
+        return guess
+    return get
+
+
+def _count_pattern(original):
+    def pattern(self, word_guess, word_secret):
+        _metrics.increment("pattern_lookups")
+        return original(self, word_guess, word_secret)
+    return pattern
+
+
+def _count_histograms(original):
+    def get_pattern_histograms(matrix, guess_ids, secret_ids):
+        _metrics.increment("candidates_scored", len(guess_ids))
+        _metrics.increment("pattern_lookups", len(guess_ids) * len(secret_ids))
+        return original(matrix, guess_ids, secret_ids)
+    return get_pattern_histograms
+
+
+def _patch_function(module, name: str, wrapper):
+    """Patch a module level function in its module and in every module which imported it by name"""
+    original = getattr(module, name)
+    wrapped = wraps(original)(wrapper(original))
+    for other in list(sys.modules.values()):
+        if getattr(other, name, None) is original:
+            setattr(other, name, wrapped)
+            _patched.append((other, name, original))
+
+
+def _state_turn(state, *args) -> int:
+    # turn of the guess being applied to the state / checked against it
+    return NUMBER_OF_TURNS - state.turns_left + 1
+
+
+def enable() -> Metrics:
+    """Start collecting metrics (keeps collecting into the same `Metrics` if already enabled)"""
+    global _metrics
+    if _metrics is not None:
+        return _metrics
+    _metrics = Metrics()
+
+    _patch(Solver, "make_guess", _timed("make_guess", lambda solver, state: _state_turn(state), group="guess"))
+    # games in a batch are played in lockstep, so all states are on the same turn
+    _patch(Solver, "make_guesses",
+           _timed("make_guesses", lambda solver, states: _state_turn(states[0]) if states else 0, group="guess"))
+    _patch(Wordle, "guess", _timed("wordle_guess", lambda wordle, word: NUMBER_OF_TURNS - wordle.turns_left + 1))
+    for state_class in (State, PatternState):
+        _patch(state_class, "update_state", _timed("update_state", _state_turn))
+        _patch(state_class, "advance", _timed("advance", _state_turn))
+        _patch(state_class, "check_word", _timed("check_word", _state_turn))
+    _patch(DecisionCache, "get", _count_cache_get)
+    _patch(PatternMatrix, "pattern", _count_pattern)
+    _patch_function(scoring, "get_pattern_histograms", _count_histograms)
+    return _metrics
+
+
+def disable() -> Metrics | None:
+    """Stop collecting metrics and restore the original functions, returns collected metrics"""
+    global _metrics
+    metrics = _metrics
+    for owner, attribute, original in reversed(_patched):
+        setattr(owner, attribute, original)
+    _patched.clear()
+    _active_groups.clear()
+    _metrics = None
+    return metrics
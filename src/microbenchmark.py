@@ -0,0 +1,272 @@
+"""
+Microbenchmarks of the core kernels on fixed inputs: pattern computation, `Wordle` guess masks, state checks and
+updates, pattern table build and load, and `make_guess` of every solver at turns 1 to 3 (without opening books
+and decision caches, so that guesses are actually made). Results are saved as JSON, and compared against
+a baseline run: comparison fails if any case got slower by more than the threshold (relative, median time per call).
+
+    python microbenchmark.py run --output base.json
+    python microbenchmark.py run --output new.json --cases "make_guess.entropy*" --baseline base.json
+    python microbenchmark.py compare base.json new.json --threshold 0.2
+"""
+import os
+import sys
+import json
+import time
+import random
+import fnmatch
+import logging
+import argparse
+import platform
+import tempfile
+import statistics
+from typing import Callable
+
+import numpy as np
+
+from utils import load_all_words, load_accepted_words, word_to_pattern_value
+from pattern_matrix import get_pattern_matrix, build_pattern_table, load_pattern_matrix
+
+MICROBENCHMARK_VERSION = 1
+# secrets of the `make_guess` cases, turn 2 and 3 states are reached by guessing these words
+SECRETS = ("cigar", "rebut", "sissy", "humph", "awake")
+HISTORY_GUESSES = ("slate", "crony")
+N_PAIRS = 1000
+
+# sets up a case and returns the function to time, which is called without arguments
+Case = Callable[[], Callable[[], object]]
+
+
+def get_pairs(seed: int = 0) -> list[tuple[str, str]]:
+    """Fixed (guess, secret) pairs"""
+    rng = random.Random(seed)
+    return [(rng.choice(load_all_words()), rng.choice(load_accepted_words())) for _ in range(N_PAIRS)]
+
+
+def setup_word_to_pattern_value():
+    pairs = get_pairs()
+    return lambda: [word_to_pattern_value(word_guess, word_secret) for word_guess, word_secret in pairs]
+
+
+def setup_guess_mask(state_mode) -> Case:
+    def setup():
+        from wordle import Wordle
+        wordle = Wordle(logger_level=logging.ERROR, state_mode=state_mode)
+        wordle.start_game(hard_mode=False, word_secret=SECRETS[0])
+        guess_mask = wordle._Wordle__guess_mask
+        words = [word_guess for word_guess, _ in get_pairs()]
+        return lambda: [guess_mask(word) for word in words]
+    return setup
+
+
+def get_state(state_mode, secret: str, turn: int):
+    """State before the `turn`-th guess, earlier guesses are `HISTORY_GUESSES`"""
+    from state import State, StateMode, PatternState
+    if state_mode == StateMode.PATTERNS:
+        state = PatternState(get_pattern_matrix())
+    else:
+        state = State((), load_all_words(), load_accepted_words())
+    for word_guess in HISTORY_GUESSES[:turn - 1]:
+        state = state.advance(word_guess, word_to_pattern_value(word_guess, secret))
+    return state
+
+
+def setup_check_word(state_mode) -> Case:
+    def setup():
+        states = [get_state(state_mode, secret, 3) for secret in SECRETS]
+        words = [word_guess for word_guess, _ in get_pairs()]
+        return lambda: [state.check_word(word) for state in states for word in words]
+    return setup
+
+
+def setup_update_state(state_mode) -> Case:
+    def setup():
+        from state import StateRow
+        states = [get_state(state_mode, secret, turn) for secret in SECRETS for turn in (1, 2)]
+        rows = [StateRow.from_pattern_value("audio", word_to_pattern_value("audio", secret))
+                for secret in SECRETS for _ in (1, 2)]
+        return lambda: [state.update_state(row).words_accepted for state, row in zip(states, rows)]
+    return setup
+
+
+def setup_pattern_table_build():
+    # directory is removed once the timed function is garbage collected
+    directory = tempfile.TemporaryDirectory()
+    return lambda: build_pattern_table(os.path.join(directory.name, "patterns.bin"), load_all_words(),
+                                       load_accepted_words(), resume=False, verbose=False)
+
+
+def setup_pattern_table_load():
+    directory = tempfile.TemporaryDirectory()
+    build_pattern_table(os.path.join(directory.name, "patterns.bin"), load_all_words(), load_accepted_words(),
+                        resume=False, verbose=False)
+    return lambda: load_pattern_matrix(os.path.join(directory.name, "patterns.bin"), load_all_words(),
+                                       load_accepted_words())
+
+
+def get_solver_factories() -> dict[str, Callable]:
+    from entropy_solver import EntropySolver
+    from lookahead_solver import LookaheadSolver
+    from tree_solver import DecisionTreeSolver
+    from dist_solver import DistSolver, DistanceMetric
+    from objective_solver import ObjectiveSolver
+    from scoring import OBJECTIVES
+
+    solver_factories = {
+        "entropy": EntropySolver,
+        "entropy_easy": lambda: EntropySolver(hard_mode=False),
+        "lookahead": lambda: LookaheadSolver(top_k=10),
+        "tree": DecisionTreeSolver,
+        "dist_hamming": lambda: DistSolver(DistanceMetric.HAMMING_DISTANCE),
+        "dist_freq": lambda: DistSolver(DistanceMetric.FREQ_DISTANCE),
+    }
+    for objective in OBJECTIVES:
+        solver_factories[f"objective_{objective}"] = lambda objective=objective: ObjectiveSolver(objective)
+    return solver_factories
+
+
+def get_all_solvers(solver) -> list:
+    """`solver` and the solvers it makes guesses with (e.g. fallback of `DecisionTreeSolver`), recursively"""
+    solvers = [solver]
+    for inner_solver in solver.inner_solvers:
+        solvers.extend(get_all_solvers(inner_solver))
+    return solvers
+
+
+def setup_make_guess(solver_factory: Callable, turn: int) -> Case:
+    def setup():
+        from state import StateMode
+        solver = solver_factory()
+        all_solvers = get_all_solvers(solver)
+        for inner_solver in all_solvers:
+            inner_solver.set_opening_books(dict())
+        caches = [inner_solver.cache for inner_solver in all_solvers if inner_solver.cache is not None]
+        states = [get_state(StateMode.PATTERNS, secret, turn) for secret in SECRETS]
+
+        def make_guesses():
+            for state in states:
+                for cache in caches:
+                    cache.clear()
+                solver.make_guess(state)
+        return make_guesses
+    return setup
+
+
+def get_cases() -> dict[str, Case]:
+    from state import StateMode
+    cases = {
+        "word_to_pattern_value": setup_word_to_pattern_value,
+        "wordle.guess_mask": setup_guess_mask(StateMode.CONSTRAINTS),
+        "wordle.guess_mask.patterns": setup_guess_mask(StateMode.PATTERNS),
+        "state.check_word": setup_check_word(StateMode.CONSTRAINTS),
+        "state.update_state": setup_update_state(StateMode.CONSTRAINTS),
+        "pattern_state.check_word": setup_check_word(StateMode.PATTERNS),
+        "pattern_state.update_state": setup_update_state(StateMode.PATTERNS),
+        "pattern_table.build": setup_pattern_table_build,
+        "pattern_table.load": setup_pattern_table_load,
+    }
+    for solver_name, solver_factory in get_solver_factories().items():
+        for turn in (1, 2, 3):
+            cases[f"make_guess.{solver_name}.turn{turn}"] = setup_make_guess(solver_factory, turn)
+    return cases
+
+
+def time_case(func: Callable[[], object], repeat: int, min_time: float) -> dict:
+    """Seconds per call: calls are looped until a loop takes at least `min_time`, then the loop is repeated"""
+    # first call loads lazily loaded resources
+    func()
+    n_loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(n_loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        n_loops *= 2
+    times = [elapsed / n_loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(n_loops):
+            func()
+        times.append((time.perf_counter() - start) / n_loops)
+    return {"median": statistics.median(times), "min": min(times), "loops": n_loops, "repeat": repeat}
+
+
+def run_cases(patterns: list[str], repeat: int, min_time: float) -> dict:
+    results = dict()
+    for name, setup in get_cases().items():
+        if not any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+            continue
+        results[name] = time_case(setup(), repeat, min_time)
+        print(f"{name}: {1000 * results[name]['median']:.3f} ms", file=sys.stderr)
+    return {
+        "version": MICROBENCHMARK_VERSION,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} cpus",
+        "cases": results,
+    }
+
+
+def compare_results(results_base: dict, results_new: dict, threshold: float) -> tuple[list[str], list[str]]:
+    """Returns lines of the report (markdown table) and lines describing regressions"""
+    cases_base = results_base["cases"]
+    cases_new = results_new["cases"]
+    report = ["| Case | Base (ms) | New (ms) | Change |", "| --- | --- | --- | --- |"]
+    regressions = []
+    for name in sorted(set(cases_base) | set(cases_new)):
+        if name not in cases_base or name not in cases_new:
+            report.append(f"| {name} | {'-' if name not in cases_base else 'only in base'} | "
+                          f"{'-' if name not in cases_new else 'only in new'} | |")
+            continue
+        time_base = cases_base[name]["median"]
+        time_new = cases_new[name]["median"]
+        change = time_new / time_base - 1
+        report.append(f"| {name} | {1000 * time_base:.3f} | {1000 * time_new:.3f} | {100 * change:+.1f}% |")
+        if change > threshold:
+            regressions.append(f"{name}: {1000 * time_base:.3f}ms -> {1000 * time_new:.3f}ms "
+                               f"({100 * change:+.1f}%, threshold {100 * threshold:.0f}%)")
+    return report, regressions
+
+
+def print_comparison(results_base: dict, results_new: dict, threshold: float) -> bool:
+    """Prints the comparison, returns whether there are no regressions"""
+    report, regressions = compare_results(results_base, results_new, threshold)
+    print("\n".join(report))
+    if regressions:
+        print(f"\n{len(regressions)} regressions:")
+        print("\n".join(regressions))
+    return not regressions
+
+
+def load_results(filepath: str) -> dict:
+    with open(filepath, 'r') as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the core kernels on fixed inputs, or compare two runs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    parser_run = subparsers.add_parser("run", help="run cases and save results as JSON")
+    parser_run.add_argument("--output", required=True, help="results filepath")
+    parser_run.add_argument("--cases", nargs="+", default=["*"], help="glob patterns of case names (default: all)")
+    parser_run.add_argument("--repeat", type=int, default=5)
+    parser_run.add_argument("--min-time", type=float, default=0.1, help="minimum seconds of a timed loop")
+    parser_run.add_argument("--baseline", help="compare results with this baseline run")
+    parser_run.add_argument("--threshold", type=float, default=0.2,
+                            help="allowed relative increase of the median time (default: 0.2)")
+    parser_compare = subparsers.add_parser("compare", help="compare two runs, fail on regressions")
+    parser_compare.add_argument("base", help="results of the baseline run")
+    parser_compare.add_argument("new", help="results of the new run")
+    parser_compare.add_argument("--threshold", type=float, default=0.2,
+                                help="allowed relative increase of the median time (default: 0.2)")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run_cases(args.cases, args.repeat, args.min_time)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        if args.baseline is not None and not print_comparison(load_results(args.baseline), results, args.threshold):
+            sys.exit(1)
+    elif not print_comparison(load_results(args.base), load_results(args.new), args.threshold):
+        sys.exit(1)
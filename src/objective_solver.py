@@ -0,0 +1,189 @@
+import os
+import argparse
+from enum import Enum
+from typing import Callable
+from collections import OrderedDict
+
+import numpy as np
+
+from solver import Solver
+from decision_cache import DecisionCache
+from constants import NUMBER_OF_TURNS
+from wordle import State
+from state import StateMode
+from pattern_matrix import get_pattern_matrix
+from scoring import Objective, OBJECTIVES, get_objective, calculate_scores_chunked, PartitionHistograms
+
+
+class TieBreak(Enum):
+    # first best remaining secret (it can still win the game), first best word if none of them is the best
+    CANDIDATES = "candidates"
+    # first best word in word list order (same as `CANDIDATES` in hard mode, where only secrets are guessed)
+    WORD_ORDER = "word_order"
+
+
+class HistogramCache:
+    """
+    Bounded map from (hard mode, state key) to pattern histograms of the guesses of the state and scores already
+    computed from them. Shared by `ObjectiveSolver`s, so that histograms of a state are computed once for all
+    of them, while every objective is computed only for the states its solver reaches.
+    At most `capacity` states are kept, and histograms of at most `max_histogram_bytes` in total
+    (histograms of the least recently used states are dropped first, their scores are kept).
+    """
+
+    def __init__(self, capacity: int = 2 ** 12, max_histogram_bytes: int = 2 ** 28):
+        if capacity <= 0:
+            raise ValueError(f"Cache capacity must be positive, got {capacity}")
+        self.__capacity = capacity
+        self.__max_histogram_bytes = max_histogram_bytes
+        self.__histogram_bytes = 0
+        # state -> [histograms or None, scores by objective]
+        self.__entries: OrderedDict[tuple[bool, str], list] = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    def get_scores(self, key: tuple[bool, str], objective: Objective,
+                   get_histograms: Callable[[], PartitionHistograms]) -> np.ndarray:
+        """Scores of the state by `objective`, histograms are computed with `get_histograms` if they aren't kept"""
+        entry = self.__entries.get(key)
+        if entry is None:
+            if len(self.__entries) >= self.__capacity:
+                histograms, _ = self.__entries.popitem(last=False)[1]
+                self.__histogram_bytes -= 0 if histograms is None else histograms.histograms.nbytes
+            entry = self.__entries[key] = [None, dict()]
+        else:
+            self.__entries.move_to_end(key)
+
+        histograms, scores = entry
+        if objective not in scores:
+            if histograms is None:
+                self.__misses += 1
+                histograms = entry[0] = get_histograms()
+                self.__histogram_bytes += histograms.histograms.nbytes
+                self.__drop_histograms()
+            else:
+                self.__hits += 1
+            scores[objective] = histograms.calculate_scores((objective,))[0]
+        else:
+            self.__hits += 1
+        return scores[objective]
+
+    def __drop_histograms(self):
+        for entry in self.__entries.values():
+            if self.__histogram_bytes <= self.__max_histogram_bytes:
+                break
+            if entry[0] is not None:
+                self.__histogram_bytes -= entry[0].histograms.nbytes
+                entry[0] = None
+
+    def __len__(self):
+        return len(self.__entries)
+
+    @property
+    def histogram_bytes(self) -> int:
+        return self.__histogram_bytes
+
+    @property
+    def hits(self) -> int:
+        """Scores served without computing histograms"""
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+
+class ObjectiveSolver(Solver):
+    """
+    Guesses the word with the best pattern distribution over the remaining secrets by `objective`
+    (name of one of `scoring.OBJECTIVES`), ties are broken by `tie_break`.
+    In hard mode only remaining secrets are considered, otherwise every allowed word is scored.
+    With `histogram_cache`, histograms of a state are shared with the other solvers using the same `HistogramCache`.
+    With `incremental`, histograms of the last scored state are kept, and the next state of the same game
+    only subtracts the secrets its pattern removed (see `PartitionHistograms`). It's off by default: a guess usually
+    removes most of the secrets, so histograms are rebuilt anyway (see incremental_benchmark.py).
+    """
+    __SOLVER_NAME = "ObjectiveSolver"
+
+    def __init__(self, objective: str = "entropy", tie_break: TieBreak = TieBreak.CANDIDATES,
+                 cache: DecisionCache = None, hard_mode: bool = True, incremental: bool = False,
+                 histogram_cache: HistogramCache = None, first_guess: str = None, solver_name: str = None):
+        """
+        :param first_guess: hardcoded first guess, otherwise it's scored as any other state
+        :param solver_name: defaults to the objective and the options which aren't the default ones
+        """
+        if solver_name is None:
+            options = [objective] + (["easy"] if not hard_mode else []) + \
+                      ([tie_break.value] if tie_break != TieBreak.CANDIDATES else [])
+            solver_name = f"{self.__SOLVER_NAME}({', '.join(options)})"
+        super().__init__(solver_name, DecisionCache() if cache is None else cache)
+        self.__objective_name = objective
+        self.__objective = get_objective(objective)
+        self.__tie_break = tie_break
+        self.__hard_mode = hard_mode
+        self.__incremental = incremental
+        self.__first_guess = first_guess
+        self.__histogram_cache = histogram_cache
+        # history of the last scored state and its histograms
+        self.__last_history: tuple[tuple[str, int], ...] = None
+        self.__last_histograms: PartitionHistograms = None
+
+    def _make_guess(self, state: State) -> str:
+        if state.turns_left == NUMBER_OF_TURNS and self.__first_guess is not None:
+            return self.__first_guess
+        pattern_matrix = get_pattern_matrix()
+        candidate_ids = pattern_matrix.all_ids(state.words_accepted)
+        secret_ids = pattern_matrix.accepted_ids(state.words_accepted)
+        guess_ids = candidate_ids if self.__hard_mode else np.arange(len(pattern_matrix.words_all))
+        scores = self.__get_scores(state, guess_ids, secret_ids)
+
+        # argmax picks the first word on ties, same as a strict ">" scan in words order
+        is_best = scores == scores.max()
+        if self.__tie_break == TieBreak.CANDIDATES and not self.__hard_mode:
+            best_secrets = np.flatnonzero(is_best[candidate_ids])
+            if len(best_secrets) > 0:
+                return state.words_accepted[int(best_secrets[0])]
+        return pattern_matrix.words_all[int(guess_ids[np.argmax(is_best)])]
+
+    @property
+    def config(self) -> str:
+        return (f"{self.__SOLVER_NAME}(objective={self.__objective_name}, tie_break={self.__tie_break.value}, "
+                f"hard_mode={self.__hard_mode}, first_guess={self.__first_guess})")
+
+    def __get_scores(self, state: State, guess_ids: np.ndarray, secret_ids: np.ndarray) -> np.ndarray:
+        if self.__histogram_cache is not None:
+            return self.__histogram_cache.get_scores((self.__hard_mode, state.key), self.__objective,
+                                                     lambda: self.__get_histograms(state, guess_ids, secret_ids))
+        if self.__incremental:
+            return self.__get_histograms(state, guess_ids, secret_ids).calculate_scores((self.__objective,))[0]
+        # histograms aren't kept, so they are scored in chunks
+        return calculate_scores_chunked(get_pattern_matrix().matrix, guess_ids, secret_ids, (self.__objective,))[0]
+
+    def __get_histograms(self, state: State, guess_ids: np.ndarray, secret_ids: np.ndarray) -> PartitionHistograms:
+        if self.__incremental and self.__last_histograms is not None and state.history[:-1] == self.__last_history:
+            histograms = self.__last_histograms.narrow(guess_ids, secret_ids)
+        else:
+            histograms = PartitionHistograms(get_pattern_matrix().matrix, guess_ids, secret_ids)
+        if self.__incremental:
+            self.__last_history = state.history
+            self.__last_histograms = histograms
+        return histograms
+
+
+if __name__ == "__main__":
+    from benchmark import Benchmark, BenchmarkBackend
+
+    parser = argparse.ArgumentParser(description="Compare objectives on every accepted word, histograms of a state "
+                                                 "are computed once for all of them")
+    parser.add_argument("--objectives", nargs="+", choices=tuple(OBJECTIVES), default=tuple(OBJECTIVES))
+    parser.add_argument("--tie-break", choices=[tie_break.value for tie_break in TieBreak],
+                        default=TieBreak.CANDIDATES.value)
+    parser.add_argument("--easy", action="store_true", help="play in easy mode, any allowed word can be guessed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    histogram_cache = HistogramCache()
+    solvers = tuple(ObjectiveSolver(objective, TieBreak(args.tie_break), hard_mode=not args.easy,
+                                    histogram_cache=histogram_cache) for objective in args.objectives)
+    Benchmark(solvers, exhaustive=True, n_workers=args.workers, backend=BenchmarkBackend.SIMULATION,
+              state_mode=StateMode.PATTERNS, hard_mode=not args.easy).analyze_solver()
@@ -0,0 +1,197 @@
+"""
+Opening book: guesses of a solver in the first two turns (first guess, and second guess for every pattern
+the first one can get), computed offline and looked up by `Solver.make_guess`. Books of all solvers are kept
+in a single file of the data directory, which is ignored once the word lists change.
+A book is built with the state mode it serves (best guesses of `State` and `PatternState` can differ), and is
+only served to a solver of the same config (`Solver.config`) whose classes have the same source code.
+Rebuild the book of a solver after changing code it depends on outside of its classes (e.g. scoring).
+
+    python opening_book.py --solvers entropy entropy_easy lookahead
+"""
+import os
+import json
+import time
+import inspect
+import hashlib
+import argparse
+from functools import cache
+
+import numpy as np
+
+from constants import NUMBER_OF_PATTERNS
+from state import State, StateMode, PatternState
+from pattern_matrix import PatternMatrix, get_pattern_matrix, hash_words
+from resources import LazyResource, get_data_filepath
+from utils import load_all_words, load_accepted_words
+
+OPENING_BOOK_VERSION = 2
+# (solver key, state mode) of a book, see `get_solver_key`
+BookKey = tuple[str, StateMode]
+
+
+class OpeningBook:
+    """First guess of a solver and its second guess for every pattern the first guess can get"""
+
+    def __init__(self, first_guess: str, second_guesses: dict[int, str]):
+        self.__first_guess = first_guess
+        self.__second_guesses = second_guesses
+
+    @property
+    def first_guess(self) -> str:
+        return self.__first_guess
+
+    @property
+    def second_guesses(self) -> dict[int, str]:
+        return self.__second_guesses
+
+    def get_guess(self, history: tuple[tuple[str, int], ...]) -> str | None:
+        """Guess for the state reached by `history`, None if it's past the book"""
+        if len(history) == 0:
+            return self.__first_guess
+        if len(history) == 1 and history[0][0] == self.__first_guess:
+            return self.__second_guesses.get(history[0][1])
+        return None
+
+    def to_json(self) -> dict:
+        return {"first_guess": self.__first_guess,
+                "second_guesses": [[pattern_val, guess] for pattern_val, guess in self.__second_guesses.items()]}
+
+    @staticmethod
+    def from_json(data: dict) -> "OpeningBook":
+        return OpeningBook(data["first_guess"], {pattern_val: guess for pattern_val, guess in data["second_guesses"]})
+
+
+@cache
+def hash_class_source(cls: type) -> str:
+    try:
+        return hashlib.sha256(inspect.getsource(cls).encode()).hexdigest()[:16]
+    except (OSError, TypeError):
+        # no source (e.g. classes defined interactively), only the config is checked
+        return ""
+
+
+def get_solver_key(solver) -> str:
+    """Config of `solver` and a hash of the source of its classes, so that books of an edited solver aren't served"""
+    classes = [cls for cls in type(solver).__mro__ if cls.__module__ not in ("builtins", "abc")]
+    return f"{solver.config}@{'.'.join(hash_class_source(cls) for cls in classes)}"
+
+
+def build_opening_book(solver, state_mode: StateMode = StateMode.PATTERNS,
+                       pattern_matrix: PatternMatrix = None) -> OpeningBook:
+    """
+    Guesses `solver` (a deterministic `Solver`, its current books aren't used) makes in the first two turns,
+    with states of `state_mode`
+    """
+    if not solver.is_deterministic:
+        raise ValueError(f"Opening book of {solver.name} can't be built, it doesn't always make the same guess")
+    pattern_matrix = get_pattern_matrix() if pattern_matrix is None else pattern_matrix
+    solver.set_opening_books(dict())
+
+    if state_mode == StateMode.PATTERNS:
+        initial_state = PatternState(pattern_matrix)
+    else:
+        initial_state = State((), pattern_matrix.words_all, pattern_matrix.words_accepted)
+    first_guess = solver.make_guess(initial_state)
+    patterns = np.unique(pattern_matrix.matrix[pattern_matrix.all_id(first_guess)]).tolist()
+    second_guesses = {pattern_val: solver.make_guess(initial_state.advance(first_guess, pattern_val))
+                      for pattern_val in patterns if pattern_val != NUMBER_OF_PATTERNS - 1}
+    return OpeningBook(first_guess, second_guesses)
+
+
+def get_opening_book_filepath() -> str:
+    return get_data_filepath("opening_book.json")
+
+
+def dump_opening_books(books: dict[BookKey, OpeningBook], filepath: str, words_all: tuple[str, ...],
+                       words_accepted: tuple[str, ...]):
+    data = {
+        "version": OPENING_BOOK_VERSION,
+        "words_all_hash": hash_words(words_all).hex(),
+        "words_accepted_hash": hash_words(words_accepted).hex(),
+        "books": [{"solver": solver_key, "state_mode": state_mode.value, **book.to_json()}
+                  for (solver_key, state_mode), book in books.items()],
+    }
+    # write to a temporary file first, so concurrent readers never see a half written book
+    filepath_tmp = f"{filepath}.{os.getpid()}.tmp"
+    with open(filepath_tmp, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(filepath_tmp, filepath)
+
+
+def load_opening_books(filepath: str, words_all: tuple[str, ...],
+                       words_accepted: tuple[str, ...]) -> dict[BookKey, OpeningBook]:
+    """
+    Books by solver key and state mode, none if file is missing, can't be parsed (e.g. truncated) or the books were
+    built for other word lists
+    """
+    if not os.path.exists(filepath):
+        return dict()
+    try:
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+        if (data.get("version") != OPENING_BOOK_VERSION or
+                data.get("words_all_hash") != hash_words(words_all).hex() or
+                data.get("words_accepted_hash") != hash_words(words_accepted).hex()):
+            return dict()
+        return {(book["solver"], StateMode(book["state_mode"])): OpeningBook.from_json(book)
+                for book in data["books"]}
+    except (ValueError, KeyError, TypeError, AttributeError):
+        # JSONDecodeError and UnicodeDecodeError are ValueErrors, the others are JSON of an unexpected shape
+        return dict()
+
+
+def load_data_dir_opening_books() -> dict[BookKey, OpeningBook]:
+    filepath = get_opening_book_filepath()
+    if not os.path.exists(filepath):
+        # word lists aren't loaded just to find out there is no book
+        return dict()
+    return load_opening_books(filepath, load_all_words(), load_accepted_words())
+
+
+OPENING_BOOKS: LazyResource[dict[BookKey, OpeningBook]] = LazyResource(load_data_dir_opening_books)
+
+
+def get_opening_books(solver) -> dict[StateMode, OpeningBook]:
+    """Books of `solver` by the state mode they serve"""
+    books = OPENING_BOOKS.get()
+    if not books:
+        return dict()
+    solver_key = get_solver_key(solver)
+    return {state_mode: books[solver_key, state_mode] for state_mode in StateMode if (solver_key, state_mode) in books}
+
+
+if __name__ == "__main__":
+    from dist_solver import DistSolver, DistanceMetric
+    from objective_solver import ObjectiveSolver
+    from lookahead_solver import LookaheadSolver
+    from scoring import OBJECTIVES
+    from hint_server import SOLVER_FACTORIES
+
+    solver_factories = dict(SOLVER_FACTORIES)
+    # hint server's lookahead has a time budget, so its guesses depend on timing and can't be put in a book
+    solver_factories["lookahead"] = lambda: LookaheadSolver(top_k=10)
+    solver_factories["dist_hamming"] = lambda: DistSolver(DistanceMetric.HAMMING_DISTANCE)
+    solver_factories["dist_freq"] = lambda: DistSolver(DistanceMetric.FREQ_DISTANCE)
+    for objective in OBJECTIVES:
+        solver_factories[f"objective_{objective}"] = lambda objective=objective: ObjectiveSolver(objective)
+
+    parser = argparse.ArgumentParser(description="Build opening books of solvers, books of other solvers "
+                                                 "already in the file are kept")
+    parser.add_argument("--solvers", nargs="+", choices=tuple(solver_factories), default=("entropy",))
+    parser.add_argument("--state-modes", nargs="+", choices=[state_mode.value for state_mode in StateMode],
+                        default=[state_mode.value for state_mode in StateMode])
+    args = parser.parse_args()
+
+    pattern_matrix = get_pattern_matrix()
+    filepath = get_opening_book_filepath()
+    books = load_opening_books(filepath, pattern_matrix.words_all, pattern_matrix.words_accepted)
+    for name in args.solvers:
+        solver = solver_factories[name]()
+        for state_mode in map(StateMode, args.state_modes):
+            start = time.perf_counter()
+            book = books[get_solver_key(solver), state_mode] = build_opening_book(solver, state_mode, pattern_matrix)
+            print(f"{solver.name} ({state_mode.value}): {book.first_guess}, {len(book.second_guesses)} second "
+                  f"guesses in {time.perf_counter() - start:.2f}s")
+    dump_opening_books(books, filepath, pattern_matrix.words_all, pattern_matrix.words_accepted)
+    OPENING_BOOKS.reset()
+    print(f"{len(books)} opening books saved to {filepath}")
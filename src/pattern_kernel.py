@@ -0,0 +1,88 @@
+"""
+Pattern computation shared by the game, the states and the pattern table.
+
+Words are encoded as rows of letter codes ('a' -> 0, ..., 'z' -> 25). Pattern of a guess against a secret is
+a base 3 number, i-th trit being the `CharState` of the i-th guess letter. With repeated letters, green positions
+take their letters first, remaining copies of a letter in the secret are then given to the leftmost non-green
+positions of that letter in the guess (e.g. "allee" against "eagle" is yellow, yellow, grey, yellow, green).
+Functions work with any word length, `WORD_LENGTH` is only the length used by the game.
+"""
+from enum import Enum
+from typing import Sequence
+
+import numpy as np
+
+from constants import WORD_LENGTH
+
+
+def get_pattern_dtype(word_length: int) -> np.dtype:
+    """Smallest unsigned dtype holding all 3 ** word_length patterns"""
+    return np.dtype(np.min_scalar_type(3 ** word_length - 1))
+
+
+# 3 ** 5 = 243 patterns fit into a single byte
+PATTERN_DTYPE = get_pattern_dtype(WORD_LENGTH)
+
+
+class CharState(Enum):
+    GREY = 0
+    YELLOW = 1
+    GREEN = 2
+
+
+def encode_word(word: str) -> np.ndarray:
+    return encode_words((word,))[0]
+
+
+def encode_words(words: Sequence[str], word_length: int = None) -> np.ndarray:
+    """Words (all of the same length) as (n, word_length) array of letter codes"""
+    if word_length is None:
+        word_length = len(words[0]) if words else WORD_LENGTH
+    if any(len(word) != word_length for word in words):
+        raise ValueError(f"All words should have {word_length} letters")
+    codes = np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8) - ord('a')
+    return codes.reshape(len(words), word_length)
+
+
+def get_pattern_value(word_guess: Sequence, word_secret: Sequence) -> int:
+    """Pattern of a single pair, words are strings or rows of letter codes"""
+    pattern_val = 0
+    # secret letters which are not taken by green positions
+    not_green = [letter_secret for letter_guess, letter_secret in zip(word_guess, word_secret)
+                 if letter_guess != letter_secret]
+    for i in range(len(word_guess)):
+        if word_guess[i] == word_secret[i]:
+            pattern_val += CharState.GREEN.value * 3 ** i
+        elif word_guess[i] in not_green:
+            pattern_val += CharState.YELLOW.value * 3 ** i
+            not_green.remove(word_guess[i])
+    return pattern_val
+
+
+def compute_patterns(guess_codes: np.ndarray, secret_codes: np.ndarray) -> np.ndarray:
+    """Pattern value for every (guess, secret) pair of encoded words, shape (n_guess, n_secret)"""
+    word_length = guess_codes.shape[1]
+    guess = [guess_codes[:, i, np.newaxis] for i in range(word_length)]
+    secret = [secret_codes[np.newaxis, :, i] for i in range(word_length)]
+
+    # secret letters which are not taken by green positions
+    not_green = [guess[i] != secret[i] for i in range(word_length)]
+    yellow = []
+    pattern = np.zeros((len(guess_codes), len(secret_codes)), dtype=np.int64 if word_length > 19 else np.int32)
+    for i in range(word_length):
+        # copies of the letter left in the secret ...
+        available = np.zeros(pattern.shape, dtype=np.int8)
+        for j in range(word_length):
+            available += (guess[i] == secret[j]) & not_green[j]
+        # ... minus copies already taken by yellow positions to the left
+        for j in range(i):
+            available -= (guess[j] == guess[i]) & yellow[j]
+        yellow.append(not_green[i] & (available > 0))
+
+        pattern += (CharState.GREEN.value * ~not_green[i] + CharState.YELLOW.value * yellow[i]) * 3 ** i
+    return pattern.astype(get_pattern_dtype(word_length))
+
+
+def get_patterns(guess_code: np.ndarray, secret_codes: np.ndarray) -> np.ndarray:
+    """Patterns of a single encoded guess against every encoded secret, in one vectorized pass"""
+    return compute_patterns(guess_code[np.newaxis], secret_codes)[0]
@@ -0,0 +1,322 @@
+import os
+import time
+import struct
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from utils import load_words, load_all_words, load_accepted_words
+from pattern_kernel import get_pattern_dtype, encode_words, compute_patterns
+from resources import LazyResource, get_data_filepath
+
+# On-disk table: fixed size header followed by the raw (n_all, n_accepted) matrix in C order.
+# Header: magic, format version, word length, pattern itemsize, n_all, n_accepted,
+# sha256 of words_all, sha256 of words_accepted (zero padded up to PATTERN_TABLE_HEADER_SIZE)
+PATTERN_TABLE_MAGIC = b"WRDLPTRN"
+PATTERN_TABLE_VERSION = 1
+PATTERN_TABLE_HEADER_FORMAT = "<8sIIIQQ32s32s"
+PATTERN_TABLE_HEADER_SIZE = 128
+
+
+def get_word_length(words_all: tuple[str, ...], words_accepted: tuple[str, ...]) -> int:
+    lengths = {len(word) for word in words_all} | {len(word) for word in words_accepted}
+    if len(lengths) != 1:
+        raise ValueError(f"All words should have the same length, got lengths {sorted(lengths)}")
+    return lengths.pop()
+
+
+def build_pattern_matrix(words_all: tuple[str, ...], words_accepted: tuple[str, ...],
+                         chunk_size: int = 512) -> np.ndarray:
+    word_length = get_word_length(words_all, words_accepted)
+    all_codes = encode_words(words_all, word_length)
+    accepted_codes = encode_words(words_accepted, word_length)
+
+    matrix = np.empty((len(words_all), len(words_accepted)), dtype=get_pattern_dtype(word_length))
+    for start in range(0, len(words_all), chunk_size):
+        matrix[start:start + chunk_size] = compute_patterns(all_codes[start:start + chunk_size], accepted_codes)
+    return matrix
+
+
+class PatternMatrix:
+    """
+    Patterns of every guess (any word from `words_all`) against every secret (any word from `words_accepted`).
+    Words are referred to by their integer id, which is the index in the corresponding word tuple,
+    so rows are guess ids and columns are secret ids.
+    """
+
+    def __init__(self, words_all: tuple[str, ...], words_accepted: tuple[str, ...], matrix: np.ndarray = None):
+        self.__words_all = words_all
+        self.__words_accepted = words_accepted
+        self.__all_index = {word: i for i, word in enumerate(words_all)}
+        self.__accepted_index = {word: i for i, word in enumerate(words_accepted)}
+        self.__word_length = get_word_length(words_all, words_accepted)
+
+        if matrix is None:
+            matrix = build_pattern_matrix(words_all, words_accepted)
+        if matrix.shape != (len(words_all), len(words_accepted)):
+            raise ValueError(f"Pattern matrix shape {matrix.shape} doesn't match word lists "
+                             f"({len(words_all)}, {len(words_accepted)})")
+        # plain ndarray view (still backed by the same memory map, if any) skips memmap's python-level indexing
+        self.__matrix = np.asarray(matrix)
+        self.__all_codes = None
+
+    @property
+    def words_all(self) -> tuple[str, ...]:
+        return self.__words_all
+
+    @property
+    def words_accepted(self) -> tuple[str, ...]:
+        return self.__words_accepted
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self.__matrix
+
+    @property
+    def word_length(self) -> int:
+        return self.__word_length
+
+    @property
+    def all_codes(self) -> np.ndarray:
+        if self.__all_codes is None:
+            self.__all_codes = encode_words(self.__words_all, self.__word_length)
+        return self.__all_codes
+
+    def all_id(self, word: str) -> int:
+        return self.__all_index[word]
+
+    def accepted_id(self, word: str) -> int:
+        return self.__accepted_index[word]
+
+    def all_ids(self, words: tuple[str, ...]) -> np.ndarray:
+        return np.fromiter((self.__all_index[word] for word in words), dtype=np.intp, count=len(words))
+
+    def accepted_ids(self, words: tuple[str, ...]) -> np.ndarray:
+        return np.fromiter((self.__accepted_index[word] for word in words), dtype=np.intp, count=len(words))
+
+    def pattern(self, word_guess: str, word_secret: str) -> int:
+        return int(self.__matrix[self.__all_index[word_guess], self.__accepted_index[word_secret]])
+
+
+def hash_words(words: tuple[str, ...]) -> bytes:
+    return hashlib.sha256("\n".join(words).encode("ascii")).digest()
+
+
+def get_pattern_table_filepath() -> str:
+    return get_data_filepath("word_to_word_pattern.bin")
+
+
+def pack_pattern_table_header(words_all: tuple[str, ...], words_accepted: tuple[str, ...]) -> bytes:
+    word_length = get_word_length(words_all, words_accepted)
+    header = struct.pack(PATTERN_TABLE_HEADER_FORMAT, PATTERN_TABLE_MAGIC, PATTERN_TABLE_VERSION, word_length,
+                         get_pattern_dtype(word_length).itemsize, len(words_all), len(words_accepted),
+                         hash_words(words_all), hash_words(words_accepted))
+    return header.ljust(PATTERN_TABLE_HEADER_SIZE, b"\0")
+
+
+def get_pattern_table_size(words_all: tuple[str, ...], words_accepted: tuple[str, ...]) -> int:
+    itemsize = get_pattern_dtype(get_word_length(words_all, words_accepted)).itemsize
+    return PATTERN_TABLE_HEADER_SIZE + len(words_all) * len(words_accepted) * itemsize
+
+
+def is_pattern_table_of(filepath: str, words_all: tuple[str, ...], words_accepted: tuple[str, ...]) -> bool:
+    """Whether the (possibly partially written) table at `filepath` is laid out for the word lists"""
+    try:
+        with open(filepath, 'rb') as f:
+            header = f.read(PATTERN_TABLE_HEADER_SIZE)
+        size = os.path.getsize(filepath)
+    except FileNotFoundError:
+        return False
+    return (header == pack_pattern_table_header(words_all, words_accepted) and
+            size == get_pattern_table_size(words_all, words_accepted))
+
+
+def dump_pattern_matrix(pattern_matrix: PatternMatrix, filepath: str):
+    word_length = get_word_length(pattern_matrix.words_all, pattern_matrix.words_accepted)
+    matrix = np.ascontiguousarray(pattern_matrix.matrix, dtype=get_pattern_dtype(word_length))
+
+    # write to a temporary file first, so concurrent readers never see a half written table
+    filepath_tmp = f"{filepath}.{os.getpid()}.tmp"
+    with open(filepath_tmp, 'wb') as f:
+        f.write(pack_pattern_table_header(pattern_matrix.words_all, pattern_matrix.words_accepted))
+        f.write(matrix.tobytes())
+    os.replace(filepath_tmp, filepath)
+
+
+def load_pattern_matrix(filepath: str, words_all: tuple[str, ...],
+                        words_accepted: tuple[str, ...]) -> PatternMatrix | None:
+    """
+    Memory map the table from `filepath` (pages are shared between all processes loading the same file).
+    Returns None if the file is missing or was built for other word lists/format, so that it could be rebuilt.
+    """
+    if not is_pattern_table_of(filepath, words_all, words_accepted):
+        return None
+
+    word_length = get_word_length(words_all, words_accepted)
+    matrix = np.memmap(filepath, dtype=get_pattern_dtype(word_length), mode='r', offset=PATTERN_TABLE_HEADER_SIZE,
+                       shape=(len(words_all), len(words_accepted)))
+    return PatternMatrix(words_all, words_accepted, matrix)
+
+
+# table file and encoded word lists of a table builder worker process, see `_init_table_worker`
+_worker_table: tuple[str, np.ndarray, np.ndarray] = None
+
+
+def _init_table_worker(filepath: str, all_codes: np.ndarray, accepted_codes: np.ndarray):
+    global _worker_table
+    _worker_table = (filepath, all_codes, accepted_codes)
+
+
+def _write_table_rows(filepath: str, all_codes: np.ndarray, accepted_codes: np.ndarray,
+                      start: int, stop: int) -> tuple[int, int]:
+    """Computes guess rows [start, stop) and writes them in place, the file already has its full size"""
+    rows = compute_patterns(all_codes[start:stop], accepted_codes)
+    with open(filepath, 'r+b') as f:
+        f.seek(PATTERN_TABLE_HEADER_SIZE + start * rows.shape[1] * rows.itemsize)
+        f.write(rows.tobytes())
+    return start, stop
+
+
+def _write_table_rows_worker(start: int, stop: int) -> tuple[int, int]:
+    return _write_table_rows(*_worker_table, start, stop)
+
+
+def _load_table_progress(filepath_progress: str, n_rows: int) -> np.ndarray:
+    """Rows logged as written by an interrupted build"""
+    rows_done = np.zeros(n_rows, dtype=bool)
+    try:
+        with open(filepath_progress, 'r') as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return rows_done
+    for line in lines:
+        # last line may be cut short by the interruption
+        if line.endswith("\n") and len(fields := line.split()) == 2:
+            rows_done[int(fields[0]):int(fields[1])] = True
+    return rows_done
+
+
+def build_pattern_table(filepath: str, words_all: tuple[str, ...], words_accepted: tuple[str, ...],
+                        n_workers: int = 1, chunk_size: int = 256, resume: bool = True, verbose: bool = True):
+    """
+    Build the on-disk table of the word lists (any word length) in chunks of guess rows. Every chunk is computed
+    by one of `n_workers` processes and written straight into the file, so at most one chunk per worker is in memory.
+
+    With `resume`, the table is built in `filepath`.partial and written chunks are logged to `filepath`.progress,
+    so building again after an interruption computes only the missing chunks (run one such build at a time).
+    Otherwise a file private to this process is used, so that concurrent builds are safe, and it's removed
+    if the build fails.
+    Finished table replaces `filepath` atomically.
+    """
+    word_length = get_word_length(words_all, words_accepted)
+    all_codes = encode_words(words_all, word_length)
+    accepted_codes = encode_words(words_accepted, word_length)
+    n_all = len(words_all)
+    row_nbytes = len(words_accepted) * get_pattern_dtype(word_length).itemsize
+
+    if resume:
+        filepath_partial, filepath_progress = f"{filepath}.partial", f"{filepath}.progress"
+        rows_done = np.zeros(n_all, dtype=bool)
+        if is_pattern_table_of(filepath_partial, words_all, words_accepted):
+            rows_done = _load_table_progress(filepath_progress, n_all)
+    else:
+        filepath_partial, filepath_progress = f"{filepath}.{os.getpid()}.partial", None
+        rows_done = np.zeros(n_all, dtype=bool)
+
+    if not rows_done.any():
+        # file gets its full size right away (sparse where supported), chunks are written in any order
+        with open(filepath_partial, 'wb') as f:
+            f.write(pack_pattern_table_header(words_all, words_accepted))
+            f.truncate(get_pattern_table_size(words_all, words_accepted))
+        if filepath_progress is not None:
+            open(filepath_progress, 'w').close()
+    elif verbose:
+        print(f"Resuming {filepath_partial}: {rows_done.sum()}/{n_all} rows already built")
+
+    chunks = [(start, min(start + chunk_size, n_all)) for start in range(0, n_all, chunk_size)
+              if not rows_done[start:start + chunk_size].all()]
+    n_rows_todo = sum(stop - start for start, stop in chunks)
+
+    executor = None
+    progress = None
+    n_rows_written = 0
+    start_time = time.perf_counter()
+    try:
+        if n_workers > 1 and len(chunks) > 1:
+            executor = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_table_worker,
+                                           initargs=(filepath_partial, all_codes, accepted_codes))
+            futures = [executor.submit(_write_table_rows_worker, start, stop) for start, stop in chunks]
+            chunks_written = (future.result() for future in as_completed(futures))
+        else:
+            chunks_written = (_write_table_rows(filepath_partial, all_codes, accepted_codes, start, stop)
+                              for start, stop in chunks)
+        if filepath_progress is not None:
+            progress = open(filepath_progress, 'a')
+
+        for start, stop in chunks_written:
+            if progress is not None:
+                progress.write(f"{start} {stop}\n")
+                progress.flush()
+            n_rows_written += stop - start
+            if verbose:
+                elapsed = time.perf_counter() - start_time
+                rows_per_s = n_rows_written / elapsed
+                print(f"\r{n_all - n_rows_todo + n_rows_written}/{n_all} rows, {rows_per_s:.0f} rows/s, "
+                      f"{rows_per_s * row_nbytes / 2 ** 20:.1f} MB/s, "
+                      f"ETA {(n_rows_todo - n_rows_written) / rows_per_s:.1f}s", end="", flush=True)
+        if verbose:
+            print(f"\nBuilt {filepath} ({n_all} x {len(words_accepted)}, word length {word_length}) "
+                  f"in {time.perf_counter() - start_time:.2f}s")
+        os.replace(filepath_partial, filepath)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if progress is not None:
+            progress.close()
+        # a private file can't be resumed, so it's removed if the build didn't finish
+        if not resume and os.path.exists(filepath_partial):
+            os.remove(filepath_partial)
+    if filepath_progress is not None:
+        os.remove(filepath_progress)
+
+
+def load_or_build_pattern_matrix() -> PatternMatrix:
+    """Load pattern table from disk, (re)building it if word lists have changed since it was dumped"""
+    words_all = load_all_words()
+    words_accepted = load_accepted_words()
+    filepath = get_pattern_table_filepath()
+
+    pattern_matrix = load_pattern_matrix(filepath, words_all, words_accepted)
+    if pattern_matrix is None:
+        print("Building word pattern table, this may take a few seconds "
+              "(python pattern_matrix.py --workers N builds it with N processes)...")
+        build_pattern_table(filepath, words_all, words_accepted, resume=False, verbose=False)
+        pattern_matrix = load_pattern_matrix(filepath, words_all, words_accepted)
+    return pattern_matrix
+
+
+PATTERN_MATRIX: LazyResource[PatternMatrix] = LazyResource(load_or_build_pattern_matrix)
+
+
+def get_pattern_matrix() -> PatternMatrix:
+    """Pattern table of the word lists in the data directory, shared by everything using it"""
+    return PATTERN_MATRIX.get()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the pattern table of two word lists with a process pool, "
+                                                 "an interrupted build is resumed when run again")
+    parser.add_argument("--words-all", help="guess words, one per line (default: data directory word list)")
+    parser.add_argument("--words-accepted", help="secret words, one per line (default: data directory word list)")
+    parser.add_argument("--output", help="table filepath (default: data directory table)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=256, help="guess rows computed and written at once")
+    parser.add_argument("--no-resume", action="store_true", help="build from scratch, ignoring an interrupted build")
+    args = parser.parse_args()
+
+    build_pattern_table(args.output or get_pattern_table_filepath(),
+                        load_words(args.words_all) if args.words_all else load_all_words(),
+                        load_words(args.words_accepted) if args.words_accepted else load_accepted_words(),
+                        n_workers=args.workers, chunk_size=args.chunk_size, resume=not args.no_resume)
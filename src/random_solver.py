@@ -10,7 +10,11 @@ class RandomSolver(Solver):
         self.__only_accepted_words = only_accepted_words
         super().__init__(f"{self.__SOLVER_NAME}({'accepted words' if self.__only_accepted_words else 'all words'})")
 
-    def make_guess(self, state: State) -> str:
+    def _make_guess(self, state: State) -> str:
         if self.__only_accepted_words:
             return random.choice(state.words_accepted)
         return random.choice(state.words_all)
+
+    @property
+    def is_deterministic(self) -> bool:
+        return False
@@ -0,0 +1,70 @@
+"""
+Registry of lazily loaded shared resources (word lists, pattern table, decision tree) and the data directory
+they are loaded from. Nothing is loaded at import time, every resource is loaded once on first use.
+
+Data directory is, in order of precedence: set with `set_data_dir`, `WORDLE_DATA_DIR` environment variable,
+or the data folder next to this module.
+"""
+import os
+import threading
+from typing import Callable, Generic, TypeVar
+
+DATA_DIR_ENV = "WORDLE_DATA_DIR"
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+T = TypeVar("T")
+
+
+class LazyResource(Generic[T]):
+    """Value created by `loader` on the first `get`, concurrent first calls load it only once"""
+    __RESOURCES: list["LazyResource"] = []
+
+    def __init__(self, loader: Callable[[], T]):
+        self.__loader = loader
+        self.__lock = threading.Lock()
+        self.__value: T = None
+        self.__is_loaded = False
+        LazyResource.__RESOURCES.append(self)
+
+    def get(self) -> T:
+        if not self.__is_loaded:
+            with self.__lock:
+                if not self.__is_loaded:
+                    self.__value = self.__loader()
+                    self.__is_loaded = True
+        return self.__value
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__is_loaded
+
+    def reset(self):
+        """Drop loaded value, it's loaded again on the next `get`"""
+        with self.__lock:
+            self.__value = None
+            self.__is_loaded = False
+
+    @staticmethod
+    def reset_all():
+        for resource in LazyResource.__RESOURCES:
+            resource.reset()
+
+
+_data_dir: str = None
+
+
+def get_data_dir() -> str:
+    if _data_dir is not None:
+        return _data_dir
+    return os.environ.get(DATA_DIR_ENV, DEFAULT_DATA_DIR)
+
+
+def set_data_dir(data_dir: str | None):
+    """Load resources from `data_dir` from now on (None restores the default), already loaded ones are dropped"""
+    global _data_dir
+    _data_dir = None if data_dir is None else os.path.abspath(data_dir)
+    LazyResource.reset_all()
+
+
+def get_data_filepath(filename: str) -> str:
+    return os.path.join(get_data_dir(), filename)
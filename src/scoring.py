@@ -0,0 +1,177 @@
+from typing import Callable
+
+import numpy as np
+
+from constants import NUMBER_OF_PATTERNS
+
+# scores every guess by its pattern histogram over the remaining secrets (n_guess, NUMBER_OF_PATTERNS), higher is better
+Objective = Callable[[np.ndarray], np.ndarray]
+
+
+def get_pattern_histograms(matrix: np.ndarray, guess_ids: np.ndarray, secret_ids: np.ndarray) -> np.ndarray:
+    """Number of secrets falling into each pattern bucket for every guess, shape (n_guess, NUMBER_OF_PATTERNS)"""
+    block = matrix[np.ix_(guess_ids, secret_ids)]
+    # shift every row into its own range of bins, so a single bincount covers the whole block
+    offsets = np.arange(len(guess_ids), dtype=np.intp)[:, np.newaxis] * NUMBER_OF_PATTERNS
+    histograms = np.bincount((block + offsets).ravel(), minlength=len(guess_ids) * NUMBER_OF_PATTERNS)
+    return histograms.reshape(len(guess_ids), NUMBER_OF_PATTERNS)
+
+
+def calculate_entropies(histograms: np.ndarray) -> np.ndarray:
+    """
+    Shannon entropy (in bits) of every histogram row, as log2(n) - sum(c * log2(c)) / n over bucket sizes c.
+    Bucket sizes are sorted before summing, so that histograms with the same bucket sizes get bit-identical entropies
+    (otherwise ties are broken by float rounding instead of by word order)
+    """
+    total = histograms.sum(axis=1)
+    n_max = int(total.max(initial=0))
+    # at most n_max buckets of a row are not empty, and those are the last ones after sorting
+    n_buckets = min(histograms.shape[1], n_max)
+    counts = np.sort(histograms.astype(np.min_scalar_type(n_max)), axis=1)[:, histograms.shape[1] - n_buckets:]
+    c = np.arange(n_max + 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        c_log_c = np.where(c > 0, c * np.log2(c), 0.)
+    total = np.maximum(total, 1)
+    return np.log2(total) - c_log_c[counts].sum(axis=1) / total
+
+
+def calculate_expected_sizes(histograms: np.ndarray) -> np.ndarray:
+    """Expected number of secrets left after the guess, sum(c * c) / n over bucket sizes c"""
+    total = np.maximum(histograms.sum(axis=1), 1)
+    return (histograms.astype(np.int64) ** 2).sum(axis=1) / total
+
+
+def calculate_max_bucket_sizes(histograms: np.ndarray) -> np.ndarray:
+    """Number of secrets left after the guess in the worst case"""
+    return histograms.max(axis=1).astype(np.int64)
+
+
+def calculate_bucket_counts(histograms: np.ndarray) -> np.ndarray:
+    """Number of distinct patterns the guess can get"""
+    return np.count_nonzero(histograms, axis=1)
+
+
+def expected_size_objective(histograms: np.ndarray) -> np.ndarray:
+    return -calculate_expected_sizes(histograms)
+
+
+def minimax_objective(histograms: np.ndarray) -> np.ndarray:
+    return -calculate_max_bucket_sizes(histograms)
+
+
+# objectives by name, new ones are registered here (module level functions, so that solvers using them can be pickled)
+OBJECTIVES: dict[str, Objective] = {
+    "entropy": calculate_entropies,
+    "expected_size": expected_size_objective,
+    "minimax": minimax_objective,
+    "most_buckets": calculate_bucket_counts,
+}
+
+
+def get_objective(name: str) -> Objective:
+    if name not in OBJECTIVES:
+        raise ValueError(f"Unknown objective '{name}', expected one of {', '.join(OBJECTIVES)}")
+    return OBJECTIVES[name]
+
+
+def calculate_scores_chunked(matrix: np.ndarray, guess_ids: np.ndarray, secret_ids: np.ndarray,
+                             objectives: tuple[Objective, ...], max_block_size: int = 2 ** 20) -> np.ndarray:
+    """
+    Scores of every guess by every objective, shape (n_objectives, n_guess). Histograms are computed once for all
+    objectives, in chunks of at most `max_block_size` (guess, secret) pairs or histogram bins, so memory use
+    doesn't grow with the number of guesses
+    """
+    chunk_size = max(1, max_block_size // max(len(secret_ids), NUMBER_OF_PATTERNS))
+    scores = np.empty((len(objectives), len(guess_ids)))
+    for start in range(0, len(guess_ids), chunk_size):
+        chunk = guess_ids[start:start + chunk_size]
+        histograms = get_pattern_histograms(matrix, chunk, secret_ids)
+        for i, objective in enumerate(objectives):
+            scores[i, start:start + len(chunk)] = objective(histograms)
+    return scores
+
+
+def calculate_entropies_chunked(matrix: np.ndarray, guess_ids: np.ndarray, secret_ids: np.ndarray,
+                                max_block_size: int = 2 ** 20) -> np.ndarray:
+    """Same as `calculate_entropies(get_pattern_histograms(...))`, but in chunks as in `calculate_scores_chunked`"""
+    return calculate_scores_chunked(matrix, guess_ids, secret_ids, (calculate_entropies,), max_block_size)[0]
+
+
+class PartitionHistograms:
+    """
+    Pattern histograms of `guess_ids` over `secret_ids`, which can be narrowed to subsets of both (e.g. to the
+    pattern bucket left after a guess). Narrowing subtracts histograms of the removed secrets, or rebuilds them
+    from the kept ones if fewer secrets are kept than removed, so it scales with min(kept, removed) secrets.
+    Histograms are built and scored in chunks of at most `max_block_size` elements, as in `calculate_scores_chunked`
+    (but all of them are kept).
+    """
+
+    def __init__(self, matrix: np.ndarray, guess_ids: np.ndarray, secret_ids: np.ndarray,
+                 max_block_size: int = 2 ** 20):
+        self.__matrix = matrix
+        self.__guess_ids = guess_ids
+        self.__secret_ids = secret_ids
+        self.__max_block_size = max_block_size
+        self.__histograms = self.__get_histograms(guess_ids, secret_ids)
+
+    def __get_chunk_size(self, n_secrets: int) -> int:
+        return max(1, self.__max_block_size // max(n_secrets, NUMBER_OF_PATTERNS))
+
+    def __get_histograms(self, guess_ids: np.ndarray, secret_ids: np.ndarray) -> np.ndarray:
+        histograms = np.empty((len(guess_ids), NUMBER_OF_PATTERNS), dtype=np.min_scalar_type(len(self.__secret_ids)))
+        chunk_size = self.__get_chunk_size(len(secret_ids))
+        for start in range(0, len(guess_ids), chunk_size):
+            chunk = guess_ids[start:start + chunk_size]
+            histograms[start:start + len(chunk)] = get_pattern_histograms(self.__matrix, chunk, secret_ids)
+        return histograms
+
+    @property
+    def guess_ids(self) -> np.ndarray:
+        return self.__guess_ids
+
+    @property
+    def secret_ids(self) -> np.ndarray:
+        return self.__secret_ids
+
+    @property
+    def histograms(self) -> np.ndarray:
+        return self.__histograms
+
+    def narrow(self, guess_ids: np.ndarray, secret_ids: np.ndarray) -> "PartitionHistograms":
+        """
+        Histograms of `guess_ids` over `secret_ids`, both have to be subsequences of the current ids
+        (same order, as given by `np.isin` masks), otherwise histograms are rebuilt from scratch
+        """
+        if 2 * len(secret_ids) <= len(self.__secret_ids):
+            # at least as many secrets removed as kept, no need to look for them
+            return PartitionHistograms(self.__matrix, guess_ids, secret_ids, self.__max_block_size)
+        guess_mask = np.isin(self.__guess_ids, guess_ids, assume_unique=True)
+        secret_mask = np.isin(self.__secret_ids, secret_ids, assume_unique=True)
+        removed_ids = self.__secret_ids[~secret_mask]
+        if (len(removed_ids) >= len(secret_ids) or
+                not np.array_equal(self.__guess_ids[guess_mask], guess_ids) or
+                not np.array_equal(self.__secret_ids[secret_mask], secret_ids)):
+            return PartitionHistograms(self.__matrix, guess_ids, secret_ids, self.__max_block_size)
+
+        histograms = PartitionHistograms.__new__(PartitionHistograms)
+        histograms.__matrix = self.__matrix
+        histograms.__guess_ids = guess_ids
+        histograms.__secret_ids = secret_ids
+        histograms.__max_block_size = self.__max_block_size
+        # counts only go down, so they fit into the current dtype
+        histograms.__histograms = self.__histograms[guess_mask]
+        histograms.__histograms -= self.__get_histograms(guess_ids, removed_ids).astype(self.__histograms.dtype)
+        return histograms
+
+    def calculate_scores(self, objectives: tuple[Objective, ...]) -> np.ndarray:
+        """Scores of every guess by every objective, shape (n_objectives, n_guess)"""
+        scores = np.empty((len(objectives), len(self.__guess_ids)))
+        chunk_size = self.__get_chunk_size(len(self.__secret_ids))
+        for start in range(0, len(self.__guess_ids), chunk_size):
+            chunk = self.__histograms[start:start + chunk_size]
+            for i, objective in enumerate(objectives):
+                scores[i, start:start + len(chunk)] = objective(chunk)
+        return scores
+
+    def calculate_entropies(self) -> np.ndarray:
+        return self.calculate_scores((calculate_entropies,))[0]
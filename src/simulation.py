@@ -0,0 +1,109 @@
+import time
+import random
+
+from constants import NUMBER_OF_TURNS, NUMBER_OF_PATTERNS
+from state import State, StateMode, PatternState
+from solver import Solver
+from pattern_matrix import PatternMatrix, get_pattern_matrix
+from benchmark_records import GameRecord
+
+
+class SimulationEngine:
+    """
+    Lean replacement of `Wordle` for simulations: plays a solver against a secret word with pattern matrix lookups,
+    without logging, `StateRow`s and repeated word list validation. Follows the same rules as `Wordle`,
+    so that it gives the same scores for the same state mode.
+    """
+    __PATTERN_WON = NUMBER_OF_PATTERNS - 1
+
+    def __init__(self, pattern_matrix: PatternMatrix = None, state_mode: StateMode = StateMode.PATTERNS):
+        self.__pattern_matrix = get_pattern_matrix() if pattern_matrix is None else pattern_matrix
+        self.__state_mode = state_mode
+        # states are immutable, so every game starts from the same object (and its already materialized word tuples)
+        if state_mode == StateMode.PATTERNS:
+            self.__initial_state = PatternState(self.__pattern_matrix)
+        else:
+            self.__initial_state = State((), self.__pattern_matrix.words_all, self.__pattern_matrix.words_accepted)
+
+    def get_initial_state(self) -> State | PatternState:
+        return self.__initial_state
+
+    def play(self, solver: Solver, word_secret: str, seed: int | str = None, hard_mode: bool = True) -> GameRecord:
+        if seed is not None:
+            random.seed(seed)
+
+        pattern_matrix = self.__pattern_matrix
+        matrix = pattern_matrix.matrix
+        secret_id = pattern_matrix.accepted_id(word_secret)
+        state = self.get_initial_state()
+        guesses = []
+        guess_times = []
+        score = -1
+        for turn in range(1, NUMBER_OF_TURNS + 1):
+            start = time.perf_counter()
+            guess_str = solver.make_guess(state)
+            guess_times.append(time.perf_counter() - start)
+            guesses.append(guess_str)
+
+            if hard_mode and not state.check_word(guess_str):
+                raise ValueError(f"{solver.name} guessed {guess_str}, which is not valid in hard mode")
+            # raises KeyError for words outside of the word list
+            pattern_val = int(matrix[pattern_matrix.all_id(guess_str), secret_id])
+            if pattern_val == self.__PATTERN_WON:
+                score = turn
+                break
+            state = state.advance(guess_str, pattern_val)
+        return GameRecord(solver.name, word_secret, seed, score, guesses, guess_times)
+
+    def play_many(self, solver: Solver, games: list[tuple[str, str]], hard_mode: bool = True) -> list[GameRecord]:
+        """
+        Plays games of (secret word, seed) in lockstep: every turn the solver makes guesses for all unfinished
+        games with `Solver.make_guesses`, so games in the same state share a single guess. Games in the same state
+        which get the same pattern also share the next state. Guess time of a game is the time of the guess of its
+        state (see `Solver.make_guesses`), games in the same state get the same time.
+        Solvers which aren't deterministic play game by game with `play` instead.
+        """
+        if not solver.is_deterministic:
+            return [self.play(solver, word_secret, seed, hard_mode) for word_secret, seed in games]
+
+        pattern_matrix = self.__pattern_matrix
+        matrix = pattern_matrix.matrix
+        secret_ids = [pattern_matrix.accepted_id(word_secret) for word_secret, _ in games]
+        states = [self.get_initial_state()] * len(games)
+        guesses = [[] for _ in games]
+        guess_times = [[] for _ in games]
+        scores = [-1] * len(games)
+        active = list(range(len(games)))
+        for turn in range(1, NUMBER_OF_TURNS + 1):
+            if not active:
+                break
+            turn_guess_times = []
+            turn_guesses = solver.make_guesses([states[i] for i in active], guess_times=turn_guess_times)
+
+            # states are alive until the end of the turn, so their ids are unique
+            next_states = dict()
+            checked = dict()
+            next_active = []
+            for i, guess_str, guess_time in zip(active, turn_guesses, turn_guess_times):
+                guesses[i].append(guess_str)
+                guess_times[i].append(guess_time)
+                state = states[i]
+                if hard_mode:
+                    is_valid = checked.get((id(state), guess_str))
+                    if is_valid is None:
+                        is_valid = checked[(id(state), guess_str)] = state.check_word(guess_str)
+                    if not is_valid:
+                        raise ValueError(f"{solver.name} guessed {guess_str}, which is not valid in hard mode")
+                pattern_val = int(matrix[pattern_matrix.all_id(guess_str), secret_ids[i]])
+                if pattern_val == self.__PATTERN_WON:
+                    scores[i] = turn
+                    continue
+                next_key = (id(state), guess_str, pattern_val)
+                next_state = next_states.get(next_key)
+                if next_state is None:
+                    next_state = next_states[next_key] = state.advance(guess_str, pattern_val)
+                states[i] = next_state
+                next_active.append(i)
+            active = next_active
+        return [GameRecord(solver.name, word_secret, seed, scores[i], guesses[i], guess_times[i])
+                for i, (word_secret, seed) in enumerate(games)]
@@ -1,17 +1,141 @@
+import time
 from abc import ABC, abstractmethod
 
 from wordle import State
+from constants import NUMBER_OF_TURNS
+from decision_cache import DecisionCache
+from state import StateMode
+from opening_book import OpeningBook, get_opening_books
 
 
 class Solver(ABC):
 
-    def __init__(self, solver_name: str):
+    def __init__(self, solver_name: str, cache: DecisionCache = None):
+        """
+        :param cache: guesses of deterministic solvers are cached by state and solver config (so solvers can share
+            a cache), the cache isn't used otherwise
+        """
         self.__solver_name = solver_name
+        self.__cache = cache
+        # prefix of the decision cache keys, see `get_cache_key`
+        self.__cache_prefix: str = None
+        # guesses of the first two turns by state mode, if books were built for this solver (see opening_book.py),
+        # loaded on first use since subclasses set their config after this
+        self.__opening_books: dict[StateMode, OpeningBook] = None
 
-    @abstractmethod
     def make_guess(self, state: State) -> str:
+        guess = self.__get_book_guess(state)
+        if guess is not None:
+            return guess
+        if self.__cache is None or not self.is_deterministic:
+            return self._make_guess(state)
+
+        key = self.get_cache_key(state.key)
+        guess = self.__cache.get(key)
+        if guess is None:
+            guess = self._make_guess(state)
+            self.__cache.put(key, guess)
+        return guess
+
+    def make_guesses(self, states: list[State], guess_times: list[float] = None) -> list[str]:
+        """
+        Guesses for many states at once. Deterministic solvers make only one guess for every distinct state
+        (by `State.key`), guesses which aren't cached are made together by `_make_guesses`.
+        With `guess_times`, time (seconds) of the guess of every state is appended to it: time of the book or cache
+        lookup, or of making the guess of its distinct state (guesses are made one by one then, to be timed apart)
+        """
+        if not self.is_deterministic:
+            guesses = []
+            for state in states:
+                start = time.perf_counter()
+                guesses.append(self.make_guess(state))
+                if guess_times is not None:
+                    guess_times.append(time.perf_counter() - start)
+            return guesses
+
+        guesses = dict()
+        missing = dict()
+        times = dict()
+        for state in states:
+            key = state.key
+            if key in guesses or key in missing:
+                continue
+            start = time.perf_counter()
+            guess = self.__get_book_guess(state)
+            if guess is None and self.__cache is not None:
+                guess = self.__cache.get(self.get_cache_key(key))
+            if guess is None:
+                missing[key] = state
+            else:
+                guesses[key] = guess
+                times[key] = time.perf_counter() - start
+
+        if guess_times is None:
+            missing_guesses = self._make_guesses(list(missing.values()))
+        else:
+            missing_guesses = []
+            for key, state in missing.items():
+                start = time.perf_counter()
+                missing_guesses.append(self._make_guesses([state])[0])
+                times[key] = time.perf_counter() - start
+        for key, guess in zip(missing, missing_guesses):
+            guesses[key] = guess
+            if self.__cache is not None:
+                self.__cache.put(self.get_cache_key(key), guess)
+        if guess_times is not None:
+            guess_times.extend(times[state.key] for state in states)
+        return [guesses[state.key] for state in states]
+
+    def get_cache_key(self, state_key: str) -> str:
+        """Decision cache key of a state, namespaced by the solver config so that solvers can share a cache"""
+        if self.__cache_prefix is None:
+            self.__cache_prefix = f"{self.config}|"
+        return self.__cache_prefix + state_key
+
+    def __get_book_guess(self, state: State) -> str | None:
+        if state.turns_left < NUMBER_OF_TURNS - 1:
+            return None
+        opening_book = self.opening_books.get(state.state_mode)
+        return None if opening_book is None else opening_book.get_guess(state.history)
+
+    @abstractmethod
+    def _make_guess(self, state: State) -> str:
+        """Actual guess of the solver, `make_guess` wraps it with the decision cache"""
         pass
 
+    def _make_guesses(self, states: list[State]) -> list[str]:
+        """Actual guesses for distinct states, solvers can override it to score states together"""
+        return [self._make_guess(state) for state in states]
+
+    @property
+    def is_deterministic(self) -> bool:
+        """Whether the solver always makes the same guess in the same state"""
+        return True
+
     @property
     def name(self) -> str:
         return self.__solver_name
+
+    @property
+    def config(self) -> str:
+        """Name and all the options which change guesses, solvers override it if their name leaves some out"""
+        return self.__solver_name
+
+    @property
+    def cache(self) -> DecisionCache | None:
+        return self.__cache
+
+    @property
+    def inner_solvers(self) -> tuple["Solver", ...]:
+        """Solvers this one makes some of its guesses with (e.g. a fallback), they have their own caches and books"""
+        return ()
+
+    @property
+    def opening_books(self) -> dict[StateMode, OpeningBook]:
+        if self.__opening_books is None:
+            self.__opening_books = get_opening_books(self) if self.is_deterministic else dict()
+        return self.__opening_books
+
+    def set_opening_books(self, opening_books: dict[StateMode, OpeningBook]):
+        """Replace the books loaded for this solver, empty to always make the guesses"""
+        self.__opening_books = opening_books
@@ -0,0 +1,62 @@
+"""
+Startup cost of the package: every step is timed in fresh interpreters (so that nothing is loaded yet),
+from a different working directory than this one (data directory doesn't depend on it).
+
+    python startup_benchmark.py --runs 5
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+# code run in a fresh interpreter, prints seconds spent on every step as JSON
+STARTUP_SCRIPT = """
+import sys, time, json
+sys.path.insert(0, {src_dir!r})
+times = {{}}
+start = time.perf_counter()
+import entropy_solver, wordle, benchmark
+times["import"] = time.perf_counter() - start
+
+start = time.perf_counter()
+from utils import load_all_words, load_accepted_words
+load_all_words(), load_accepted_words()
+times["word lists"] = time.perf_counter() - start
+
+start = time.perf_counter()
+from pattern_matrix import get_pattern_matrix
+get_pattern_matrix()
+times["pattern table"] = time.perf_counter() - start
+
+start = time.perf_counter()
+from state import PatternState
+state = PatternState(get_pattern_matrix()).advance("slate", 0)
+entropy_solver.EntropySolver().make_guess(state)
+times["first guess"] = time.perf_counter() - start
+print(json.dumps(times))
+"""
+
+
+def run_startup(src_dir: str, cwd: str) -> dict[str, float]:
+    output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT.format(src_dir=src_dir)], cwd=cwd,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure import and first use time in fresh interpreters")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as cwd:
+        runs = [run_startup(src_dir, cwd) for _ in range(args.runs)]
+
+    print("| Step | Median (ms) | Max (ms) |")
+    print("| --- | --- | --- |")
+    for step in runs[0]:
+        times = [run[step] for run in runs]
+        print(f"| {step} | {1000 * statistics.median(times):.1f} | {1000 * max(times):.1f} |")
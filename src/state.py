@@ -1,7 +1,14 @@
+import hashlib
 from enum import Enum
 from collections import Counter
 
+import numpy as np
+
 from constants import NUMBER_OF_TURNS, WORD_LENGTH, CHARS
+from utils import CharState, word_to_pattern_value, pattern_value_to_pattern_arr
+from word_index import WordIndex
+from pattern_matrix import PatternMatrix
+from pattern_kernel import get_patterns
 
 
 class GameStatus(Enum):
@@ -11,6 +18,24 @@ class GameStatus(Enum):
     LOST = "lost"
 
 
+class StateMode(Enum):
+    # candidates are filtered by letter constraints derived from all rows, see `State`
+    CONSTRAINTS = "constraints"
+    # candidates are partitioned by the observed pattern value, see `PatternState`
+    PATTERNS = "patterns"
+
+
+def get_state_key(turns_left: int, mask_all: np.ndarray, mask_accepted: np.ndarray) -> str:
+    """
+    Canonical key of the remaining words and turns: states of any kind leaving the same words get the same key.
+    Stable between processes, so it can be persisted (unlike `hash`)
+    """
+    digest = hashlib.blake2b(f"{turns_left}:{len(mask_all)}:{len(mask_accepted)}:".encode("ascii"), digest_size=16)
+    digest.update(np.packbits(mask_all).tobytes())
+    digest.update(np.packbits(mask_accepted).tobytes())
+    return digest.hexdigest()
+
+
 class StateRow:
     GREEN_BG = "\033[42m"
     GREY_BG = "\033[100m"
@@ -37,51 +62,94 @@ class StateRow:
     def __str__(self):
         return self.__repr__()
 
+    @staticmethod
+    def from_pattern_value(word: str, pattern_val: int) -> "StateRow":
+        pattern = pattern_value_to_pattern_arr(pattern_val)
+        return StateRow(word, [c == CharState.GREEN for c in pattern], [c == CharState.YELLOW for c in pattern])
+
+    @property
+    def pattern_value(self) -> int:
+        pattern_val = 0
+        for i in range(WORD_LENGTH):
+            if self._correct_letters[i]:
+                pattern_val += CharState.GREEN.value * (3 ** i)
+            elif self._wrong_position_letters[i]:
+                pattern_val += CharState.YELLOW.value * (3 ** i)
+        return pattern_val
+
 
 class State:
     def __init__(self, rows: tuple[StateRow, ...], words_all: tuple[str, ...], words_accepted: tuple[str, ...]):
         self.__rows = rows
+        self.__index_all = WordIndex.get(words_all)
+        self.__index_accepted = WordIndex.get(words_accepted)
+        self.__apply_constraints(self.__index_all.full_mask(), self.__index_accepted.full_mask())
 
+    def update_state(self, row: StateRow):
+        state = State.__new__(State)
+        state.__rows = self.__rows + (row,)
+        state.__index_all = self.__index_all
+        state.__index_accepted = self.__index_accepted
+        state.__apply_constraints(self.__mask_all, self.__mask_accepted)
+        return state
+
+    def advance(self, word: str, pattern_val: int):
+        return self.update_state(StateRow.from_pattern_value(word, pattern_val))
+
+    @property
+    def history(self) -> tuple[tuple[str, int], ...]:
+        """Guessed words with their pattern values"""
+        return tuple((row._word, row.pattern_value) for row in self.__rows)
+
+    def __apply_constraints(self, mask_all, mask_accepted):
         self.__present_letters_counter = self.__get_present_letters()
         self.__letter_constraints = self.__get_letter_constraints()
 
-        self.__words_all = tuple((word for word in words_all if self.check_word(word)))
-        self.__words_accepted = tuple((word for word in words_accepted if self.check_word(word)))
+        # words are filtered with the previous state's words, then materialized only when asked for
+        self.__mask_all = mask_all & self.__index_all.get_mask(self.__letter_constraints,
+                                                               self.__present_letters_counter)
+        self.__mask_accepted = mask_accepted & self.__index_accepted.get_mask(self.__letter_constraints,
+                                                                              self.__present_letters_counter)
+        self.__words_all = None
+        self.__words_accepted = None
+        self.__key = None
 
-    def update_state(self, row: StateRow):
-        updated_rows = self.__rows + (row,)
-        return State(updated_rows, self.__words_all, self.__words_accepted)
+    @property
+    def key(self) -> str:
+        if self.__key is None:
+            self.__key = get_state_key(self.turns_left, self.__mask_all, self.__mask_accepted)
+        return self.__key
 
     @property
     def words_accepted(self) -> tuple[str, ...]:
+        if self.__words_accepted is None:
+            self.__words_accepted = self.__index_accepted.get_words(self.__mask_accepted)
         return self.__words_accepted
 
     @property
     def words_all(self) -> tuple[str, ...]:
+        if self.__words_all is None:
+            self.__words_all = self.__index_all.get_words(self.__mask_all)
         return self.__words_all
 
     def check_word(self, word: str) -> bool:
         for i, constraints_set in enumerate(self.__letter_constraints):
             if word[i] not in constraints_set:
                 return False
-            word_cnt = Counter(word)
-            for key, val in self.__present_letters_counter.items():
-                if word_cnt[key] < val:
-                    return False
+        word_cnt = Counter(word)
+        for key, val in self.__present_letters_counter.items():
+            if word_cnt[key] < val:
+                return False
         return True
 
     def __repr__(self):
         return "\n".join(str(row) for row in self.__rows)
 
     def __eq__(self, other):
-        return (isinstance(other, State) and
-                self.__letter_constraints == other.__letter_constraints and
-                self.__present_letters_counter == other.__present_letters_counter)
+        return isinstance(other, State) and self.key == other.key
 
     def __hash__(self):
-        a = tuple(tuple(sorted(v)) for v in self.__letter_constraints)
-        b = tuple((v, self.__present_letters_counter[v]) for v in sorted(self.__present_letters_counter))
-        return hash((a, b))
+        return hash(self.key)
 
     def __get_letter_constraints(self) -> tuple[set[str], ...]:
         ans = [set(CHARS) for _ in range(WORD_LENGTH)]
@@ -116,3 +184,123 @@ class State:
     @property
     def turns_left(self):
         return NUMBER_OF_TURNS - len(self.__rows)
+
+    @property
+    def state_mode(self) -> StateMode:
+        return StateMode.CONSTRAINTS
+
+
+class PatternState:
+    """
+    Alternative to `State`: remaining words are exactly the words which would have produced the same patterns
+    for all guesses made so far. Accepted words are narrowed with a single lookup into the pattern matrix per turn.
+    Words are kept as sorted id arrays of `pattern_matrix.words_all` / `pattern_matrix.words_accepted`.
+    """
+    __ALL_PATTERNS_SIZE = 4
+
+    def __init__(self, pattern_matrix: PatternMatrix):
+        self.__pattern_matrix = pattern_matrix
+        self.__history: tuple[tuple[str, int], ...] = ()
+        self.__accepted_ids = np.arange(len(pattern_matrix.words_accepted))
+        self.__all_ids = np.arange(len(pattern_matrix.words_all))
+        self.__parent: PatternState = None
+        # patterns of the last few guessed words against `all_ids`, shared by children of this state
+        # with the same guess (bounded, since the initial state lives as long as the engine using it)
+        self.__all_patterns: dict[str, np.ndarray] = dict()
+        self.__words_all = None
+        self.__words_accepted = None
+        self.__key = None
+
+    def update_state(self, row: StateRow):
+        return self.advance(row._word, row.pattern_value)
+
+    def advance(self, word: str, pattern_val: int):
+        """Same as `update_state`, but without building a `StateRow`"""
+        pattern_matrix = self.__pattern_matrix
+        guess_id = pattern_matrix.all_id(word)
+
+        state = PatternState.__new__(PatternState)
+        state.__pattern_matrix = pattern_matrix
+        state.__history = self.__history + ((word, pattern_val),)
+        state.__accepted_ids = self.__accepted_ids[pattern_matrix.matrix[guess_id, self.__accepted_ids] == pattern_val]
+        # all words are narrowed only once asked for, see `all_ids`
+        state.__all_ids = None
+        state.__parent = self
+        state.__all_patterns = dict()
+        state.__words_all = None
+        state.__words_accepted = None
+        state.__key = None
+        return state
+
+    @property
+    def history(self) -> tuple[tuple[str, int], ...]:
+        """Guessed words with their pattern values"""
+        return self.__history
+
+    @property
+    def words_accepted(self) -> tuple[str, ...]:
+        if self.__words_accepted is None:
+            words = self.__pattern_matrix.words_accepted
+            self.__words_accepted = tuple(words[i] for i in self.__accepted_ids.tolist())
+        return self.__words_accepted
+
+    @property
+    def words_all(self) -> tuple[str, ...]:
+        if self.__words_all is None:
+            words = self.__pattern_matrix.words_all
+            self.__words_all = tuple(words[i] for i in self.all_ids.tolist())
+        return self.__words_all
+
+    @property
+    def key(self) -> str:
+        if self.__key is None:
+            mask_all = np.zeros(len(self.__pattern_matrix.words_all), dtype=bool)
+            mask_all[self.all_ids] = True
+            mask_accepted = np.zeros(len(self.__pattern_matrix.words_accepted), dtype=bool)
+            mask_accepted[self.__accepted_ids] = True
+            self.__key = get_state_key(self.turns_left, mask_all, mask_accepted)
+        return self.__key
+
+    @property
+    def accepted_ids(self) -> np.ndarray:
+        return self.__accepted_ids
+
+    @property
+    def all_ids(self) -> np.ndarray:
+        if self.__all_ids is None:
+            # pattern matrix only has accepted words as secrets, so patterns against other words are computed here
+            word, pattern_val = self.__history[-1]
+            self.__all_ids = self.__parent.all_ids[self.__parent.__get_all_patterns(word) == pattern_val]
+            self.__parent = None
+        return self.__all_ids
+
+    def __get_all_patterns(self, word: str) -> np.ndarray:
+        all_patterns = self.__all_patterns.get(word)
+        if all_patterns is None:
+            all_codes = self.__pattern_matrix.all_codes
+            guess_id = self.__pattern_matrix.all_id(word)
+            all_patterns = get_patterns(all_codes[guess_id], all_codes[self.all_ids])
+            if len(self.__all_patterns) >= self.__ALL_PATTERNS_SIZE:
+                del self.__all_patterns[next(iter(self.__all_patterns))]
+            self.__all_patterns[word] = all_patterns
+        return all_patterns
+
+    def check_word(self, word: str) -> bool:
+        return all(word_to_pattern_value(word_guess, word) == pattern_val for word_guess, pattern_val in self.__history)
+
+    def __repr__(self):
+        return "\n".join(str(StateRow.from_pattern_value(word, pattern_val)) for word, pattern_val in self.__history)
+
+    def __eq__(self, other):
+        return isinstance(other, PatternState) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    @property
+    def turns_left(self):
+        return NUMBER_OF_TURNS - len(self.__history)
+
+    @property
+    def state_mode(self) -> StateMode:
+        return StateMode.PATTERNS
@@ -0,0 +1,157 @@
+import os
+import json
+
+import numpy as np
+
+from solver import Solver
+from entropy_solver import EntropySolver
+from constants import NUMBER_OF_TURNS, NUMBER_OF_PATTERNS
+from wordle import State
+from pattern_matrix import PatternMatrix, get_pattern_matrix, hash_words
+from resources import LazyResource, get_data_filepath
+from scoring import Objective, get_pattern_histograms, calculate_entropies
+
+DECISION_TREE_VERSION = 1
+
+
+class DecisionTree:
+    """
+    Guess to make for every reachable game state. Node 0 is the root, every node has a guess and a child node
+    for every pattern the guess could get (except the winning one).
+    """
+
+    def __init__(self, guesses: list[str], children: list[dict[int, int]]):
+        self.__guesses = guesses
+        self.__children = children
+
+    def __len__(self):
+        return len(self.__guesses)
+
+    def get_guess(self, history: tuple[tuple[str, int], ...]) -> str | None:
+        """Guess for the state reached by `history`, None if state isn't in the tree"""
+        node = 0
+        for word, pattern_val in history:
+            if self.__guesses[node] != word:
+                return None
+            node = self.__children[node].get(pattern_val)
+            if node is None:
+                return None
+        return self.__guesses[node]
+
+    def dump(self, filepath: str, words_all: tuple[str, ...], words_accepted: tuple[str, ...]):
+        data = {
+            "version": DECISION_TREE_VERSION,
+            "words_all_hash": hash_words(words_all).hex(),
+            "words_accepted_hash": hash_words(words_accepted).hex(),
+            "guesses": self.__guesses,
+            "children": [[[pattern_val, child] for pattern_val, child in children.items()]
+                         for children in self.__children],
+        }
+        # write to a temporary file first, so concurrent readers never see a half written tree
+        filepath_tmp = f"{filepath}.{os.getpid()}.tmp"
+        with open(filepath_tmp, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(filepath_tmp, filepath)
+
+    @staticmethod
+    def load(filepath: str, words_all: tuple[str, ...], words_accepted: tuple[str, ...]) -> "DecisionTree | None":
+        """Returns None if file is missing, can't be parsed (e.g. truncated) or was built for other word lists"""
+        if not os.path.exists(filepath):
+            return None
+        try:
+            with open(filepath, 'r') as f:
+                data = json.load(f)
+            if (data.get("version") != DECISION_TREE_VERSION or
+                    data.get("words_all_hash") != hash_words(words_all).hex() or
+                    data.get("words_accepted_hash") != hash_words(words_accepted).hex()):
+                return None
+            return DecisionTree(data["guesses"], [dict((p, c) for p, c in children) for children in data["children"]])
+        except (ValueError, KeyError, TypeError, AttributeError):
+            # JSONDecodeError and UnicodeDecodeError are ValueErrors, the others are JSON of an unexpected shape
+            return None
+
+
+def build_decision_tree(pattern_matrix: PatternMatrix, objective: Objective = calculate_entropies,
+                        first_guess: str = None) -> DecisionTree:
+    """
+    Recursively partition accepted words by the pattern of the best guess (hard mode, so guesses are chosen
+    among remaining secrets, first one on ties). With entropy objective and "slate" as first guess the tree makes
+    the same guesses as `EntropySolver` playing with `StateMode.PATTERNS`.
+    """
+    matrix = pattern_matrix.matrix
+    all_ids = pattern_matrix.all_ids(pattern_matrix.words_accepted)
+    guesses = []
+    children = []
+
+    def build_node(secret_ids: np.ndarray, turn: int, guess_id: int = None) -> int:
+        node = len(guesses)
+        if guess_id is None:
+            histograms = get_pattern_histograms(matrix, all_ids[secret_ids], secret_ids)
+            guess_id = int(all_ids[secret_ids[int(np.argmax(objective(histograms)))]])
+        guesses.append(pattern_matrix.words_all[guess_id])
+        children.append(dict())
+
+        if turn < NUMBER_OF_TURNS:
+            patterns = matrix[guess_id, secret_ids]
+            for pattern_val in np.unique(patterns).tolist():
+                if pattern_val != NUMBER_OF_PATTERNS - 1:
+                    children[node][pattern_val] = build_node(secret_ids[patterns == pattern_val], turn + 1)
+        return node
+
+    first_guess_id = None if first_guess is None else pattern_matrix.all_id(first_guess)
+    build_node(np.arange(len(pattern_matrix.words_accepted)), 1, first_guess_id)
+    return DecisionTree(guesses, children)
+
+
+def get_decision_tree_filepath() -> str:
+    return get_data_filepath("decision_tree.json")
+
+
+def load_or_build_decision_tree(pattern_matrix: PatternMatrix = None) -> DecisionTree:
+    """Load decision tree from disk, (re)building it if word lists have changed since it was dumped"""
+    pattern_matrix = get_pattern_matrix() if pattern_matrix is None else pattern_matrix
+    filepath = get_decision_tree_filepath()
+    tree = DecisionTree.load(filepath, pattern_matrix.words_all, pattern_matrix.words_accepted)
+    if tree is None:
+        print("Building decision tree, this may take a few seconds...")
+        tree = build_decision_tree(pattern_matrix, first_guess="slate")
+        tree.dump(filepath, pattern_matrix.words_all, pattern_matrix.words_accepted)
+    return tree
+
+
+DECISION_TREE: LazyResource[DecisionTree] = LazyResource(load_or_build_decision_tree)
+
+
+def get_decision_tree() -> DecisionTree:
+    return DECISION_TREE.get()
+
+
+class DecisionTreeSolver(Solver):
+    """Walks precomputed `DecisionTree` with the state history, falls back to `fallback` for unknown states"""
+    __SOLVER_NAME = "DecisionTreeSolver"
+
+    def __init__(self, tree: DecisionTree = None, fallback: Solver = None):
+        super().__init__(self.__SOLVER_NAME)
+        self.__tree = get_decision_tree() if tree is None else tree
+        self.__fallback = EntropySolver() if fallback is None else fallback
+
+    @property
+    def inner_solvers(self) -> tuple[Solver, ...]:
+        return self.__fallback,
+
+    @property
+    def config(self) -> str:
+        return f"{self.name}(nodes={len(self.__tree)}, fallback={self.__fallback.config})"
+
+    def _make_guess(self, state: State) -> str:
+        guess = self.__tree.get_guess(state.history)
+        if guess is None:
+            guess = self.__fallback.make_guess(state)
+        return guess
+
+
+if __name__ == "__main__":
+    pattern_matrix = get_pattern_matrix()
+    tree = build_decision_tree(pattern_matrix, first_guess="slate")
+    tree.dump(get_decision_tree_filepath(), pattern_matrix.words_all, pattern_matrix.words_accepted)
+    print(f"Decision tree with {len(tree)} nodes saved to {get_decision_tree_filepath()}")
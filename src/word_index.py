@@ -0,0 +1,73 @@
+import threading
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+from constants import WORD_LENGTH, CHARS
+from pattern_kernel import encode_words
+from resources import LazyResource
+
+
+class WordIndex:
+    """
+    Bitsets (numpy bool arrays over word ids) of words having given letter at given position and
+    of words having at least given number of copies of a letter, so that letter constraints of the `State`
+    are applied with a few AND operations instead of checking every word.
+    """
+    # indexes of the most recently used word tuples, dropped with other resources when the data directory changes
+    __CACHE: LazyResource[OrderedDict[tuple[str, ...], "WordIndex"]] = LazyResource(OrderedDict)
+    __CACHE_SIZE = 8
+    # lookups reorder the cache, so that states of different threads (e.g. of the hint server) can share it
+    __LOCK = threading.Lock()
+
+    def __init__(self, words: tuple[str, ...]):
+        self.__words = words
+        codes = encode_words(words) if words else np.empty((0, WORD_LENGTH), dtype=np.uint8)
+        letters = np.arange(len(CHARS), dtype=np.uint8)[:, np.newaxis]
+
+        # [position, letter, word_id]
+        self.__position_letter = np.stack([codes[:, i] == letters for i in range(WORD_LENGTH)])
+        # [letter, min_count, word_id]
+        letter_count = self.__position_letter.sum(axis=0)
+        self.__letter_min_count = np.stack([letter_count >= cnt for cnt in range(WORD_LENGTH + 1)], axis=1)
+
+    @staticmethod
+    def get(words: tuple[str, ...]) -> "WordIndex":
+        """Index is shared between all states created from the same word tuple"""
+        cache = WordIndex.__CACHE.get()
+        with WordIndex.__LOCK:
+            index = cache.get(words)
+            if index is None:
+                index = cache[words] = WordIndex(words)
+                if len(cache) > WordIndex.__CACHE_SIZE:
+                    cache.popitem(last=False)
+            else:
+                cache.move_to_end(words)
+            return index
+
+    @property
+    def words(self) -> tuple[str, ...]:
+        return self.__words
+
+    def full_mask(self) -> np.ndarray:
+        return np.ones(len(self.__words), dtype=bool)
+
+    def get_mask(self, letter_constraints: tuple[set[str], ...], present_letters_counter: Counter) -> np.ndarray:
+        """Same as `State.check_word` for every word in the index"""
+        mask = self.full_mask()
+        for i, constraints_set in enumerate(letter_constraints):
+            if len(constraints_set) == len(CHARS):
+                continue
+            if len(constraints_set) <= len(CHARS) // 2:
+                allowed = [ord(char) - ord('a') for char in constraints_set]
+                mask &= self.__position_letter[i, allowed].any(axis=0)
+            else:
+                forbidden = [ord(char) - ord('a') for char in CHARS if char not in constraints_set]
+                mask &= ~self.__position_letter[i, forbidden].any(axis=0)
+        for char, cnt in present_letters_counter.items():
+            mask &= self.__letter_min_count[ord(char) - ord('a'), min(cnt, WORD_LENGTH)]
+        return mask
+
+    def get_words(self, mask: np.ndarray) -> tuple[str, ...]:
+        words = self.__words
+        return tuple(words[i] for i in np.flatnonzero(mask).tolist())
@@ -1,23 +1,30 @@
 import random
-from collections import Counter
 import logging
 
-from constants import NUMBER_OF_TURNS, WORD_LENGTH
-from state import GameStatus, State, StateRow
-from utils import load_all_words, load_accepted_words
+from constants import NUMBER_OF_TURNS
+from state import GameStatus, State, StateRow, StateMode, PatternState
+from utils import CharState, load_all_words, load_accepted_words, pattern_value_to_pattern_arr
+from pattern_matrix import PatternMatrix, get_pattern_matrix
+from pattern_kernel import get_pattern_value
 
 
 class Wordle:
-    # Load data
-    __WORDS_ALL: tuple[str, ...] = load_all_words()
-    __WORDS_ACCEPTED: tuple[str, ...] = load_accepted_words()
-    __WORDS_ALL_SET: set[str] = set(__WORDS_ALL)
 
-    def __init__(self, word_repeat: bool = True, logger_level: int = logging.DEBUG):
+    def __init__(self, word_repeat: bool = True, logger_level: int = logging.DEBUG,
+                 pattern_matrix: PatternMatrix = None, state_mode: StateMode = StateMode.CONSTRAINTS):
+        # Load data (word lists are loaded once and shared by all games)
+        self.__words_all = load_all_words()
+        self.__words_accepted = load_accepted_words()
+        self.__words_all_set = set(self.__words_all)
         self.__word_generator = self.__get_word_generator() if word_repeat else None
+        # if provided, guess patterns are looked up instead of being computed letter by letter
+        if pattern_matrix is None and state_mode == StateMode.PATTERNS:
+            pattern_matrix = get_pattern_matrix()
+        self.__pattern_matrix = pattern_matrix
+        self.__state_mode = state_mode
         # Game state
         self.__status: GameStatus = GameStatus.NOT_STARTED
-        self.__state: State = None
+        self.__state: State | PatternState = None
         self.__word_secret: str = None
         self.__turns_left: int = None
         self.__is_hard_mode: bool = None
@@ -35,33 +42,40 @@ class Wordle:
         self.__logger.debug("Wordle initialized")
 
     @property
-    def state(self) -> State:
+    def state(self) -> State | PatternState:
         return self.__state
 
-    def start_game(self, hard_mode: bool, seed: int = None):
+    @property
+    def words_accepted(self) -> tuple[str, ...]:
+        return self.__words_accepted
+
+    def start_game(self, hard_mode: bool, seed: int | str = None, word_secret: str = None):
         if seed is not None:
             random.seed(seed)
 
         self.__status = GameStatus.IN_PROGRESS
-        self.__state = State((), self.__WORDS_ALL, self.__WORDS_ACCEPTED)
-        self.__word_secret = self.__get_word()
+        if self.__state_mode == StateMode.PATTERNS:
+            self.__state = PatternState(self.__pattern_matrix)
+        else:
+            self.__state = State((), self.__words_all, self.__words_accepted)
+        self.__word_secret = self.__get_word() if word_secret is None else word_secret
         self.__turns_left = NUMBER_OF_TURNS
         self.__is_hard_mode = hard_mode
 
     def __get_word_generator(self):
         while True:
-            copy_word_arr = list(self.__WORDS_ACCEPTED)
+            copy_word_arr = list(self.__words_accepted)
             random.shuffle(copy_word_arr)
             for word in copy_word_arr:
                 yield word
 
     def __get_word(self) -> str:
         if self.__word_generator is None:
-            return random.choice(self.__WORDS_ACCEPTED)
+            return random.choice(self.__words_accepted)
         else:
             return self.__word_generator.__next__()
 
-    def guess(self, word: str) -> State | None:
+    def guess(self, word: str) -> State | PatternState | None:
         if self.__status != GameStatus.IN_PROGRESS:
             self.__logger.debug("Can't guess if game is not in progress")
             return None
@@ -91,7 +105,7 @@ class Wordle:
         return self.__state
 
     def __word_is_valid(self, word: str) -> bool:
-        if not (word in self.__WORDS_ALL_SET):
+        if not (word in self.__words_all_set):
             self.__logger.debug(f"Word {word} is not in the word list")
             return False
 
@@ -109,21 +123,9 @@ class Wordle:
         return self.__turns_left
 
     def __guess_mask(self, word: str):
-        correct_letters = [False for _ in range(WORD_LENGTH)]
-        wrong_position_letters = [False for _ in range(WORD_LENGTH)]
-
-        word_counter = Counter(self.__word_secret)
-        potential_wrong_positions = []
-        for i in range(WORD_LENGTH):
-            if self.__word_secret[i] == word[i]:
-                correct_letters[i] = True
-                word_counter[word[i]] -= 1
-            elif word[i] in self.__word_secret:
-                potential_wrong_positions.append((word[i], i))
-
-        for char, idx in potential_wrong_positions:
-            if (word_counter[char] > 0):
-                word_counter[char] -= 1
-                wrong_position_letters[idx] = True
-
-        return correct_letters, wrong_position_letters
+        if self.__pattern_matrix is not None:
+            pattern_val = self.__pattern_matrix.pattern(word, self.__word_secret)
+        else:
+            pattern_val = get_pattern_value(word, self.__word_secret)
+        pattern = pattern_value_to_pattern_arr(pattern_val)
+        return [c == CharState.GREEN for c in pattern], [c == CharState.YELLOW for c in pattern]
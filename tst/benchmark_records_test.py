@@ -0,0 +1,89 @@
+import unittest
+import os
+import sys
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from src.benchmark_records import GameRecord, GameRecordWriter, read_game_records
+from src.benchmark_diff import diff_records, load_records
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+RECORDS = [
+    GameRecord("EntropySolver", "cigar", "0-0", 3, ["slate", "crony", "cigar"], [0.001, 0.0125, 0.000125]),
+    GameRecord("EntropySolver", "rebut", "0-1", -1, ["slate"] * 6, [0.5] * 6),
+    GameRecord("RandomSolver", "cigar", "0-0", 1, ["cigar"], [0.25]),
+]
+
+
+def get_records(records: list[GameRecord]) -> dict[str, dict[str, GameRecord]]:
+    by_solver = dict()
+    for record in records:
+        by_solver.setdefault(record.solver, dict())[record.secret] = record
+    return by_solver
+
+
+class BenchmarkRecordsTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for filename in ("records.jsonl", "records.csv"):
+                filepath = os.path.join(tmp_dir, filename)
+                with GameRecordWriter(filepath) as writer:
+                    for record in RECORDS:
+                        writer.write(record)
+                loaded = list(read_game_records(filepath))
+                self.assertEqual([record.to_dict() for record in loaded], [record.to_dict() for record in RECORDS])
+
+
+class BenchmarkDiffTest(unittest.TestCase):
+
+    def test_diff_records(self):
+        base = get_records(RECORDS)
+        report, regressions = diff_records(base, base, 0.1)
+        self.assertEqual(regressions, [])
+        self.assertEqual(len(report), 2)
+
+        # worse score on one word, faster guesses: only the score is a regression
+        worse = GameRecord("EntropySolver", "cigar", "0-0", 4, ["slate", "crony", "rebut", "cigar"], [0.001] * 4)
+        _, regressions = diff_records(base, get_records([worse] + RECORDS[1:]), 0.1)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("score regression on 'cigar'", regressions[0])
+
+        # same scores, 2x slower guesses
+        slower = GameRecord("RandomSolver", "cigar", "0-0", 1, ["cigar"], [0.5])
+        _, regressions = diff_records(base, get_records(RECORDS[:2] + [slower]), 0.1)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("RandomSolver: latency regression", regressions[0])
+        _, regressions = diff_records(base, get_records(RECORDS[:2] + [slower]), 1.5)
+        self.assertEqual(regressions, [])
+
+        # a won game is better than a lost one, games only in one run are reported but not compared
+        won = GameRecord("EntropySolver", "rebut", "0-1", 6, ["slate"] * 5 + ["rebut"], [0.5] * 6)
+        report, regressions = diff_records(get_records([won]), base, 0.1)
+        self.assertIn("score regression on 'rebut'", regressions[0])
+        self.assertTrue(any("1 games only in new" in line for line in report))
+
+    def test_exit_code(self):
+        worse = GameRecord("RandomSolver", "cigar", "0-0", 2, ["rebut", "cigar"], [0.25, 0.25])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepaths = dict()
+            for name, records in (("base", RECORDS), ("new", RECORDS[:2] + [worse])):
+                filepaths[name] = os.path.join(tmp_dir, f"{name}.jsonl")
+                with GameRecordWriter(filepaths[name]) as writer:
+                    for record in records:
+                        writer.write(record)
+            self.assertEqual(load_records(filepaths["base"])["RandomSolver"]["cigar"].score, 1)
+
+            def run_diff(base: str, new: str) -> int:
+                return subprocess.run([sys.executable, "benchmark_diff.py", filepaths[base], filepaths[new]],
+                                      cwd=SRC_DIR, capture_output=True).returncode
+
+            self.assertEqual(run_diff("base", "base"), 0)
+            self.assertEqual(run_diff("base", "new"), 1)
+            self.assertEqual(run_diff("new", "base"), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
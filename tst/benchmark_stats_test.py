@@ -0,0 +1,58 @@
+import unittest
+import os
+import sys
+import random
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from src.benchmark_stats import RunningStats, ScoreStats, IntervalMethod, get_wilson_interval
+
+
+class BenchmarkStatsTest(unittest.TestCase):
+
+    def test_running_stats(self):
+        rng = random.Random(0)
+        values = [rng.gauss(3.5, 0.8) for _ in range(1000)]
+        running_stats = RunningStats()
+        for value in values:
+            running_stats.add(value)
+        self.assertEqual(running_stats.n, len(values))
+        self.assertAlmostEqual(running_stats.mean, statistics.mean(values))
+        self.assertAlmostEqual(running_stats.variance, statistics.variance(values))
+        low, high = running_stats.get_interval(0.95)
+        self.assertAlmostEqual(high - low, 2 * 1.959964 * statistics.stdev(values) / len(values) ** 0.5, places=5)
+
+    def test_wilson_interval(self):
+        low, high = get_wilson_interval(0, 10, 0.95)
+        self.assertAlmostEqual(low, 0.)
+        self.assertAlmostEqual(high, 0.2775, places=4)
+        low, high = get_wilson_interval(95, 100, 0.95)
+        self.assertAlmostEqual(low, 0.8882, places=4)
+        self.assertAlmostEqual(high, 0.9785, places=4)
+
+    def test_score_stats(self):
+        score_stats = ScoreStats()
+        scores = [3] * 50 + [4] * 40 + [2] * 8 + [-1] * 2
+        for score in scores:
+            score_stats.add(score)
+        self.assertEqual(score_stats.n_games, 100)
+        self.assertEqual(score_stats.score_counter[-1], 2)
+        self.assertAlmostEqual(score_stats.success_rate, 0.98)
+        self.assertAlmostEqual(score_stats.average_score, (150 + 160 + 16) / 98)
+        self.assertAlmostEqual(score_stats.average_turns, (150 + 160 + 16 + 14) / 100)
+
+        normal = score_stats.get_average_turns_interval(0.95)
+        bootstrap = score_stats.get_average_turns_interval(0.95, IntervalMethod.BOOTSTRAP)
+        for low, high in (normal, bootstrap):
+            self.assertLess(low, score_stats.average_turns)
+            self.assertGreater(high, score_stats.average_turns)
+        self.assertAlmostEqual(bootstrap[1] - bootstrap[0], normal[1] - normal[0], delta=0.05)
+        self.assertEqual(score_stats.to_dict()["score_counts"], {"-1": 2, "2": 8, "3": 50, "4": 40})
+
+    def test_empty(self):
+        self.assertEqual(ScoreStats().to_dict()["average_turns_interval"], [None, None])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import os
+import sys
+import io
+import tempfile
+import contextlib
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from src.benchmark import Benchmark, BenchmarkBackend, get_pattern_matrix
+from src.benchmark_records import read_game_records
+from src.random_solver import RandomSolver
+from src.entropy_solver import EntropySolver
+
+
+class BenchmarkTest(unittest.TestCase):
+
+    def test_workers(self):
+        """Scores and records (apart from timings) don't depend on the number of workers"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for backend in BenchmarkBackend:
+                results = []
+                records = []
+                for n_workers in (1, 3):
+                    filepath = os.path.join(tmp_dir, f"{backend.value}-{n_workers}.jsonl")
+                    benchmark = Benchmark((RandomSolver(), EntropySolver()), n_tries=300, seed=3, n_workers=n_workers,
+                                          records_filepath=filepath, backend=backend)
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        results.append(benchmark.analyze_solver())
+                    records.append([(record.solver, record.secret, record.seed, record.score, record.guesses)
+                                    for record in read_game_records(filepath)])
+                self.assertEqual(results[0], results[1])
+                self.assertEqual(records[0], records[1])
+                self.assertEqual(len(records[0]), 2 * 300)
+
+    def test_pattern_table_loaded_before_workers(self):
+        """Workers don't build a missing pattern table each, it's built (or loaded) once before they start"""
+        for backend, expected_calls in ((BenchmarkBackend.SIMULATION, 1), (BenchmarkBackend.WORDLE, 0)):
+            with mock.patch("src.benchmark.get_pattern_matrix", wraps=get_pattern_matrix) as get_matrix:
+                benchmark = Benchmark((RandomSolver(),), n_tries=20, n_workers=2, backend=backend)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    benchmark.analyze_solver()
+            self.assertEqual(get_matrix.call_count, expected_calls, backend)
+
+
+if __name__ == '__main__':
+    unittest.main()
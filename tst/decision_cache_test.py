@@ -0,0 +1,78 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from src.decision_cache import DecisionCache, EvictionPolicy
+from src.solver import Solver
+from src.state import State
+
+
+class IndexSolver(Solver):
+
+    def __init__(self, index: int, cache: DecisionCache):
+        super().__init__(f"IndexSolver{index}", cache=cache)
+        self.__index = index
+
+    def _make_guess(self, state) -> str:
+        return state.words_accepted[self.__index]
+
+
+class DecisionCacheTest(unittest.TestCase):
+
+    def test_lru(self):
+        cache = DecisionCache(capacity=2, policy=EvictionPolicy.LRU)
+        cache.put("a", "slate")
+        cache.put("b", "crane")
+        self.assertEqual(cache.get("a"), "slate")
+        cache.put("c", "raise")  # "b" is the least recently used
+        self.assertNotIn("b", cache)
+        self.assertIn("a", cache)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats(), {"size": 2, "capacity": 2, "hits": 1, "misses": 1, "evictions": 1})
+
+    def test_fifo(self):
+        cache = DecisionCache(capacity=2, policy=EvictionPolicy.FIFO)
+        cache.put("a", "slate")
+        cache.put("b", "crane")
+        self.assertEqual(cache.get("a"), "slate")
+        cache.put("c", "raise")  # "a" was added first, lookup doesn't matter
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.get("b"), "crane")
+        self.assertEqual(cache.evictions, 1)
+
+    def test_dump_warm(self):
+        cache = DecisionCache(capacity=3)
+        for key, guess in (("a", "slate"), ("b", "crane"), ("c", "raise")):
+            cache.put(key, guess)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "cache.json")
+            cache.dump(filepath)
+
+            cache_warm = DecisionCache(capacity=2)
+            cache_warm.warm(filepath)
+        self.assertEqual(len(cache_warm), 2)
+        self.assertNotIn("a", cache_warm)
+        self.assertEqual(cache_warm.get("c"), "raise")
+        self.assertEqual(cache_warm.stats(), {"size": 2, "capacity": 2, "hits": 1, "misses": 0, "evictions": 0})
+
+    def test_shared(self):
+        """Solvers sharing a cache get their own guesses"""
+        words = ("slate", "crane", "raise")
+        state = State((), words, words)
+        cache = DecisionCache()
+        solvers = [IndexSolver(index, cache) for index in range(len(words))]
+        expected = list(words)
+        for solver in solvers:
+            solver.set_opening_books(dict())
+        for _ in range(2):
+            self.assertEqual([solver.make_guess(state) for solver in solvers], expected)
+            self.assertEqual([solver.make_guesses([state])[0] for solver in solvers], expected)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.hits, 9)
+
+
+if __name__ == '__main__':
+    unittest.main()
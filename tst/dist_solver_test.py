@@ -0,0 +1,71 @@
+import unittest
+import os
+import sys
+import random
+from collections import Counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from src.dist_solver import DistSolver, DistanceMetric, DistanceMatrix, hamming_distances, freq_distances
+from src.pattern_kernel import encode_words
+from src.state import State
+from src.utils import load_all_words, load_accepted_words, word_to_pattern_value
+
+
+def hamming_distance(word: str, other_word: str) -> int:
+    """Per-word distance the vectorised one replaced"""
+    return sum(word[i] != other_word[i] for i in range(len(word)))
+
+
+def freq_distance(word: str, other_word: str) -> int:
+    word_cnt = Counter(word)
+    return len(word) - sum(min(word_cnt[char], cnt) for char, cnt in Counter(other_word).items())
+
+
+DISTANCES = {DistanceMetric.HAMMING_DISTANCE: hamming_distance, DistanceMetric.FREQ_DISTANCE: freq_distance}
+
+
+def make_guess(distance_f, state: State) -> str:
+    """Guess of the per-word implementation: closest word (sum over remaining secrets), smallest word on ties"""
+    words = state.words_all if len(state.history) < 2 else state.words_accepted
+    return min((sum(distance_f(word, other) for other in state.words_accepted), word) for word in words)[1]
+
+
+class DistSolverTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(0)
+        self.words_accepted = tuple(sorted(rng.sample(load_accepted_words(), 40)))
+        self.words_all = tuple(sorted(set(self.words_accepted) | set(rng.sample(load_all_words(), 80))))
+
+    def test_distances(self):
+        codes = encode_words(self.words_all)
+        other_codes = encode_words(self.words_accepted)
+        for distances_f, distance_f in ((hamming_distances, hamming_distance), (freq_distances, freq_distance)):
+            distances = distances_f(codes, other_codes)
+            expected = [[distance_f(word, other) for other in self.words_accepted] for word in self.words_all]
+            self.assertEqual(distances.tolist(), expected)
+
+        for metric, distance_f in DISTANCES.items():
+            distance_matrix = DistanceMatrix(metric, self.words_all, self.words_accepted, chunk_size=16)
+            # both summing sides: few kept columns, and all columns minus few excluded ones
+            for other_words in (self.words_accepted[:5], self.words_accepted[3:]):
+                totals = distance_matrix.get_total_distances(self.words_all, other_words)
+                self.assertEqual(totals.tolist(), [sum(distance_f(word, other) for other in other_words)
+                                                   for word in self.words_all])
+
+    def test_guesses(self):
+        rng = random.Random(1)
+        for metric, distance_f in DISTANCES.items():
+            solver = DistSolver(metric)
+            solver.set_opening_books(dict())
+            for word_secret in rng.sample(self.words_accepted, 10):
+                state = State((), self.words_all, self.words_accepted)
+                while len(state.history) < 3 and len(state.words_accepted) > 1:
+                    guess = solver.make_guess(state)
+                    self.assertEqual(guess, make_guess(distance_f, state))
+                    state = state.advance(guess, word_to_pattern_value(guess, word_secret))
+
+
+if __name__ == '__main__':
+    unittest.main()
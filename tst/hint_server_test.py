@@ -0,0 +1,136 @@
+import unittest
+import os
+import sys
+import json
+import asyncio
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from src.hint_server import HintServer, parse_pattern, parse_request, DEFAULT_SOLVER
+from src.utils import load_accepted_words, word_to_pattern_value
+
+
+class ParseTest(unittest.TestCase):
+
+    def test_parse_pattern(self):
+        self.assertEqual(parse_pattern("00000"), 0)
+        self.assertEqual(parse_pattern("22222"), 242)
+        # i-th letter is the i-th trit
+        self.assertEqual(parse_pattern("10000"), 1)
+        self.assertEqual(parse_pattern("01020"), 3 + 2 * 27)
+        self.assertEqual(parse_pattern(100), 100)
+        for pattern in ("0120", "012345", "0a000", 243, -1, True, 1.5, None):
+            with self.assertRaises(ValueError):
+                parse_pattern(pattern)
+
+    def test_parse_request(self):
+        self.assertEqual(parse_request(b'{}'), (DEFAULT_SOLVER, ()))
+        self.assertEqual(parse_request(b'{"solver": "tree", "history": [["SLATE", "00120"], ["crane", 12]]}'),
+                         ("tree", (("slate", parse_pattern("00120")), ("crane", 12))))
+        for data in (b'not json', b'\xff', b'[]', b'{"solver": 1}', b'{"history": {}}', b'{"history": [["slate"]]}',
+                     b'{"history": [[1, 0]]}', b'{"history": [["slate", "3"]]}'):
+            with self.assertRaises(ValueError):
+                parse_request(data)
+
+
+class HintServerTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.hint_server = HintServer(n_workers=1)
+        self.server = await asyncio.start_server(self.hint_server.handle_connection, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.hint_server.shutdown()
+
+    async def request_http(self, request: bytes) -> tuple[int, dict]:
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(request)
+        await writer.drain()
+        response = await self.read_http(reader)
+        writer.close()
+        return response
+
+    @staticmethod
+    async def read_http(reader: asyncio.StreamReader) -> tuple[int, dict]:
+        status = int((await reader.readline()).split()[1])
+        headers = dict()
+        while (line := await reader.readline()) != b"\r\n":
+            name, _, value = line.decode().partition(":")
+            headers[name.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers["content-length"]))
+        return status, json.loads(body)
+
+    async def test_http(self):
+        body = b'{"solver": "entropy", "history": [["slate", "00000"]]}'
+        status, response = await self.request_http(b"POST /hint HTTP/1.1\r\nContent-Length: %d\r\n"
+                                                   b"Connection: close\r\n\r\n%s" % (len(body), body))
+        remaining = sum(word_to_pattern_value("slate", word) == 0 for word in load_accepted_words())
+        self.assertEqual(status, 200)
+        self.assertEqual(response["remaining"], remaining)
+        self.assertIn(response["guess"], load_accepted_words())
+
+        self.assertEqual(await self.request_http(b"GET /health HTTP/1.0\r\n\r\n"), (200, {"status": "ok"}))
+        self.assertEqual((await self.request_http(b"GET /nothing HTTP/1.0\r\n\r\n"))[0], 404)
+        self.assertEqual((await self.request_http(b"POST /hint HTTP/1.1\r\nContent-Length: 2\r\n\r\n[]"))[0], 400)
+        self.assertEqual((await self.request_http(b"POST /hint HTTP/1.1\r\nContent-Length: x\r\n\r\n"))[0], 400)
+
+        status, stats = await self.request_http(b"GET /stats HTTP/1.0\r\n\r\n")
+        self.assertEqual(status, 200)
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["errors"], 1)
+
+    async def test_http_keep_alive(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        # empty line between requests is skipped
+        writer.write(b"GET /health HTTP/1.1\r\n\r\n\r\nGET /stats HTTP/1.1\r\n\r\nGET\r\n\r\n")
+        await writer.drain()
+        self.assertEqual(await self.read_http(reader), (200, {"status": "ok"}))
+        self.assertEqual((await self.read_http(reader))[0], 200)
+        self.assertEqual((await self.read_http(reader))[0], 400)
+        self.assertEqual(await reader.read(), b"")
+        writer.close()
+
+    async def test_internal_error(self):
+        with mock.patch.object(self.hint_server, "get_hint", side_effect=RuntimeError("worker died")):
+            status, response = await self.request_http(b"POST /hint HTTP/1.0\r\nContent-Length: 2\r\n\r\n{}")
+            self.assertEqual(status, 500)
+            self.assertIn("worker died", response["error"])
+
+            reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+            writer.write(b'{}\n{}\n')
+            await writer.drain()
+            for _ in range(2):
+                self.assertIn("error", json.loads(await reader.readline()))
+            writer.close()
+        self.assertEqual(self.hint_server.stats()["errors"], 3)
+
+    async def test_line_protocol(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(b'{"solver": "entropy"}\n\n{"solver": "unknown"}\n')
+        await writer.drain()
+        self.assertEqual(json.loads(await reader.readline()),
+                         {"guess": "slate", "remaining": len(load_accepted_words())})
+        self.assertIn("error", json.loads(await reader.readline()))
+        writer.close()
+
+    async def test_coalescing(self):
+        data = b'{"solver": "entropy", "history": [["slate", 0]]}'
+        responses = await asyncio.gather(*(self.hint_server.respond(data) for _ in range(3)))
+        self.assertEqual(responses[0], responses[1])
+        self.assertEqual(responses[0], responses[2])
+        stats = self.hint_server.stats()
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["coalesced"], 2)
+        self.assertEqual(stats["in_flight"], 0)
+
+        # finished requests aren't coalesced
+        await self.hint_server.respond(data)
+        self.assertEqual(self.hint_server.stats()["coalesced"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from src.lookahead_solver import LookaheadSolver, get_pattern_matrix, get_pattern_histograms, calculate_entropies
+from src.state import PatternState
+from src.utils import word_to_pattern_value
+
+SECRETS = ("cigar", "rebut", "sissy", "humph", "awake", "crony", "batch", "shall")
+
+
+def get_states() -> list[PatternState]:
+    initial_state = PatternState(get_pattern_matrix())
+    states = []
+    for secret in SECRETS:
+        state = initial_state.advance("slate", word_to_pattern_value("slate", secret))
+        states.append(state)
+        if len(state.words_accepted) > 2:
+            guess = state.words_accepted[0]
+            states.append(state.advance(guess, word_to_pattern_value(guess, secret)))
+    return states
+
+
+class LookaheadSolverTest(unittest.TestCase):
+
+    def test_pruning(self):
+        """Pruned search finds the same guess as scoring every candidate in full"""
+        solver = LookaheadSolver(top_k=10)
+        get_expected_remaining = solver._LookaheadSolver__get_expected_remaining
+        pattern_matrix = get_pattern_matrix()
+        for state in get_states():
+            words = state.words_accepted
+            if len(words) <= 2:
+                continue
+            guess_ids = pattern_matrix.all_ids(words)
+            secret_ids = pattern_matrix.accepted_ids(words)
+            entropies = calculate_entropies(get_pattern_histograms(pattern_matrix.matrix, guess_ids, secret_ids))
+            candidates = np.argsort(-entropies, kind="stable")[:10].tolist()
+            scores = [get_expected_remaining(int(guess_ids[idx]), guess_ids, secret_ids, float("inf"), None)
+                      for idx in candidates]
+            self.assertEqual(solver.make_guess(state), words[candidates[int(np.argmin(scores))]])
+
+    def test_time_budget(self):
+        """Once the budget runs out, the greedy (max entropy) guess is made"""
+        solver = LookaheadSolver(top_k=10, time_budget=0.)
+        self.assertFalse(solver.is_deterministic)
+        self.assertIsNone(solver.cache)
+        self.assertEqual(solver.opening_books, dict())
+        pattern_matrix = get_pattern_matrix()
+        for state in get_states():
+            words = state.words_accepted
+            if len(words) <= 2:
+                continue
+            guess_ids = pattern_matrix.all_ids(words)
+            secret_ids = pattern_matrix.accepted_ids(words)
+            entropies = calculate_entropies(get_pattern_histograms(pattern_matrix.matrix, guess_ids, secret_ids))
+            self.assertEqual(solver.make_guess(state), words[int(np.argmax(entropies))])
+
+        self.assertTrue(LookaheadSolver().is_deterministic)
+
+
+if __name__ == '__main__':
+    unittest.main()
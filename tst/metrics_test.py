@@ -0,0 +1,87 @@
+import unittest
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+# classes as patched by metrics (src modules import each other without the package prefix)
+from src.metrics import Metrics, enable, disable, Solver, State, PatternState, Wordle, DecisionCache, PatternMatrix, \
+    scoring
+
+WORDS = ("grape", "eagle", "spasm", "stele", "eerie", "abbey", "crane", "steep", "geese", "allee", "sassy")
+
+
+class FirstWordSolver(Solver):
+
+    def __init__(self, fallback: Solver = None):
+        super().__init__("FirstWordSolver")
+        self.__fallback = fallback
+
+    def _make_guess(self, state) -> str:
+        if self.__fallback is not None:
+            return self.__fallback.make_guess(state)
+        return state.words_accepted[0]
+
+
+class MetricsTest(unittest.TestCase):
+
+    def tearDown(self):
+        disable()
+
+    def test_enable_disable(self):
+        owners = (Solver, State, PatternState, Wordle, DecisionCache, PatternMatrix)
+        originals = [dict(vars(owner)) for owner in owners]
+        original_histograms = scoring.get_pattern_histograms
+
+        metrics = enable()
+        self.assertIs(enable(), metrics)
+        self.assertIsNot(Solver.make_guess, originals[0]["make_guess"])
+        self.assertIsNot(scoring.get_pattern_histograms, original_histograms)
+
+        self.assertIs(disable(), metrics)
+        for owner, owner_originals in zip(owners, originals):
+            self.assertEqual(dict(vars(owner)), owner_originals, owner.__name__)
+        self.assertIs(scoring.get_pattern_histograms, original_histograms)
+        self.assertIsNone(disable())
+
+    def test_nested_guesses(self):
+        """Guess of a fallback solver is part of the outer guess, so it's timed once"""
+        pattern_matrix = PatternMatrix(WORDS, WORDS)
+        state = PatternState(pattern_matrix)
+        next_state = state.advance("grape", pattern_matrix.pattern("grape", "sassy"))
+        solver = FirstWordSolver(fallback=FirstWordSolver())
+        metrics = enable()
+        self.assertEqual(solver.make_guess(state), "grape")
+        self.assertEqual(solver.make_guesses([state, next_state]), ["grape", next_state.words_accepted[0]])
+        disable()
+        self.assertEqual(len(metrics.get_timings("make_guess", 1)), 1)
+        self.assertEqual(len(metrics.get_timings("make_guesses")), 1)
+
+    def test_formats(self):
+        metrics = Metrics()
+        for seconds in (0.1, 0.2, 0.3):
+            metrics.add_timing("make_guess", 1, seconds)
+        metrics.add_timing("make_guess", 2, 0.5)
+        metrics.increment("cache_hits", 3)
+
+        summary = json.loads(metrics.to_json())
+        self.assertEqual(summary["counters"], {"cache_hits": 3})
+        self.assertEqual(summary["timers"]["make_guess"]["1"]["count"], 3)
+        self.assertAlmostEqual(summary["timers"]["make_guess"]["1"]["sum"], 0.6)
+        self.assertAlmostEqual(summary["timers"]["make_guess"]["1"]["p50"], 0.2)
+        self.assertEqual(summary["timers"]["make_guess"]["2"]["p99"], 0.5)
+
+        lines = metrics.to_prometheus().splitlines()
+        self.assertEqual(lines[0], "# TYPE wordle_make_guess_seconds summary")
+        self.assertIn('wordle_make_guess_seconds{turn="1",quantile="0.5"} 0.2', lines)
+        self.assertIn('wordle_make_guess_seconds_count{turn="2"} 1', lines)
+        self.assertEqual(lines[-2:], ["# TYPE wordle_cache_hits_total counter", "wordle_cache_hits_total 3"])
+        for line in lines:
+            # every sample is "name{labels} value"
+            if not line.startswith("#"):
+                float(line.rsplit(" ", 1)[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from src.microbenchmark import compare_results, time_case, get_all_solvers
+from src.tree_solver import DecisionTree, DecisionTreeSolver
+from src.entropy_solver import EntropySolver
+
+
+class MicrobenchmarkTest(unittest.TestCase):
+
+    def test_compare_results(self):
+        def results(**medians):
+            return {"cases": {name: {"median": median} for name, median in medians.items()}}
+
+        report, regressions = compare_results(results(a=1.0, b=1.0, c=1.0), results(a=1.1, b=1.5, d=1.0), 0.2)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("b:"))
+        # header, separator and a row per case of either run
+        self.assertEqual(len(report), 6)
+
+        _, regressions = compare_results(results(a=1.0), results(a=0.5), 0.)
+        self.assertEqual(regressions, [])
+
+    def test_time_case(self):
+        calls = []
+        result = time_case(lambda: calls.append(1), repeat=3, min_time=0.001)
+        self.assertEqual(result["repeat"], 3)
+        self.assertLessEqual(result["min"], result["median"])
+        # warm up call, doubling loops until `min_time`, and the repeated loops
+        self.assertGreaterEqual(len(calls), 1 + 3 * result["loops"])
+
+    def test_get_all_solvers(self):
+        fallback = EntropySolver()
+        solver = DecisionTreeSolver(DecisionTree(["slate"], [dict()]), fallback)
+        self.assertEqual(get_all_solvers(solver), [solver, fallback])
+        self.assertEqual(get_all_solvers(fallback), [fallback])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import unittest
+import os
+import sys
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+# scoring functions and state as seen by the solver (src modules import each other without the package prefix)
+from src.objective_solver import ObjectiveSolver, TieBreak, HistogramCache, PartitionHistograms, OBJECTIVES, \
+    calculate_scores_chunked, get_pattern_matrix
+from src.simulation import SimulationEngine, PatternState, StateMode
+from src.entropy_solver import EntropySolver
+from src.pattern_matrix import PatternMatrix
+from src.utils import load_accepted_words, word_to_pattern_value
+
+WORDS = ("grape", "eagle", "spasm", "stele", "eerie", "abbey", "crane", "steep", "geese", "allee", "sassy")
+SECRETS = ("adobe", "askew", "croak", "fuzzy", "heath", "onion", "sight", "token")
+
+
+def get_states() -> list[PatternState]:
+    """States after "slate" and after the next remaining secret"""
+    initial_state = PatternState(get_pattern_matrix())
+    states = []
+    for secret in SECRETS:
+        state = initial_state.advance("slate", word_to_pattern_value("slate", secret))
+        guess = state.words_accepted[0]
+        states.extend((state, state.advance(guess, word_to_pattern_value(guess, secret))))
+    return [state for state in states if len(state.words_accepted) > 1]
+
+
+def get_games() -> list[tuple[str, str]]:
+    words = load_accepted_words()
+    return [(words[i * 37 % len(words)], "0") for i in range(60)]
+
+
+class HistogramCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pattern_matrix = PatternMatrix(WORDS, WORDS)
+        self.n_computed = 0
+
+    def get_histograms(self, words: tuple[str, ...]) -> PartitionHistograms:
+        self.n_computed += 1
+        ids = self.pattern_matrix.all_ids(words)
+        return PartitionHistograms(self.pattern_matrix.matrix, ids, ids)
+
+    def get_scores(self, cache: HistogramCache, words: tuple[str, ...], objective: str = "entropy") -> np.ndarray:
+        return cache.get_scores((True, ",".join(words)), OBJECTIVES[objective], lambda: self.get_histograms(words))
+
+    def test_capacity(self):
+        cache = HistogramCache(capacity=2)
+        words_arr = (WORDS[:4], WORDS[4:], WORDS[2:8])
+        for words in words_arr:
+            self.get_scores(cache, words)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+
+        # most recently used states are kept
+        self.get_scores(cache, words_arr[2])
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+        self.get_scores(cache, words_arr[0])
+        self.assertEqual((cache.hits, cache.misses), (1, 4))
+        self.assertEqual(self.n_computed, 4)
+        with self.assertRaises(ValueError):
+            HistogramCache(capacity=0)
+
+    def test_scores(self):
+        cache = HistogramCache()
+        for objective_name, objective in OBJECTIVES.items():
+            scores = self.get_scores(cache, WORDS, objective_name)
+            self.assertEqual(scores.tolist(), self.get_histograms(WORDS).calculate_scores((objective,))[0].tolist())
+        # histograms are computed once for all objectives
+        self.assertEqual((cache.hits, cache.misses), (len(OBJECTIVES) - 1, 1))
+        self.get_scores(cache, WORDS)
+        self.assertEqual((cache.hits, cache.misses), (len(OBJECTIVES), 1))
+
+    def test_max_histogram_bytes(self):
+        histogram_bytes = self.get_histograms(WORDS[:6]).histograms.nbytes
+        cache = HistogramCache(max_histogram_bytes=histogram_bytes)
+        self.get_scores(cache, WORDS[:6])
+        self.get_scores(cache, WORDS[5:])
+        # histograms of the least recently used state are dropped, its scores are kept
+        self.assertEqual(cache.histogram_bytes, histogram_bytes)
+        self.assertEqual(len(cache), 2)
+        self.n_computed = 0
+        self.get_scores(cache, WORDS[:6])
+        self.assertEqual(self.n_computed, 0)
+        self.get_scores(cache, WORDS[:6], "minimax")
+        self.assertEqual(self.n_computed, 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+
+class ObjectiveSolverTest(unittest.TestCase):
+
+    def test_shared_histogram_cache(self):
+        """Histograms of a state are computed once for all the solvers sharing a cache"""
+        states = get_states()
+        histogram_cache = HistogramCache()
+        objectives = ("entropy", "minimax", "expected_size")
+        solvers = [ObjectiveSolver(objective, histogram_cache=histogram_cache) for objective in objectives]
+        solvers_alone = [ObjectiveSolver(objective) for objective in objectives]
+        for solver in solvers + solvers_alone:
+            solver.set_opening_books(dict())
+        for state in states:
+            self.assertEqual([solver.make_guess(state) for solver in solvers],
+                             [solver.make_guess(state) for solver in solvers_alone])
+        # states of different secrets can be the same, those are served by the decision cache
+        n_states = len({state.key for state in states})
+        self.assertEqual(histogram_cache.misses, n_states)
+        self.assertEqual(histogram_cache.hits, (len(objectives) - 1) * n_states)
+
+    def test_tie_break(self):
+        """In easy mode `CANDIDATES` picks a remaining secret among the best words, `WORD_ORDER` the first one"""
+        pattern_matrix = get_pattern_matrix()
+        all_ids = np.arange(len(pattern_matrix.words_all))
+        n_different = 0
+        for state in get_states():
+            guesses = dict()
+            for tie_break in TieBreak:
+                solver = ObjectiveSolver("entropy", tie_break, hard_mode=False)
+                solver.set_opening_books(dict())
+                guesses[tie_break] = solver.make_guess(state)
+            secret_ids = pattern_matrix.accepted_ids(state.words_accepted)
+            scores = calculate_scores_chunked(pattern_matrix.matrix, all_ids, secret_ids, (OBJECTIVES["entropy"],))[0]
+            best_words = [pattern_matrix.words_all[i] for i in np.flatnonzero(scores == scores.max())]
+
+            self.assertEqual(guesses[TieBreak.WORD_ORDER], best_words[0])
+            best_secrets = [word for word in state.words_accepted if word in best_words]
+            self.assertEqual(guesses[TieBreak.CANDIDATES], best_secrets[0] if best_secrets else best_words[0])
+            n_different += guesses[TieBreak.WORD_ORDER] != guesses[TieBreak.CANDIDATES]
+        self.assertGreater(n_different, 0)
+
+    def test_same_as_entropy_solver(self):
+        engine = SimulationEngine()
+        games = get_games()
+        solvers = (EntropySolver(), ObjectiveSolver("entropy", first_guess="slate"))
+        for solver in solvers:
+            solver.set_opening_books(dict())
+        records = [engine.play_many(solver, games) for solver in solvers]
+        for record_entropy, record_objective in zip(*records):
+            self.assertEqual(record_objective.guesses, record_entropy.guesses, record_entropy.secret)
+
+    def test_incremental(self):
+        """
+        Incremental histograms give the same guesses, both when games are played one by one (states narrow
+        the histograms of the previous one) and in lockstep (states of other games come in between, so histograms
+        of the previous state don't match and are built again)
+        """
+        games = get_games()
+        for state_mode in StateMode:
+            engine = SimulationEngine(state_mode=state_mode)
+            solver_full = EntropySolver()
+            solver_full.set_opening_books(dict())
+            expected = [record.guesses for record in engine.play_many(solver_full, games)]
+            for play_many in (False, True):
+                solver = EntropySolver(incremental=True)
+                solver.set_opening_books(dict())
+                with mock.patch.object(PartitionHistograms, "narrow", autospec=True,
+                                       side_effect=PartitionHistograms.narrow) as narrow:
+                    if play_many:
+                        records = engine.play_many(solver, games)
+                    else:
+                        records = [engine.play(solver, word_secret, seed) for word_secret, seed in games]
+                self.assertEqual([record.guesses for record in records], expected, (state_mode, play_many))
+                if not play_many:
+                    self.assertGreater(narrow.call_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from src.solver import Solver
+from src.pattern_matrix import PatternMatrix
+from src.lookahead_solver import LookaheadSolver
+# states and modes as seen by the book (src modules import each other without the package prefix)
+from src.opening_book import State, StateMode, PatternState
+from src.opening_book import OpeningBook, build_opening_book, dump_opening_books, load_opening_books, get_solver_key, \
+    get_opening_book_filepath, load_data_dir_opening_books
+from src.resources import DATA_DIR_ENV
+
+WORDS = ("grape", "eagle", "spasm", "stele", "eerie", "abbey", "crane", "steep", "geese", "allee", "sassy")
+
+
+class FirstWordSolver(Solver):
+
+    def __init__(self):
+        super().__init__("FirstWordSolver")
+        self.n_guesses = 0
+
+    def _make_guess(self, state: PatternState) -> str:
+        self.n_guesses += 1
+        return state.words_accepted[-1] if len(state.history) == 0 else state.words_accepted[0]
+
+
+class FirstAllowedWordSolver(Solver):
+    """Guesses depend on the state mode: `State.words_all` only has to match letter constraints"""
+
+    def __init__(self):
+        super().__init__("FirstAllowedWordSolver")
+
+    def _make_guess(self, state: State | PatternState) -> str:
+        return "steep" if len(state.history) == 0 else state.words_all[0]
+
+
+class OpeningBookTest(unittest.TestCase):
+
+    def test_build(self):
+        pattern_matrix = PatternMatrix(WORDS, WORDS)
+        solver = FirstWordSolver()
+        book = build_opening_book(solver, StateMode.PATTERNS, pattern_matrix)
+        self.assertEqual(book.first_guess, "sassy")
+        initial_state = PatternState(pattern_matrix)
+        for word_secret in WORDS[:-1]:
+            pattern_val = pattern_matrix.pattern("sassy", word_secret)
+            state = initial_state.advance("sassy", pattern_val)
+            self.assertEqual(book.get_guess(state.history), state.words_accepted[0])
+            self.assertIsNone(book.get_guess(state.advance(state.words_accepted[0], 0).history))
+        self.assertIsNone(book.get_guess((("grape", 0),)))
+
+        # book guesses are looked up instead of made
+        solver.set_opening_books({StateMode.PATTERNS: book})
+        n_guesses = solver.n_guesses
+        self.assertEqual(solver.make_guess(initial_state), "sassy")
+        self.assertEqual(solver.make_guesses([initial_state.advance("sassy", 0)]), [book.get_guess((("sassy", 0),))])
+        self.assertEqual(solver.n_guesses, n_guesses)
+
+    def test_state_modes(self):
+        pattern_matrix = PatternMatrix(WORDS, WORDS)
+        initial_states = {StateMode.PATTERNS: PatternState(pattern_matrix),
+                          StateMode.CONSTRAINTS: State((), WORDS, WORDS)}
+        solver = FirstAllowedWordSolver()
+        books = {state_mode: build_opening_book(solver, state_mode, pattern_matrix) for state_mode in StateMode}
+        self.assertNotEqual(books[StateMode.PATTERNS].second_guesses, books[StateMode.CONSTRAINTS].second_guesses)
+
+        # every book guess is the guess the solver would make in a state of the same mode
+        solver.set_opening_books(books)
+        for state_mode, book in books.items():
+            initial_state = initial_states[state_mode]
+            self.assertEqual(solver.make_guess(initial_state), solver._make_guess(initial_state))
+            for pattern_val, guess in book.second_guesses.items():
+                state = initial_state.advance(book.first_guess, pattern_val)
+                self.assertEqual(book.get_guess(state.history), guess)
+                self.assertEqual(solver.make_guess(state), solver._make_guess(state))
+
+    def test_solver_key(self):
+        self.assertEqual(get_solver_key(LookaheadSolver()), get_solver_key(LookaheadSolver()))
+        self.assertNotEqual(get_solver_key(LookaheadSolver()), get_solver_key(LookaheadSolver(time_budget=0.05)))
+        self.assertNotEqual(get_solver_key(LookaheadSolver()), get_solver_key(LookaheadSolver(top_k=5)))
+
+    def test_dump_load(self):
+        books = {("A", StateMode.PATTERNS): OpeningBook("crane", {0: "spasm", 5: "eerie"}),
+                 ("A", StateMode.CONSTRAINTS): OpeningBook("crane", {0: "steep"}),
+                 ("B", StateMode.PATTERNS): OpeningBook("steep", {})}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "opening_book.json")
+            self.assertEqual(load_opening_books(filepath, WORDS, WORDS), dict())
+
+            dump_opening_books(books, filepath, WORDS, WORDS)
+            loaded = load_opening_books(filepath, WORDS, WORDS)
+            self.assertEqual(loaded["A", StateMode.PATTERNS].second_guesses, {0: "spasm", 5: "eerie"})
+            self.assertEqual(loaded["A", StateMode.CONSTRAINTS].second_guesses, {0: "steep"})
+            self.assertEqual(loaded["B", StateMode.PATTERNS].first_guess, "steep")
+
+            # any change of the word lists invalidates the books
+            self.assertEqual(load_opening_books(filepath, WORDS, WORDS[1:]), dict())
+
+            # truncated or corrupt file is ignored
+            content = open(filepath).read()
+            for content in (content[:len(content) // 2], "[1, 2]", content.replace('"second_guesses"', '"x"')):
+                with open(filepath, 'w') as f:
+                    f.write(content)
+                self.assertEqual(load_opening_books(filepath, WORDS, WORDS), dict())
+
+    def test_corrupt_data_dir_book(self):
+        with tempfile.TemporaryDirectory() as tmp_dir, mock.patch.dict(os.environ, {DATA_DIR_ENV: tmp_dir}):
+            for filename in ("words_all.txt", "words_accepted.txt"):
+                with open(os.path.join(tmp_dir, filename), 'w') as f:
+                    f.write("\n".join(WORDS))
+            with open(get_opening_book_filepath(), 'w') as f:
+                f.write('{"version": 2, "books": [')
+            self.assertEqual(load_data_dir_opening_books(), dict())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import os
+import sys
+import random
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from src.pattern_kernel import encode_word, encode_words, get_pattern_value, compute_patterns, get_patterns
+from src.utils import pattern_value_to_pattern_arr, pattern_arr_to_pattern_value
+
+WORD_LENGTH = 5
+
+
+def reference_pattern_value(word_guess: str, word_secret: str) -> int:
+    # letter by letter implementation with a Counter, as the game used to compute patterns
+    pattern_val = 0
+    word_secret_cnt = Counter(word_secret)
+    for i in range(WORD_LENGTH):
+        if word_guess[i] == word_secret[i]:
+            pattern_val += 2 * 3 ** i
+            word_secret_cnt[word_guess[i]] -= 1
+    for i in range(WORD_LENGTH):
+        if word_guess[i] != word_secret[i] and word_secret_cnt[word_guess[i]] > 0:
+            pattern_val += 3 ** i
+            word_secret_cnt[word_guess[i]] -= 1
+    return pattern_val
+
+
+def random_words(rng: random.Random, alphabet: str, n: int) -> list[str]:
+    return ["".join(rng.choice(alphabet) for _ in range(WORD_LENGTH)) for _ in range(n)]
+
+
+class PatternKernelTest(unittest.TestCase):
+
+    def test_random_words(self):
+        # small alphabets give lots of repeated letters
+        rng = random.Random(0)
+        for alphabet in ("ab", "abe", "aelst", "abcdefghijklmnopqrstuvwxyz"):
+            guesses = random_words(rng, alphabet, 40)
+            secrets = random_words(rng, alphabet, 50)
+            patterns = compute_patterns(encode_words(guesses), encode_words(secrets))
+            for i, word_guess in enumerate(guesses):
+                self.assertEqual(get_patterns(encode_word(word_guess), encode_words(secrets)).tolist(),
+                                 patterns[i].tolist())
+                for j, word_secret in enumerate(secrets):
+                    expected = reference_pattern_value(word_guess, word_secret)
+                    self.assertEqual(patterns[i, j], expected, (word_guess, word_secret))
+                    self.assertEqual(get_pattern_value(word_guess, word_secret), expected)
+                    self.assertEqual(get_pattern_value(encode_word(word_guess).tolist(),
+                                                       encode_word(word_secret).tolist()), expected)
+
+    def test_pattern_arr(self):
+        for pattern_val in range(3 ** WORD_LENGTH):
+            self.assertEqual(pattern_arr_to_pattern_value(pattern_value_to_pattern_arr(pattern_val)), pattern_val)
+
+    def test_encode(self):
+        codes = encode_words(("abcde", "zzzzz"))
+        self.assertEqual(codes.shape, (2, WORD_LENGTH))
+        self.assertTrue(np.array_equal(codes[0], [0, 1, 2, 3, 4]))
+        self.assertTrue(np.array_equal(encode_word("zzzzz"), [25] * WORD_LENGTH))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from src.pattern_matrix import PatternMatrix, dump_pattern_matrix, load_pattern_matrix, build_pattern_table
+from src.utils import word_to_pattern_value
+from src.pattern_kernel import get_pattern_value, encode_words, PATTERN_DTYPE
+
+WORDS_ALL = ("abcde", "bcdea", "aaaaa", "bbbbb", "crane", "grape", "allee", "eagle", "sassy", "spasm", "steep",
+             "stele", "geese", "eerie", "speed", "abbey")
+WORDS_ACCEPTED = ("grape", "eagle", "spasm", "stele", "eerie", "abbey", "aaaaa")
+
+
+class PatternMatrixTest(unittest.TestCase):
+
+    def test_matrix(self):
+        pattern_matrix = PatternMatrix(WORDS_ALL, WORDS_ACCEPTED)
+        self.assertEqual(pattern_matrix.matrix.shape, (len(WORDS_ALL), len(WORDS_ACCEPTED)))
+        self.assertEqual(pattern_matrix.matrix.dtype, PATTERN_DTYPE)
+        for word_guess in WORDS_ALL:
+            for word_secret in WORDS_ACCEPTED:
+                self.assertEqual(pattern_matrix.pattern(word_guess, word_secret),
+                                 word_to_pattern_value(word_guess, word_secret), (word_guess, word_secret))
+
+    def test_ids(self):
+        pattern_matrix = PatternMatrix(WORDS_ALL, WORDS_ACCEPTED)
+        self.assertEqual(pattern_matrix.all_id("crane"), 4)
+        self.assertEqual(pattern_matrix.accepted_id("stele"), 3)
+        self.assertEqual(pattern_matrix.accepted_ids(("aaaaa", "grape")).tolist(), [6, 0])
+        row = pattern_matrix.matrix[pattern_matrix.all_id("steep"), pattern_matrix.accepted_ids(WORDS_ACCEPTED)]
+        self.assertEqual(row.tolist(), [word_to_pattern_value("steep", word) for word in WORDS_ACCEPTED])
+
+    def test_shape_mismatch(self):
+        pattern_matrix = PatternMatrix(WORDS_ALL, WORDS_ACCEPTED)
+        with self.assertRaises(ValueError):
+            PatternMatrix(WORDS_ALL[1:], WORDS_ACCEPTED, pattern_matrix.matrix)
+
+    def test_dump_load(self):
+        pattern_matrix = PatternMatrix(WORDS_ALL, WORDS_ACCEPTED)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "patterns.bin")
+            self.assertIsNone(load_pattern_matrix(filepath, WORDS_ALL, WORDS_ACCEPTED))
+
+            dump_pattern_matrix(pattern_matrix, filepath)
+            loaded = load_pattern_matrix(filepath, WORDS_ALL, WORDS_ACCEPTED)
+            self.assertEqual(loaded.matrix.tolist(), pattern_matrix.matrix.tolist())
+            self.assertEqual(loaded.pattern("steep", "stele"), pattern_matrix.pattern("steep", "stele"))
+
+            # any change of the word lists invalidates the table
+            words_accepted_changed = WORDS_ACCEPTED[:-1] + ("geese",)
+            self.assertIsNone(load_pattern_matrix(filepath, WORDS_ALL, words_accepted_changed))
+            self.assertIsNone(load_pattern_matrix(filepath, WORDS_ALL[::-1], WORDS_ACCEPTED))
+            del loaded
+
+    def test_build_table(self):
+        pattern_matrix = PatternMatrix(WORDS_ALL, WORDS_ACCEPTED)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "patterns.bin")
+            build_pattern_table(filepath, WORDS_ALL, WORDS_ACCEPTED, chunk_size=3, verbose=False)
+            self.assertFalse(os.path.exists(filepath + ".partial") or os.path.exists(filepath + ".progress"))
+            loaded = load_pattern_matrix(filepath, WORDS_ALL, WORDS_ACCEPTED)
+            self.assertEqual(loaded.matrix.tolist(), pattern_matrix.matrix.tolist())
+            del loaded
+
+    def test_build_table_resume(self):
+        pattern_matrix = PatternMatrix(WORDS_ALL, WORDS_ACCEPTED)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "patterns.bin")
+            # interrupted build: rows 0-8 logged as written, the last log line was cut short
+            dump_pattern_matrix(PatternMatrix(WORDS_ALL, WORDS_ACCEPTED, 0 * pattern_matrix.matrix),
+                                filepath + ".partial")
+            with open(filepath + ".partial", 'r+b') as f:
+                f.seek(128)
+                f.write(pattern_matrix.matrix[:8].tobytes())
+            with open(filepath + ".progress", 'w') as f:
+                f.write("0 4\n4 8\n8 1")
+            build_pattern_table(filepath, WORDS_ALL, WORDS_ACCEPTED, chunk_size=4, verbose=False)
+            loaded = load_pattern_matrix(filepath, WORDS_ALL, WORDS_ACCEPTED)
+            self.assertEqual(loaded.matrix.tolist(), pattern_matrix.matrix.tolist())
+            del loaded
+
+    def test_build_table_failed(self):
+        """File private to a build which isn't resumable is removed when the build fails"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "patterns.bin")
+            with mock.patch("src.pattern_matrix._write_table_rows", side_effect=KeyboardInterrupt):
+                with self.assertRaises(KeyboardInterrupt):
+                    build_pattern_table(filepath, WORDS_ALL, WORDS_ACCEPTED, resume=False, verbose=False)
+            self.assertEqual(os.listdir(tmp_dir), [])
+
+    def test_other_word_length(self):
+        words_all = ("stares", "tassel", "sassed", "seeded")
+        words_accepted = ("tassel", "esters", "needed")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "patterns.bin")
+            build_pattern_table(filepath, words_all, words_accepted, n_workers=2, chunk_size=1, verbose=False)
+            loaded = load_pattern_matrix(filepath, words_all, words_accepted)
+            self.assertEqual(loaded.matrix.dtype, np.uint16)
+            self.assertEqual(loaded.pattern("tassel", "tassel"), 3 ** 6 - 1)
+            self.assertEqual(loaded.pattern("sassed", "esters"), get_pattern_value("sassed", "esters"))
+            self.assertIsNone(load_pattern_matrix(filepath, words_all, words_accepted[:-1]))
+            self.assertEqual(loaded.word_length, 6)
+            self.assertEqual(loaded.all_codes.tolist(), encode_words(words_all).tolist())
+            del loaded
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from src.resources import LazyResource, get_data_dir, set_data_dir, get_data_filepath, DEFAULT_DATA_DIR
+from src.word_index import WordIndex
+
+
+class ResourcesTest(unittest.TestCase):
+
+    def tearDown(self):
+        set_data_dir(None)
+
+    def test_lazy_resource(self):
+        calls = []
+
+        def load():
+            calls.append(1)
+            # slow loader, so that concurrent first calls overlap
+            time.sleep(0.01)
+            return get_data_filepath("words.txt")
+
+        resource = LazyResource(load)
+        self.assertFalse(resource.is_loaded)
+        self.assertEqual(calls, [])
+
+        threads = [threading.Thread(target=resource.get) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(resource.get(), os.path.join(get_data_dir(), "words.txt"))
+        self.assertEqual(len(calls), 1)
+
+        resource.reset()
+        self.assertFalse(resource.is_loaded)
+        resource.get()
+        self.assertEqual(len(calls), 2)
+
+    def test_set_data_dir(self):
+        resource = LazyResource(lambda: get_data_filepath("words.txt"))
+        if "WORDLE_DATA_DIR" not in os.environ:
+            self.assertEqual(resource.get(), os.path.join(DEFAULT_DATA_DIR, "words.txt"))
+
+        # loaded resources are dropped, and loaded from the new directory on the next use
+        set_data_dir("some_dir")
+        self.assertFalse(resource.is_loaded)
+        self.assertEqual(resource.get(), os.path.join(os.path.abspath("some_dir"), "words.txt"))
+
+        set_data_dir(None)
+        self.assertFalse(resource.is_loaded)
+        self.assertEqual(get_data_dir(), os.environ.get("WORDLE_DATA_DIR", DEFAULT_DATA_DIR))
+
+    def test_word_index_cache(self):
+        words_arr = [tuple(f"{chr(ord('a') + i)}bcde" for i in range(n)) for n in range(1, 20)]
+        indexes = [WordIndex.get(words) for words in words_arr]
+        self.assertIs(WordIndex.get(words_arr[-1]), indexes[-1])
+        # least recently used indexes are dropped
+        self.assertIsNot(WordIndex.get(words_arr[0]), indexes[0])
+        self.assertLessEqual(len(WordIndex._WordIndex__CACHE.get()), 8)
+
+    def test_word_index_cache_threads(self):
+        words_arr = [tuple(f"{chr(ord('a') + i)}bcde" for i in range(n)) for n in range(1, 12)]
+        errors = []
+
+        def get_indexes():
+            try:
+                for _ in range(50):
+                    for words in words_arr:
+                        self.assertEqual(WordIndex.get(words).words, words)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=get_indexes) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(WordIndex._WordIndex__CACHE.get()), 8)
+
+if __name__ == '__main__':
+    unittest.main()
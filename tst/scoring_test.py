@@ -0,0 +1,91 @@
+import unittest
+import os
+import sys
+from collections import Counter
+from math import log2
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from src.pattern_matrix import PatternMatrix
+from src.scoring import get_pattern_histograms, calculate_entropies, calculate_entropies_chunked, \
+    PartitionHistograms, OBJECTIVES, calculate_expected_sizes, calculate_max_bucket_sizes, calculate_bucket_counts, \
+    calculate_scores_chunked
+
+WORDS = ("grape", "eagle", "spasm", "stele", "eerie", "abbey", "crane", "steep", "geese", "allee", "sassy")
+
+
+class ScoringTest(unittest.TestCase):
+
+    def test_histograms_entropies(self):
+        pattern_matrix = PatternMatrix(WORDS, WORDS)
+        guess_ids = pattern_matrix.all_ids(WORDS[::2])
+        secret_ids = pattern_matrix.accepted_ids(WORDS[1:])
+
+        histograms = get_pattern_histograms(pattern_matrix.matrix, guess_ids, secret_ids)
+        entropies = calculate_entropies(histograms)
+        for i, word in enumerate(WORDS[::2]):
+            pattern_cnt = Counter(pattern_matrix.pattern(word, word_secret) for word_secret in WORDS[1:])
+            self.assertEqual({pattern: cnt for pattern, cnt in enumerate(histograms[i]) if cnt > 0}, pattern_cnt)
+
+            entropy = -sum(cnt / len(secret_ids) * log2(cnt / len(secret_ids)) for cnt in pattern_cnt.values())
+            self.assertAlmostEqual(entropies[i], entropy)
+
+    def test_entropy_ties(self):
+        # same bucket sizes in different buckets have exactly the same entropy
+        histograms = [[0] * 243 for _ in range(2)]
+        for pattern, cnt in zip((0, 5, 17, 242), (7, 1, 3, 2)):
+            histograms[0][pattern] = cnt
+        for pattern, cnt in zip((1, 100, 2, 50), (3, 2, 1, 7)):
+            histograms[1][pattern] = cnt
+        entropies = calculate_entropies(np.array(histograms))
+        self.assertEqual(entropies[0], entropies[1])
+
+    def test_entropies_chunked(self):
+        pattern_matrix = PatternMatrix(WORDS, WORDS)
+        guess_ids = pattern_matrix.all_ids(WORDS)
+        secret_ids = pattern_matrix.accepted_ids(WORDS[3:])
+        expected = calculate_entropies(get_pattern_histograms(pattern_matrix.matrix, guess_ids, secret_ids))
+        for max_block_size in (1, 2 * 243, 3 * 243 + 1, 10 ** 6):
+            entropies = calculate_entropies_chunked(pattern_matrix.matrix, guess_ids, secret_ids, max_block_size)
+            self.assertTrue(np.array_equal(entropies, expected))
+
+    def test_objectives(self):
+        pattern_matrix = PatternMatrix(WORDS, WORDS)
+        guess_ids = pattern_matrix.all_ids(WORDS)
+        secret_ids = pattern_matrix.accepted_ids(WORDS[2:])
+        histograms = get_pattern_histograms(pattern_matrix.matrix, guess_ids, secret_ids)
+        expected_sizes = calculate_expected_sizes(histograms)
+        max_bucket_sizes = calculate_max_bucket_sizes(histograms)
+        bucket_counts = calculate_bucket_counts(histograms)
+        for i, word in enumerate(WORDS):
+            pattern_cnt = Counter(pattern_matrix.pattern(word, word_secret) for word_secret in WORDS[2:])
+            self.assertAlmostEqual(expected_sizes[i], sum(cnt * cnt for cnt in pattern_cnt.values()) / len(secret_ids))
+            self.assertEqual(max_bucket_sizes[i], max(pattern_cnt.values()))
+            self.assertEqual(bucket_counts[i], len(pattern_cnt))
+
+        # all objectives from the same histograms, higher is better
+        objectives = tuple(OBJECTIVES.values())
+        scores = calculate_scores_chunked(pattern_matrix.matrix, guess_ids, secret_ids, objectives, max_block_size=500)
+        self.assertEqual(scores.shape, (len(objectives), len(guess_ids)))
+        self.assertTrue(np.array_equal(scores[list(OBJECTIVES).index("minimax")], -max_bucket_sizes))
+        for i, objective in enumerate(objectives):
+            self.assertTrue(np.array_equal(scores[i], objective(histograms)))
+
+    def test_partition_histograms_narrow(self):
+        pattern_matrix = PatternMatrix(WORDS, WORDS)
+        guess_ids = pattern_matrix.all_ids(WORDS)
+        secret_ids = pattern_matrix.accepted_ids(WORDS)
+        histograms = PartitionHistograms(pattern_matrix.matrix, guess_ids, secret_ids, max_block_size=500)
+        # few secrets removed (histograms are updated) and most of them removed (histograms are rebuilt)
+        for keep in (slice(0, None), slice(1, None), slice(2, 9), slice(3, 5)):
+            narrowed = histograms.narrow(guess_ids[keep], secret_ids[keep])
+            expected = get_pattern_histograms(pattern_matrix.matrix, guess_ids[keep], secret_ids[keep])
+            self.assertTrue(np.array_equal(narrowed.histograms, expected))
+            self.assertTrue(np.array_equal(narrowed.calculate_entropies(), calculate_entropies(expected)))
+            histograms = narrowed
+
+
+if __name__ == '__main__':
+    unittest.main()
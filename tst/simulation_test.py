@@ -0,0 +1,80 @@
+import unittest
+import os
+import sys
+import time
+import logging
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+# same module instances as the src modules use (they import each other without the package prefix)
+from src.benchmark import Wordle, StateMode, SimulationEngine, play_game, Solver
+from src.pattern_matrix import PatternMatrix
+from src.random_solver import RandomSolver
+from src.entropy_solver import EntropySolver
+from src.utils import load_accepted_words
+
+N_GAMES = 40
+WORDS = ("grape", "eagle", "spasm", "stele", "eerie", "abbey", "crane", "steep", "geese", "allee", "sassy")
+SLOW_GUESS_SECONDS = 0.02
+
+
+class SlowSolver(Solver):
+    """Guesses the first remaining word, slowly in the second turn state where "sassy" is left"""
+
+    def __init__(self):
+        super().__init__("SlowSolver")
+
+    def _make_guess(self, state) -> str:
+        if len(state.history) == 1 and "sassy" in state.words_accepted:
+            time.sleep(SLOW_GUESS_SECONDS)
+        return state.words_accepted[0]
+
+
+def get_games() -> list[tuple[str, str]]:
+    words = load_accepted_words()
+    return [(words[i * 53 % len(words)], f"7-{i}") for i in range(N_GAMES)]
+
+
+class SimulationEngineTest(unittest.TestCase):
+
+    def test_same_as_wordle(self):
+        """Engine plays the same games as `Wordle` in each state mode, seeds give the same random guesses"""
+        for state_mode in StateMode:
+            wordle = Wordle(logger_level=logging.ERROR, state_mode=state_mode)
+            engine = SimulationEngine(state_mode=state_mode)
+            for solver in (RandomSolver(), EntropySolver()):
+                for word_secret, seed in get_games():
+                    record_wordle = play_game(wordle, solver, word_secret, seed)
+                    record_engine = engine.play(solver, word_secret, seed)
+                    self.assertEqual(record_engine.guesses, record_wordle.guesses, (state_mode, solver.name, seed))
+                    self.assertEqual(record_engine.score, record_wordle.score)
+
+    def test_play_many(self):
+        """Games played in lockstep are the same as games played one by one"""
+        games = get_games()
+        for state_mode in StateMode:
+            engine = SimulationEngine(state_mode=state_mode)
+            for solver in (RandomSolver(), EntropySolver(), EntropySolver(hard_mode=False)):
+                hard_mode = solver.name != "EntropySolver(easy)"
+                records = engine.play_many(solver, games, hard_mode)
+                self.assertEqual(len(records), len(games))
+                for record, (word_secret, seed) in zip(records, games):
+                    record_single = engine.play(solver, word_secret, seed, hard_mode)
+                    self.assertEqual((record.secret, record.seed), (word_secret, seed))
+                    self.assertEqual(record.guesses, record_single.guesses)
+                    self.assertEqual(record.score, record_single.score)
+                    self.assertEqual(len(record.guess_times), len(record.guesses))
+
+    def test_play_many_guess_times(self):
+        """Every game gets the time of the guess of its state, not the average time of the turn"""
+        pattern_matrix = PatternMatrix(WORDS, WORDS)
+        engine = SimulationEngine(pattern_matrix)
+        records = engine.play_many(SlowSolver(), [(word, "0") for word in WORDS])
+        slow_state = engine.get_initial_state().advance("grape", pattern_matrix.pattern("grape", "sassy"))
+        for record in records:
+            if len(record.guesses) > 1:
+                is_slow = record.secret in slow_state.words_accepted
+                self.assertEqual(record.guess_times[1] >= SLOW_GUESS_SECONDS, is_slow, record.secret)
+
+if __name__ == '__main__':
+    unittest.main()
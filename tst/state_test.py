@@ -0,0 +1,116 @@
+import unittest
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from src.state import State, StateRow, PatternState
+from src.pattern_matrix import PatternMatrix
+from src.utils import CharState, load_words, pattern_value_to_pattern_arr, word_to_pattern_value
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/data'))
+
+
+def get_row(word_guess: str, word_secret: str) -> StateRow:
+    pattern = pattern_value_to_pattern_arr(word_to_pattern_value(word_guess, word_secret))
+    return StateRow(word_guess, [c == CharState.GREEN for c in pattern], [c == CharState.YELLOW for c in pattern])
+
+
+class StateTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.words_all = load_words(os.path.join(DATA_DIR, "words_all.txt"))
+        cls.words_accepted = load_words(os.path.join(DATA_DIR, "words_accepted.txt"))
+        # subset of words, so that pattern matrix is quick to build
+        cls.pattern_matrix = PatternMatrix(tuple(sorted(set(cls.words_all[::4] + cls.words_accepted[::4]))),
+                                           cls.words_accepted[::4])
+
+    def test_update_state(self):
+        # state words must be the same as filtering previous state words with `check_word`
+        rng = random.Random(0)
+        for _ in range(20):
+            word_secret = rng.choice(self.words_accepted)
+            state = State((), self.words_all, self.words_accepted)
+            while state.turns_left > 0:
+                word_guess = rng.choice(state.words_all)
+                state_next = state.update_state(get_row(word_guess, word_secret))
+                self.assertEqual(state_next.words_all,
+                                 tuple(word for word in state.words_all if state_next.check_word(word)))
+                self.assertEqual(state_next.words_accepted,
+                                 tuple(word for word in state.words_accepted if state_next.check_word(word)))
+                self.assertIn(word_secret, state_next.words_accepted)
+                state = state_next
+
+    def test_row_pattern_value(self):
+        for word_guess, word_secret in (("crane", "grape"), ("allee", "eagle"), ("sassy", "spasm"), ("steep", "stele")):
+            self.assertEqual(get_row(word_guess, word_secret).pattern_value, word_to_pattern_value(word_guess, word_secret))
+
+    def test_pattern_state(self):
+        # pattern state must keep exactly the words consistent with all patterns, which is a subset
+        # of the words passing letter constraints of `State`
+        words_all, words_accepted = self.pattern_matrix.words_all, self.pattern_matrix.words_accepted
+        rng = random.Random(1)
+        for _ in range(5):
+            word_secret = rng.choice(words_accepted)
+            state = State((), words_all, words_accepted)
+            pattern_state = PatternState(self.pattern_matrix)
+            self.assertEqual(pattern_state.words_all, state.words_all)
+            self.assertEqual(pattern_state.words_accepted, state.words_accepted)
+
+            rows = []
+            while state.turns_left > 0:
+                row = get_row(rng.choice(pattern_state.words_all), word_secret)
+                rows.append(row)
+                state = state.update_state(row)
+                pattern_state = pattern_state.update_state(row)
+                self.assertEqual(state.turns_left, pattern_state.turns_left)
+
+                consistent = lambda word: all(word_to_pattern_value(r._word, word) == r.pattern_value for r in rows)
+                self.assertEqual(pattern_state.words_all, tuple(filter(consistent, words_all)))
+                self.assertEqual(pattern_state.words_accepted, tuple(filter(consistent, words_accepted)))
+                self.assertTrue(set(pattern_state.words_all) <= set(state.words_all))
+                self.assertTrue(set(pattern_state.words_accepted) <= set(state.words_accepted))
+                self.assertTrue(all(state.check_word(word) for word in pattern_state.words_all))
+                self.assertTrue(all(pattern_state.check_word(word) for word in pattern_state.words_all))
+                self.assertIn(word_secret, pattern_state.words_accepted)
+
+    def test_advance(self):
+        word_secret = self.pattern_matrix.words_accepted[3]
+        state = State((), self.pattern_matrix.words_all, self.pattern_matrix.words_accepted)
+        pattern_state = PatternState(self.pattern_matrix)
+        for word_guess in self.pattern_matrix.words_all[10:13]:
+            pattern_val = word_to_pattern_value(word_guess, word_secret)
+            state_next = state.advance(word_guess, pattern_val)
+            self.assertEqual(state_next.words_all, state.update_state(get_row(word_guess, word_secret)).words_all)
+            self.assertEqual(state_next.history, state.history + ((word_guess, pattern_val),))
+            state = state_next
+
+            pattern_state = pattern_state.advance(word_guess, pattern_val)
+            self.assertEqual(pattern_state.history, state.history)
+
+    def test_key(self):
+        # both kinds of states get the same key for the same remaining words and turns
+        words_all, words_accepted = self.pattern_matrix.words_all, self.pattern_matrix.words_accepted
+        state = State((), words_all, words_accepted)
+        pattern_state = PatternState(self.pattern_matrix)
+        self.assertEqual(state.key, pattern_state.key)
+
+        word_guess, word_secret = words_all[0], words_accepted[0]
+        pattern_val = word_to_pattern_value(word_guess, word_secret)
+        self.assertNotEqual(state.advance(word_guess, pattern_val).key, state.key)
+        self.assertEqual(state.advance(word_guess, pattern_val).key, state.advance(word_guess, pattern_val).key)
+        self.assertEqual(state.advance(word_guess, pattern_val), state.advance(word_guess, pattern_val))
+
+    def test_pattern_state_hash(self):
+        row = get_row(self.pattern_matrix.words_all[0], self.pattern_matrix.words_accepted[0])
+        state_a = PatternState(self.pattern_matrix).update_state(row)
+        state_b = PatternState(self.pattern_matrix).update_state(row)
+        self.assertEqual(state_a, state_b)
+        self.assertEqual(hash(state_a), hash(state_b))
+        self.assertNotEqual(state_a, PatternState(self.pattern_matrix))
+
+
+if __name__ == '__main__':
+    unittest.main()
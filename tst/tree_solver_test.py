@@ -0,0 +1,68 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from src.tree_solver import DecisionTree, DecisionTreeSolver, Solver, load_or_build_decision_tree, \
+    get_decision_tree_filepath
+from src.simulation import SimulationEngine
+from src.entropy_solver import EntropySolver
+from src.pattern_matrix import PatternMatrix
+from src.resources import DATA_DIR_ENV
+from src.utils import load_accepted_words
+
+WORDS = ("slate", "grape", "eagle", "spasm", "stele", "eerie", "abbey", "crane", "steep", "geese", "allee", "sassy")
+
+
+class NoFallbackSolver(Solver):
+
+    def __init__(self):
+        super().__init__("NoFallbackSolver")
+
+    def _make_guess(self, state) -> str:
+        raise AssertionError(f"State {state.history} isn't in the tree")
+
+
+class DecisionTreeTest(unittest.TestCase):
+
+    def test_same_as_entropy_solver(self):
+        """Tree makes the same guesses as `EntropySolver` in every game, without falling back"""
+        engine = SimulationEngine()
+        games = [(word, "0") for word in load_accepted_words()]
+        records_entropy = engine.play_many(EntropySolver(), games)
+        records_tree = engine.play_many(DecisionTreeSolver(fallback=NoFallbackSolver()), games)
+        for record_entropy, record_tree in zip(records_entropy, records_tree):
+            self.assertEqual(record_tree.guesses, record_entropy.guesses, record_tree.secret)
+
+    def test_load_or_build(self):
+        pattern_matrix = PatternMatrix(WORDS, WORDS)
+        other_pattern_matrix = PatternMatrix(WORDS, WORDS[:-1])
+        with tempfile.TemporaryDirectory() as tmp_dir, mock.patch.dict(os.environ, {DATA_DIR_ENV: tmp_dir}):
+            filepath = get_decision_tree_filepath()
+            self.assertIsNone(DecisionTree.load(filepath, WORDS, WORDS))
+            tree = load_or_build_decision_tree(pattern_matrix)
+            self.assertEqual(tree.get_guess(()), "slate")
+            self.assertEqual(len(DecisionTree.load(filepath, WORDS, WORDS)), len(tree))
+            # dumped through a temporary file, which is renamed
+            self.assertEqual(os.listdir(tmp_dir), [os.path.basename(filepath)])
+
+            # other word lists: tree isn't loaded, it's rebuilt for the new lists
+            self.assertIsNone(DecisionTree.load(filepath, WORDS, WORDS[:-1]))
+            other_tree = load_or_build_decision_tree(other_pattern_matrix)
+            self.assertIsNotNone(DecisionTree.load(filepath, WORDS, WORDS[:-1]))
+            self.assertIsNone(DecisionTree.load(filepath, WORDS, WORDS))
+
+            # truncated or corrupt file is rebuilt as well
+            for content in (open(filepath).read()[:100], "[1, 2]", '{"version": 1}'):
+                with open(filepath, 'w') as f:
+                    f.write(content)
+                self.assertIsNone(DecisionTree.load(filepath, WORDS, WORDS[:-1]))
+                self.assertEqual(len(load_or_build_decision_tree(other_pattern_matrix)), len(other_tree))
+                self.assertIsNotNone(DecisionTree.load(filepath, WORDS, WORDS[:-1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -16,14 +16,16 @@ class UtilsTest(unittest.TestCase):
         exp4 = (CharState.GREY, CharState.GREEN, CharState.GREEN, CharState.GREY, CharState.GREEN)
         exp5 = (CharState.YELLOW, CharState.YELLOW, CharState.GREY, CharState.YELLOW, CharState.GREEN)
         exp6 = (CharState.GREEN, CharState.YELLOW, CharState.GREY, CharState.GREEN, CharState.GREY)
+        exp7 = (CharState.GREEN, CharState.GREEN, CharState.GREEN, CharState.YELLOW, CharState.GREY)
         word_pair1 = "abcde", "abcde"
         word_pair2 = "aaaaa", "bbbbb"
         word_pair3 = "abcde", "bcdea"
         word_pair4 = "crane", "grape"
         word_pair5 = "allee", "eagle"
         word_pair6 = "sassy", "spasm"
+        word_pair7 = "steep", "stele"
         test_cases = ((word_pair1, exp1), (word_pair2, exp2), (word_pair3, exp3), (word_pair4, exp4),
-                      (word_pair5, exp5), (word_pair6, exp6))
+                      (word_pair5, exp5), (word_pair6, exp6), (word_pair7, exp7))
         for word_pair, exp in test_cases:
             self.assertEqual(pattern_value_to_pattern_arr(word_to_pattern_value(word_pair[0], word_pair[1])), exp)
 